@@ -0,0 +1,5 @@
+"""
+性能基准测试
+- corpus: 合成中文表单/名片语料
+- bench_matching: 匹配算法微基准（python -m benchmarks.bench_matching）
+"""
@@ -0,0 +1,144 @@
+"""
+页面内相似度内核微基准
+
+生成一段自包含的 JavaScript：用 benchmarks.corpus 的合成标题/名片 key 作为输入，
+用 performance.now() 对比旧实现（每次分配二维数组的 longestCommonSubstring）与
+TencentDocsFiller.get_similarity_kernels() 中的共享内核，并先校验两者结果一致。
+
+- 有 node 时直接运行并打印结果
+- --html 输出一个网页，可在 WebView / 浏览器中打开，结果显示在页面上并打印到控制台
+  （与填写脚本的运行环境一致）
+
+用法：
+    python -m benchmarks.bench_js_kernels
+    python -m benchmarks.bench_js_kernels --pairs 5000 --rounds 50
+    python -m benchmarks.bench_js_kernels --html benchmarks/results/kernels.html
+"""
+import argparse
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# 以脚本方式运行时也能导入项目模块
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.corpus import generate_card, generate_form
+
+# 优化前 generate_wjx_fill_script 中的实现，作为对照
+LEGACY_KERNELS = """
+    function legacyLongestCommonSubstring(s1, s2) {
+        const m = s1.length, n = s2.length;
+        if (m === 0 || n === 0) return 0;
+        let maxLen = 0;
+        const dp = Array(m + 1).fill(null).map(() => Array(n + 1).fill(0));
+        for (let i = 1; i <= m; i++) {
+            for (let j = 1; j <= n; j++) {
+                if (s1[i-1] === s2[j-1]) {
+                    dp[i][j] = dp[i-1][j-1] + 1;
+                    maxLen = Math.max(maxLen, dp[i][j]);
+                }
+            }
+        }
+        return maxLen;
+    }
+"""
+
+BENCH_TEMPLATE = """
+(function() {
+%(kernels)s
+%(legacy)s
+    const pairs = %(pairs)s;
+    const rounds = %(rounds)d;
+    const lines = [];
+
+    // 结果一致性校验
+    let mismatches = 0;
+    for (const [a, b] of pairs) {
+        if (legacyLongestCommonSubstring(a, b) !== longestCommonSubstring(a, b)) mismatches++;
+    }
+    lines.push(`校验: ${pairs.length} 对字符串, 不一致 ${mismatches} 对`);
+
+    function measure(name, fn) {
+        let sink = 0;
+        for (const [a, b] of pairs) sink += fn(a, b);      // 预热
+        const start = performance.now();
+        for (let r = 0; r < rounds; r++) {
+            for (const [a, b] of pairs) sink += fn(a, b);
+        }
+        const elapsed = performance.now() - start;
+        const perCall = elapsed * 1000 / (rounds * pairs.length);
+        lines.push(`${name.padEnd(34)} ${elapsed.toFixed(1).padStart(9)}ms  ${perCall.toFixed(3).padStart(8)}µs/次`);
+        return elapsed;
+    }
+
+    const legacy = measure('legacyLongestCommonSubstring', legacyLongestCommonSubstring);
+    const shared = measure('longestCommonSubstring (shared)', longestCommonSubstring);
+    lines.push(`加速: ${(legacy / shared).toFixed(2)}x`);
+    measure('charOverlap (shared)', charOverlap);
+
+    const report = lines.join('\\n');
+    console.log(report);
+    if (typeof document !== 'undefined' && document.body) {
+        const pre = document.createElement('pre');
+        pre.textContent = report;
+        document.body.appendChild(pre);
+    }
+    return { mismatches, legacy, shared };
+})();
+"""
+
+
+def build_pairs(count: int, seed: int):
+    """表单标题 × 名片子关键词 / 选项文本，与 wjx 脚本中的调用场景类似"""
+    rng = random.Random(seed)
+    titles = generate_form(rng, max(10, count // 10))
+    keys = [item['key'] for item in generate_card(rng, 50)]
+    return [[rng.choice(titles), rng.choice(keys)] for _ in range(count)]
+
+
+def build_script(pairs, rounds: int) -> str:
+    from core.tencent_docs_filler import TencentDocsFiller
+    return BENCH_TEMPLATE % {
+        'kernels': TencentDocsFiller.get_similarity_kernels(),
+        'legacy': LEGACY_KERNELS,
+        'pairs': json.dumps(pairs, ensure_ascii=False),
+        'rounds': rounds,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='页面内相似度内核微基准')
+    parser.add_argument('--pairs', type=int, default=2000, help='字符串对数量')
+    parser.add_argument('--rounds', type=int, default=20, help='重复轮数')
+    parser.add_argument('--seed', type=int, default=20251017)
+    parser.add_argument('--html', type=Path, default=None, help='输出可在 WebView/浏览器中打开的网页')
+    args = parser.parse_args(argv)
+
+    script = build_script(build_pairs(args.pairs, args.seed), args.rounds)
+
+    if args.html:
+        args.html.parent.mkdir(parents=True, exist_ok=True)
+        args.html.write_text(f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>相似度内核微基准</title>'
+                             f'</head><body><script>{script}</script></body></html>\n', encoding='utf-8')
+        print(f"💾 基准页面已保存: {args.html}")
+        return
+
+    node = shutil.which('node')
+    if not node:
+        print("⚠️ 未找到 node，请使用 --html 生成网页后在 WebView/浏览器中打开")
+        return
+
+    with tempfile.NamedTemporaryFile('w', suffix='.js', delete=False, encoding='utf-8') as f:
+        f.write(script)
+    try:
+        subprocess.run([node, f.name], check=True)
+    finally:
+        Path(f.name).unlink(missing_ok=True)
+
+
+if __name__ == '__main__':
+    main()
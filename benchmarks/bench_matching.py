@@ -0,0 +1,256 @@
+"""
+匹配算法微基准
+
+对每个匹配器、每种表单规模，测量：
+- 吞吐：每秒匹配的字段数
+- 延迟：单次调用的 p50 / p99（逐字段匹配器按字段计，整表匹配器按表单计）
+- 峰值内存：tracemalloc 统计的单次整表匹配峰值
+
+结果写入 JSON（默认 ~/.auto-form-filler/reports/，不写入源码目录），可用 --compare 与之前的结果对比。
+
+用法：
+    python -m benchmarks.bench_matching
+    python -m benchmarks.bench_matching --sizes 10 100 500 --output bench.json
+    python -m benchmarks.bench_matching --compare ~/.auto-form-filler/reports/matching-20250101-120000.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# 以脚本方式运行时也能导入项目模块
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.corpus import generate_card, generate_form, to_baoming_fields, to_card_config
+
+DEFAULT_SIZES = [10, 50, 100, 250, 500]
+RESULTS_DIR = Path.home() / '.auto-form-filler' / 'reports'
+
+
+# ──────────────────────────── 匹配器 ────────────────────────────
+# 每个匹配器为 prepare(titles, card) -> (unit, [可调用对象])：
+#   unit == 'field' 时每个可调用对象匹配一个字段；unit == 'form' 时只有一个，匹配整张表单
+
+def prepare_field_matcher(titles: List[str], card: List[Dict]):
+    """FieldMatcher：每个字段取相似度最高的名片 key"""
+    from core.matcher import FieldMatcher
+    keys = [item['key'] for item in card]
+
+    def run(title):
+        return max(keys, key=lambda key: FieldMatcher.calculate_similarity(title, key))
+
+    return 'field', [lambda t=title: run(t) for title in titles]
+
+
+def prepare_shared_match_keyword(titles: List[str], card: List[Dict]):
+    """SharedMatchAlgorithm.match_keyword：每个字段逐个 key 评分（页面内共享执行器的逻辑）"""
+    from core.tencent_docs_filler import SharedMatchAlgorithm
+    keys = [item['key'] for item in card]
+
+    def run(title):
+        best = None
+        for key in keys:
+            result = SharedMatchAlgorithm.match_keyword(title, key)
+            if result['matched'] and (best is None or result['score'] > best['score']):
+                best = result
+        return best
+
+    return 'field', [lambda t=title: run(t) for title in titles]
+
+
+def prepare_compiled_index(titles: List[str], card: List[Dict]):
+    """CompiledKeywordIndex：编译一次名片索引（计入整表时间），逐字段查找"""
+    from core.keyword_index import CompiledKeywordIndex
+    keys = [item['key'] for item in card]
+
+    def run():
+        index = CompiledKeywordIndex(keys)
+        return [index.lookup(title) for title in titles]
+
+    return 'form', [run]
+
+
+def prepare_score_matrix(titles: List[str], card: List[Dict]):
+    """SharedMatchAlgorithm.score_matrix + best_matches：NumPy 整表评分"""
+    from core.tencent_docs_filler import SharedMatchAlgorithm
+    keys = [item['key'] for item in card]
+
+    def run():
+        return SharedMatchAlgorithm.best_matches(SharedMatchAlgorithm.score_matrix(titles, keys))
+
+    return 'form', [run]
+
+
+def prepare_optimal_assignment(titles: List[str], card: List[Dict]):
+    """OptimalFieldAssignment.assign：整表最优分配（匈牙利算法）"""
+    from core.field_assignment import OptimalFieldAssignment
+    keys = [item['key'] for item in card]
+    return 'form', [lambda: OptimalFieldAssignment.assign(titles, keys)]
+
+
+def prepare_baoming_match_and_fill(titles: List[str], card: List[Dict]):
+    """BaomingToolFiller.match_and_fill：报名工具整表匹配（屏蔽其调试输出）"""
+    from core.baoming_tool_filler import BaomingToolFiller
+    filler = BaomingToolFiller()
+    filler.form_fields = to_baoming_fields(titles)
+    card_config = to_card_config(card)
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return filler.match_and_fill(card_config)
+
+    return 'form', [run]
+
+
+MATCHERS: Dict[str, Callable] = {
+    'field_matcher': prepare_field_matcher,
+    'shared_match_keyword': prepare_shared_match_keyword,
+    'compiled_index': prepare_compiled_index,
+    'score_matrix': prepare_score_matrix,
+    'optimal_assignment': prepare_optimal_assignment,
+    'baoming_match_and_fill': prepare_baoming_match_and_fill,
+}
+
+
+# ──────────────────────────── 测量 ────────────────────────────
+
+def percentile(samples: List[float], q: float) -> float:
+    """最近秩百分位数"""
+    ordered = sorted(samples)
+    rank = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def clear_caches():
+    """清空文本归一化缓存，保证每轮测量从冷缓存开始"""
+    from core import text_normalizer
+    text_normalizer.clear_cache()
+
+
+def measure(name: str, size: int, card_size: int, seed: int, repeat: int) -> Optional[Dict]:
+    """测量单个匹配器在一种表单规模下的性能，匹配器依赖缺失时返回 None"""
+    rng = random.Random(seed + size)
+    titles = generate_form(rng, size)
+    card = generate_card(rng, card_size)
+
+    try:
+        unit, calls = MATCHERS[name](titles, card)
+    except ImportError as e:
+        print(f"  ⚠️ 跳过 {name}: {e}")
+        return None
+
+    # 预热：触发延迟导入（numpy 等），不计入结果
+    for call in calls:
+        call()
+
+    latencies = []
+    total_elapsed = 0.0
+    for _ in range(repeat):
+        clear_caches()
+        round_start = time.perf_counter()
+        for call in calls:
+            start = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - start)
+        total_elapsed += time.perf_counter() - round_start
+
+    # 峰值内存单独测一轮（tracemalloc 会明显拖慢执行）
+    clear_caches()
+    tracemalloc.start()
+    for call in calls:
+        call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'matcher': name,
+        'fields': size,
+        'keys': card_size,
+        'unit': unit,
+        'repeat': repeat,
+        'matches_per_sec': round(size * repeat / total_elapsed, 1) if total_elapsed else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 4),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 4),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def environment() -> Dict:
+    env = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+    try:
+        import numpy
+        env['numpy'] = numpy.__version__
+    except ImportError:
+        env['numpy'] = None
+    return env
+
+
+def compare(current: List[Dict], baseline_file: Path):
+    """与之前的结果对比吞吐和 p99（相同匹配器 + 相同规模）"""
+    baseline = json.loads(baseline_file.read_text(encoding='utf-8'))
+    previous = {(r['matcher'], r['fields']): r for r in baseline.get('results', [])}
+
+    print(f"\n📊 对比 {baseline_file.name}（{baseline.get('timestamp', '?')}）")
+    print(f"  {'matcher':<24}{'fields':>7}{'吞吐变化':>12}{'p99变化':>12}")
+    for result in current:
+        old = previous.get((result['matcher'], result['fields']))
+        if not old or not old.get('matches_per_sec') or not result.get('matches_per_sec'):
+            continue
+        throughput = result['matches_per_sec'] / old['matches_per_sec']
+        p99 = result['p99_ms'] / old['p99_ms'] if old['p99_ms'] else float('nan')
+        print(f"  {result['matcher']:<24}{result['fields']:>7}{throughput:>11.2f}x{p99:>11.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='匹配算法微基准')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='表单字段数（10-500）')
+    parser.add_argument('--card-size', type=int, default=None, help='名片字段数（默认为字段数的一半，至少 10）')
+    parser.add_argument('--matchers', nargs='+', choices=sorted(MATCHERS), default=list(MATCHERS))
+    parser.add_argument('--repeat', type=int, default=5, help='每种规模重复次数')
+    parser.add_argument('--seed', type=int, default=20251017)
+    parser.add_argument('--output', type=Path, default=None, help='结果 JSON 路径')
+    parser.add_argument('--compare', type=Path, default=None, help='对比的历史结果 JSON')
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        card_size = args.card_size or max(10, size // 2)
+        print(f"\n📋 {size} 个字段 × {card_size} 个名片字段")
+        for name in args.matchers:
+            result = measure(name, size, card_size, args.seed, args.repeat)
+            if result is None:
+                continue
+            results.append(result)
+            print(f"  {name:<24}{result['matches_per_sec']:>12.0f} 次/秒   "
+                  f"p50 {result['p50_ms']:>9.3f}ms   p99 {result['p99_ms']:>9.3f}ms   "
+                  f"峰值 {result['peak_kb']:>9.1f}KB  ({result['unit']})")
+
+    timestamp = datetime.now()
+    output = args.output or RESULTS_DIR / f"matching-{timestamp.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        'timestamp': timestamp.isoformat(timespec='seconds'),
+        'seed': args.seed,
+        'environment': environment(),
+        'results': results,
+    }, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"\n💾 结果已保存: {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+合成中文表单/名片语料
+按真实报名表的常见问法生成：同义标签、序号/括号说明/必填星号等噪声，
+名片 key 由多个同义关键词以 | ， ； 、 分隔
+"""
+import random
+from typing import Dict, List
+
+# 同义标签组：同组内的标签视为同一个名片字段的不同问法
+LABEL_GROUPS = [
+    ['姓名', '名字', '真实姓名', '联系人'],
+    ['手机号', '手机号码', '联系电话', '电话'],
+    ['微信号', '微信', 'wx号', '微信ID'],
+    ['身份证号', '身份证号码', '证件号码'],
+    ['性别'],
+    ['年龄', '出生年份', '生日'],
+    ['所在城市', '城市', '常驻城市', '所在地区'],
+    ['详细地址', '收货地址', '邮寄地址', '地址'],
+    ['邮箱', '电子邮箱', 'Email'],
+    ['QQ号', 'QQ'],
+    ['小红书账号', '小红书ID', '小红书昵称', '红书号'],
+    ['小红书主页链接', '主页链接', '小红书链接'],
+    ['粉丝数', '粉丝量', '小红书粉丝数'],
+    ['抖音账号', '抖音号', '抖音ID'],
+    ['抖音粉丝数', '抖音粉丝量'],
+    ['微博昵称', '微博账号'],
+    ['B站账号', 'B站ID', '哔哩哔哩账号'],
+    ['视频号', '视频号名称'],
+    ['报价', '合作报价', '图文报价', '视频报价'],
+    ['职业', '工作', '从事行业'],
+    ['学校', '毕业院校', '就读学校'],
+    ['专业', '所学专业'],
+    ['公司名称', '单位名称', '工作单位'],
+    ['紧急联系人', '紧急联系人姓名'],
+    ['紧急联系人电话', '紧急联系方式'],
+    ['备注', '其他说明', '补充信息'],
+]
+
+KEY_SEPARATORS = ['|', '，', '；', '、']
+TITLE_PREFIXES = ['', '', '请填写', '您的', '1、', '12.', '【必填】']
+TITLE_SUFFIXES = ['', '', '*', '：', '（必填）', '（与身份证一致）', '(请如实填写)']
+# 表单中常见但名片里没有的问题
+UNMATCHED_TITLES = ['是否同意活动规则', '您从哪里得知本活动', '对本次活动的建议', '可参加的时间段',
+                    '是否需要发票', '衣服尺码', '饮食禁忌', '是否携带家属']
+
+
+def _group_label(group: List[str], index: int) -> str:
+    """同义组的第 index 个变体；超出组大小时加序号，保证大规模语料中标签不完全重复"""
+    label = group[index % len(group)]
+    round_no = index // len(group)
+    return label if round_no == 0 else f'{label}{round_no + 1}'
+
+
+def generate_card(rng: random.Random, size: int) -> List[Dict[str, str]]:
+    """
+    生成名片（fill_data 格式）
+
+    Args:
+        size: 名片字段数
+
+    Returns:
+        List[Dict]: [{'key': '姓名|名字', 'value': '...'}, ...]
+    """
+    card = []
+    for i in range(size):
+        group = LABEL_GROUPS[i % len(LABEL_GROUPS)]
+        round_no = i // len(LABEL_GROUPS)
+        variants = rng.sample(range(len(group) * (round_no + 1)), min(len(group), rng.randint(1, 3)))
+        key = rng.choice(KEY_SEPARATORS).join(_group_label(group, v) for v in variants)
+        card.append({'key': key, 'value': f'值{i}'})
+    return card
+
+
+def generate_form(rng: random.Random, size: int, unmatched_ratio: float = 0.2) -> List[str]:
+    """
+    生成表单标题列表
+
+    Args:
+        size: 表单字段数
+        unmatched_ratio: 名片中没有对应字段的问题比例
+
+    Returns:
+        List[str]: 带噪声的表单标题
+    """
+    titles = []
+    for _ in range(size):
+        if rng.random() < unmatched_ratio:
+            label = rng.choice(UNMATCHED_TITLES)
+        else:
+            group = rng.choice(LABEL_GROUPS)
+            label = _group_label(group, rng.randrange(len(group) * max(1, size // 100)))
+        titles.append(rng.choice(TITLE_PREFIXES) + label + rng.choice(TITLE_SUFFIXES))
+    return titles
+
+
+def to_baoming_fields(titles: List[str]) -> List[Dict]:
+    """转换为报名工具 API 的表单字段结构（BaomingToolFiller.form_fields）"""
+    return [{'field_name': title, 'field_key': f'field_{i}', 'field_type': 0,
+             'ignore': 0, 'require': 1, 'new_options': []}
+            for i, title in enumerate(titles)]
+
+
+def to_card_config(card: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """转换为报名工具的名片配置结构（name 而不是 key）"""
+    return [{'name': item['key'], 'value': item['value']} for item in card]
@@ -81,6 +81,7 @@ def build_app():
         'pycryptodome',
         'Crypto',
         'Crypto.Cipher',
+        'numpy',
     ]
     for mod in hidden_imports:
         cmd.append(f'--hidden-import={mod}')
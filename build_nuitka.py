@@ -30,6 +30,7 @@ INCLUDE_PACKAGES = [
     "jwt",
     "openpyxl",
     "dateutil",
+    "numpy",
 ]
 
 INCLUDE_MODULES = [
@@ -21,6 +21,47 @@ WINDOW_HEIGHT = 900
 # 自动填写配置
 AUTO_FILL_DELAY = 1000  # 毫秒，页面加载后延迟执行时间（优化后1秒即可）
 MATCH_THRESHOLD = 0.6   # 字段匹配相似度阈值
+MATCH_ASSIGNMENT_MODE = "greedy"  # 字段分配模式：greedy=逐个匹配，optimal=全局最优分配（匈牙利算法，适合大表单）
+FILL_PROTOCOL = "inline"  # 填充协议：inline=页面内匹配，two_phase=页面只提取字段，由 Python 端匹配后回传填充指令
+SCHEMA_CACHE_ENABLED = True  # 缓存 表单结构 → 字段映射（~/.auto-form-filler/form_schema_cache.json），只在 FILL_PROTOCOL = "two_phase" 时使用，inline 协议下不起作用
+SCHEMA_CACHE_MAX_ENTRIES = 500  # 表单结构缓存最多保留的链接数（按最近使用淘汰）
+INCREMENTAL_FILL = False  # 增量模式：填写后继续监听条件逻辑新插入/新显示的问题，只匹配、填写新问题（问卷星、腾讯文档）
+INCREMENTAL_FILL_TIMEOUT = 60  # 增量模式监听时长（秒）
+PREINSTALL_FILL_ENGINES = True  # 创建 Profile 时把平台填充引擎注册为用户脚本（DocumentReady 注入），填写时只发送数据
+SCRIPT_PROFILE = "production"  # 填充脚本构建配置：production=删除调试日志和调试扫描并压缩脚本，debug=保留详细日志
+FORM_READY_QUIET_MS = 150  # 表单就绪检测：问题容器出现后 DOM 连续静默多久（毫秒）开始填写
+FORM_READY_TIMEOUT = 15  # 表单就绪检测最长等待时间（秒），超时后按未加载处理
+FILL_RESULT_CHANNEL = True  # 填写结果通过 QWebChannel 由页面推送（连不上时回退到轮询 window.__autoFillResult__）
+FILL_RESULT_PUSH_TIMEOUT = 60  # 通道已连接但超过此时间（秒）仍未收到推送时，再读取一次结果，仍没有最终结果则按失败记录
+FILL_BATCH_WRITES = True  # 普通文本框按动画帧批量写入、只派发框架需要的事件，写完统一校验（值未保留时用平台原填充函数重试）
+LOAD_WINDOW_INITIAL = 2  # WebView 滑动窗口加载：初始同时加载数，任意一个加载结束立即开始下一个
+LOAD_WINDOW_MIN = 1  # 加载窗口下限
+LOAD_WINDOW_MAX = 8  # 加载窗口上限（加载耗时正常时逐步扩大到此值）
+LOAD_DOMAIN_LIMIT = 4  # 同一域名同时加载的页面数上限，避免触发表单平台频率限制
+LOAD_TARGET_TIME = 5  # 单个页面加载耗时（秒）不超过此值时扩大窗口，超过 2 倍或失败/超时时窗口减半
+LOAD_MEMORY_LIMIT_MB = 3072  # 渲染进程内存合计（MB）超过时缩小窗口
+LOAD_CPU_LIMIT = 85  # 渲染进程 CPU 占用（占整机 %）超过时缩小窗口
+WEBVIEW_POOL_SIZE = 16  # 切换标签页时归还的空闲 WebView 最多保留数量（复用控件和页面，0 表示不复用、直接销毁）
+TAB_RESIDENCY_MAX_TABS = 3  # 最多保留最近访问的几个标签页的 WebView（含预加载的下一个链接，1 表示切换时卸载其他所有标签页）
+TAB_RESIDENCY_MEMORY_MB = 2048  # 后台标签页（不含当前标签页）的渲染进程内存超过此值（MB）时卸载最久未访问的（0 表示只按数量限制）
+TAB_PREFETCH_CARDS = 3  # 当前标签页加载完后，后台预加载下一个链接的前几张名片（0 表示不预加载）
+PROFILE_MAX_LIVE = 24  # 同时保留的 名片×平台 Profile 数量上限，超出时释放最久未使用的空闲 Profile（Cookie 已持久化，不影响登录状态）
+PROFILE_HTTP_CACHE_MB = 64  # 每个 Profile 的 HTTP 磁盘缓存上限（MB）
+PROFILE_DISK_BUDGET_MB = 2048  # 所有 Profile 的 HTTP 缓存目录合计上限（MB），超出时删除最久未使用的未加载 Profile 的缓存（0 表示不限制）
+SHARED_ASSET_CACHE = True  # 白名单域名的 JS/CSS/图片/字体由所有 Profile 共用的缓存提供（~/.auto-form-filler/asset_cache，Cookie 仍按 Profile 隔离）
+SHARED_ASSET_CACHE_MB = 512  # 共享资源缓存总大小上限（MB），超出时按最近使用淘汰
+SHARED_ASSET_TTL_HOURS = 168  # 共享资源最长缓存时间（小时），响应 Cache-Control 的 max-age 更短时以 max-age 为准
+# 走共享缓存的静态资源域名（以 . 开头匹配所有子域名）；只放不需要登录态的 CDN 域名，按需增减
+SHARED_ASSET_HOSTS = (
+    'image.wjx.cn',      # 问卷星
+    '.gtimg.com',        # 腾讯文档/腾讯问卷
+    '.gtimg.cn',
+    '.feishucdn.com',    # 飞书
+    '.bytegoofy.com',
+    '.jinshujucdn.com',  # 金数据
+    '.wpscdn.cn',        # 金山文档
+    '.smcdn.cn',         # 石墨文档
+)
 
 # JWT 认证配置
 JWT_SECRET_KEY = "auto-form-filler-secret-key-2025-change-in-production"  # 生产环境请修改
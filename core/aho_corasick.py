@@ -0,0 +1,89 @@
+"""
+Aho–Corasick 多模式匹配自动机
+一次线性扫描找出文本中出现的所有模式串，用于在长标题
+（如“请填写您的真实姓名（与身份证一致）”）中一次性找出名片的所有子关键词，
+替代对每个子关键词分别做 `in` 判断
+"""
+from collections import deque
+from typing import Dict, List, Sequence, Set
+
+
+class AhoCorasick:
+    """
+    多模式匹配自动机
+
+    使用方法：
+        automaton = AhoCorasick(['姓名', '真实姓名', '身份证'])
+        automaton.find_all('请填写您的真实姓名与身份证一致')   # {0, 1, 2}
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        """
+        Args:
+            patterns: 模式串列表（空串忽略），结果中用模式串下标表示
+        """
+        self.patterns: List[str] = list(patterns)
+        # 状态 0 为根；goto[state][char] -> 下一状态
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        # 在该状态结束的模式串下标
+        self.output: List[List[int]] = [[]]
+        # 沿失败链最近的、有输出的状态（没有则为 0）
+        self.dict_link: List[int] = [0]
+
+        for pattern_index, pattern in enumerate(self.patterns):
+            if pattern:
+                self._insert(pattern, pattern_index)
+        self._build_links()
+
+    def _insert(self, pattern: str, pattern_index: int):
+        state = 0
+        for c in pattern:
+            next_state = self.goto[state].get(c)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][c] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.dict_link.append(0)
+            state = next_state
+        self.output[state].append(pattern_index)
+
+    def _build_links(self):
+        """按 BFS 顺序计算失败链接和输出链接"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and c not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(c, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                link = self.fail[next_state]
+                self.dict_link[next_state] = link if self.output[link] else self.dict_link[link]
+
+    def find_all(self, text: str) -> Set[int]:
+        """
+        返回在 text 中出现过的所有模式串下标
+
+        每个状态的输出只收集一次，总复杂度 O(len(text) + 状态数)
+        """
+        found: Set[int] = set()
+        visited: Set[int] = set()
+        goto, fail, output, dict_link = self.goto, self.fail, self.output, self.dict_link
+
+        state = 0
+        for c in text:
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+
+            hit = state if output[state] else dict_link[state]
+            while hit and hit not in visited:
+                visited.add(hit)
+                found.update(output[hit])
+                hit = dict_link[hit]
+        return found
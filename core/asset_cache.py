@@ -0,0 +1,259 @@
+"""
+共享静态资源缓存（按内容寻址）
+每个 名片×平台 Profile 都有自己的 HTTP 缓存，同一平台的 JS/CSS、字体和图片每张名片都要重新下载一遍。
+这里把白名单静态资源域名的请求改写到 afasset:// 协议，由一个所有 Profile 共用的缓存提供：
+
+- 资源内容按 SHA-256 保存（~/.auto-form-filler/asset_cache/blobs），相同内容只存一份
+- 索引 URL → { 内容哈希, Content-Type, 过期时间 }，按 Cache-Control 的 max-age 和 config.SHARED_ASSET_TTL_HOURS
+  中较短的一个过期；no-store / private 的响应不缓存
+- 总大小超过上限时按最近使用时间淘汰
+- 只缓存不带 Cookie 的静态资源请求，Cookie 仍按 Profile 隔离（由 gui/asset_scheme.py 负责拦截和下载）
+- 线程安全：读写由 gui/asset_scheme.py 的后台线程调用，窗口关闭时界面线程也会调用 flush()
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+# 共享缓存使用的 URL 协议：afasset://host/path?query ⇄ https://host/path?query
+ASSET_SCHEME = 'afasset'
+
+# 索引写盘的最小间隔（秒），页面加载时会连续写入很多资源
+SAVE_INTERVAL = 5.0
+
+_MAX_AGE_RE = re.compile(r'max-age\s*=\s*(\d+)')
+
+
+def to_cache_url(url: str) -> Optional[str]:
+    """https://host/path → afasset://host/path（其他协议返回 None）"""
+    if not url.startswith('https://'):
+        return None
+    return f"{ASSET_SCHEME}://{url[len('https://'):]}"
+
+
+def from_cache_url(url: str) -> Optional[str]:
+    """afasset://host/path → https://host/path（其他协议返回 None）"""
+    prefix = f"{ASSET_SCHEME}://"
+    if not url.startswith(prefix):
+        return None
+    return f"https://{url[len(prefix):]}"
+
+
+def host_allowed(host: str, hosts: Iterable[str]) -> bool:
+    """域名是否在白名单中（以 . 开头的条目匹配该域名及其子域名）"""
+    host = (host or '').lower()
+    for allowed in hosts:
+        allowed = allowed.lower()
+        if allowed.startswith('.'):
+            if host == allowed[1:] or host.endswith(allowed):
+                return True
+        elif host == allowed:
+            return True
+    return False
+
+
+def cache_lifetime(cache_control: str, ttl: float) -> Optional[float]:
+    """按 Cache-Control 计算缓存有效期（秒），不允许缓存时返回 None"""
+    cache_control = (cache_control or '').lower()
+    if 'no-store' in cache_control or 'private' in cache_control:
+        return None
+    match = _MAX_AGE_RE.search(cache_control)
+    if match:
+        return min(ttl, float(match.group(1)))
+    return ttl
+
+
+class SharedAssetStore:
+    """共享静态资源缓存：{ URL: { hash, type, size, expires, ts } } + blobs/<哈希前两位>/<哈希>"""
+
+    def __init__(self, root: Path, max_mb: float = 512, ttl_hours: float = 168):
+        self._root = root
+        self._index_file = root / 'index.json'
+        self._max_bytes = int(max_mb * 1024 * 1024)
+        self._ttl = ttl_hours * 3600
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # 索引文件写入（后台线程和界面线程都可能写盘）
+        self._entries: Dict[str, Dict] = {}
+        self._hits = 0
+        self._misses = 0
+        self._dirty = False
+        self._last_save = 0.0
+        self._load()
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """去掉锚点（查询参数通常是版本号，保留）"""
+        return re.sub(r'#.*$', '', (url or '').strip())
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._root / 'blobs' / digest[:2] / digest
+
+    def get(self, url: str) -> Optional[Tuple[str, bytes]]:
+        """
+        查找未过期的资源
+
+        Returns:
+            Optional[Tuple[str, bytes]]: (Content-Type, 内容)
+        """
+        url = self.normalize_url(url)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or entry['expires'] < now:
+                self._misses += 1
+                return None
+            blob = self._blob_path(entry['hash'])
+        try:
+            data = blob.read_bytes()
+        except OSError:
+            with self._lock:
+                self._entries.pop(url, None)
+                self._misses += 1
+            return None
+        with self._lock:
+            self._hits += 1
+            entry['ts'] = now
+        return entry['type'], data
+
+    def put(self, url: str, content_type: str, data: bytes, cache_control: str = '') -> bool:
+        """保存下载的资源；不允许缓存或超过总大小上限时返回 False"""
+        lifetime = cache_lifetime(cache_control, self._ttl)
+        if lifetime is None or not data or len(data) > self._max_bytes:
+            return False
+        url = self.normalize_url(url)
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self._blob_path(digest)
+        try:
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = blob.with_suffix('.tmp')
+                tmp_file.write_bytes(data)
+                tmp_file.replace(blob)
+        except OSError as e:
+            logger.warning(f"共享资源缓存写入失败: {e}")
+            return False
+
+        now = time.time()
+        with self._lock:
+            previous = self._entries.get(url)
+            self._entries[url] = {
+                'hash': digest,
+                'type': content_type or 'application/octet-stream',
+                'size': len(data),
+                'expires': now + lifetime,
+                'ts': now
+            }
+            removed = self._evict_locked([previous['hash']] if previous else [])
+            self._dirty = True
+        self._remove_blobs(removed)
+        if now - self._last_save >= SAVE_INTERVAL:
+            self.flush()
+        return True
+
+    def flush(self):
+        """把索引写盘（有修改时）"""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                payload = json.dumps({'version': CACHE_VERSION, 'entries': self._entries}, ensure_ascii=False)
+                self._dirty = False
+                self._last_save = time.time()
+            try:
+                self._root.mkdir(parents=True, exist_ok=True)
+                tmp_file = self._index_file.with_suffix('.tmp')
+                tmp_file.write_text(payload, encoding='utf-8')
+                tmp_file.replace(self._index_file)
+            except Exception as e:
+                logger.warning(f"共享资源缓存索引写盘失败: {e}")
+                # 下次保存或关闭窗口时重试
+                with self._lock:
+                    self._dirty = True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            blobs = {entry['hash']: entry['size'] for entry in self._entries.values()}
+            return {'hits': self._hits, 'misses': self._misses, 'size': len(self._entries),
+                    'blobs': len(blobs), 'bytes': sum(blobs.values())}
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            removed = {entry['hash'] for entry in self._entries.values()}
+            self._entries.clear()
+            self._dirty = True
+        self._remove_blobs(removed)
+        self.flush()
+        return count
+
+    def _evict_locked(self, orphans: Iterable[str] = ()) -> set:
+        """
+        按最近使用时间淘汰，直到（去重后的）内容总大小不超过上限
+
+        Args:
+            orphans: 可能已不再被引用的内容哈希（URL 的内容更新后旧内容）
+
+        Returns:
+            不再被引用、可以删除的内容哈希
+        """
+        sizes: Dict[str, int] = {}
+        refs: Dict[str, int] = dict.fromkeys(orphans, 0)
+        for entry in self._entries.values():
+            sizes[entry['hash']] = entry['size']
+            refs[entry['hash']] = refs.get(entry['hash'], 0) + 1
+        total = sum(sizes.values())
+        removed = {digest for digest, count in refs.items() if count == 0}
+        if total <= self._max_bytes:
+            return removed
+        for url, entry in sorted(self._entries.items(), key=lambda item: item[1].get('ts', 0)):
+            if total <= self._max_bytes:
+                break
+            del self._entries[url]
+            digest = entry['hash']
+            refs[digest] -= 1
+            if refs[digest] == 0:
+                total -= sizes[digest]
+                removed.add(digest)
+        return removed
+
+    def _remove_blobs(self, digests: Iterable[str]):
+        for digest in digests:
+            try:
+                self._blob_path(digest).unlink()
+            except OSError:
+                pass
+
+    def _load(self):
+        try:
+            if not self._index_file.exists():
+                return
+            data = json.loads(self._index_file.read_text(encoding='utf-8'))
+            if data.get('version') == CACHE_VERSION:
+                self._entries = data.get('entries', {})
+        except Exception as e:
+            logger.warning(f"共享资源缓存索引读取失败，已忽略: {e}")
+            self._entries = {}
+
+
+_asset_store: Optional[SharedAssetStore] = None
+
+
+def get_asset_store() -> SharedAssetStore:
+    """获取全局共享资源缓存（首次调用时从磁盘加载索引）"""
+    global _asset_store
+    if _asset_store is None:
+        import config
+        _asset_store = SharedAssetStore(
+            Path.home() / '.auto-form-filler' / 'asset_cache',
+            max_mb=getattr(config, 'SHARED_ASSET_CACHE_MB', 512),
+            ttl_hours=getattr(config, 'SHARED_ASSET_TTL_HOURS', 168),
+        )
+    return _asset_store
@@ -5,6 +5,8 @@
 import json
 from typing import List, Dict
 
+from core.script_pipeline import ScriptPipeline
+
 
 class AutoFillEngine:
     """自动填写引擎"""
@@ -16,7 +18,10 @@ class AutoFillEngine:
         :param fill_data: 填写数据 [{'key': '字段名', 'value': '值'}, ...]
         :return: JavaScript 代码字符串
         """
+        from core.tencent_docs_filler import TencentDocsFiller
+        
         fill_data_json = json.dumps(fill_data, ensure_ascii=False)
+        label_index = TencentDocsFiller.get_label_index()
         
         js_code = f"""
 (function() {{
@@ -26,7 +31,10 @@ class AutoFillEngine:
     let fillCount = 0;
     const results = [];
     
-    // 首先打印所有找到的输入框信息（调试用）
+    // 标签索引（来自 TencentDocsFiller.get_label_index()）
+    {label_index}
+    
+    // @debug-begin 首先打印所有找到的输入框信息（调试用）
     console.log('📋 扫描页面中的所有输入框:');
     const allInputs = document.querySelectorAll('input[type="text"], input:not([type]), textarea, input[type="tel"], input[type="email"], input[type="number"]');
     allInputs.forEach((input, index) => {{
@@ -39,26 +47,25 @@ class AutoFillEngine:
     
     // 调试版本的findLabel
     function findLabelDebug(input) {{
+        const index = getLabelIndex(input);
+        const labels = index.labelsOf(input);
         let label = '';
-        if (input.labels && input.labels.length > 0) {{
-            label = input.labels[0].innerText || input.labels[0].textContent;
+        if (labels.length > 0) {{
+            label = labels[0].innerText || labels[0].textContent;
         }} else if (input.id) {{
-            const labelEl = document.querySelector(`label[for="${{input.id}}"]`);
+            const labelEl = index.labelForId(input.id);
             if (labelEl) label = labelEl.innerText || labelEl.textContent;
         }}
         if (!label) {{
             let parent = input.parentElement;
             let depth = 0;
             while (parent && depth < 5) {{
-                const labelElement = parent.querySelector('label');
+                const labelElement = index.firstLabel(parent);
                 if (labelElement) {{
                     label = labelElement.innerText || labelElement.textContent;
                     break;
                 }}
-                const text = Array.from(parent.childNodes)
-                    .filter(node => node.nodeType === Node.TEXT_NODE)
-                    .map(node => node.textContent.trim())
-                    .join(' ');
+                const text = index.ownText(parent);
                 if (text && text.length < 100 && text.length > 0) {{
                     label = text;
                     break;
@@ -84,18 +91,22 @@ class AutoFillEngine:
         }}
         return (label || '').trim();
     }}
+    // @debug-end
     
-    // 查找输入框关联的 label
+    // 查找输入框关联的 label（通过标签索引查询，不再逐个扫描 DOM）
     function findLabel(input, doc) {{
+        const index = getLabelIndex(input);
+        
         // 1. 通过 labels 属性
-        if (input.labels && input.labels.length > 0) {{
-            return input.labels[0].innerText || input.labels[0].textContent;
+        const labels = index.labelsOf(input);
+        if (labels.length > 0) {{
+            return labels[0].innerText || labels[0].textContent;
         }}
         
         // 2. 通过 for 属性
         const id = input.id;
         if (id) {{
-            const label = doc.querySelector(`label[for="${{id}}"]`);
+            const label = index.labelForId(id);
             if (label) return label.innerText || label.textContent;
         }}
         
@@ -103,16 +114,13 @@ class AutoFillEngine:
         let parent = input.parentElement;
         let depth = 0;
         while (parent && depth < 3) {{
-            const labelElement = parent.querySelector('label');
+            const labelElement = index.firstLabel(parent);
             if (labelElement) {{
                 return labelElement.innerText || labelElement.textContent;
             }}
             
             // 获取父元素的直接文本（不包括子元素）
-            const text = Array.from(parent.childNodes)
-                .filter(node => node.nodeType === Node.TEXT_NODE)
-                .map(node => node.textContent.trim())
-                .join(' ');
+            const text = index.ownText(parent);
             
             if (text && text.length < 50 && text.length > 0) {{
                 return text;
@@ -288,7 +296,7 @@ class AutoFillEngine:
     return result;
 }})();
 """
-        return js_code
+        return ScriptPipeline.build('auto_fill', js_code)
     
     @staticmethod
     def generate_notification_script(fill_count: int, total_count: int) -> str:
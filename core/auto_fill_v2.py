@@ -10,17 +10,21 @@ class AutoFillEngineV2:
     """自动填写引擎 V2 - 麦客CRM/企业版"""
     
     @staticmethod
-    def generate_fill_script(fill_data: List[Dict[str, str]]) -> str:
+    def generate_fill_script(fill_data: List[Dict[str, str]], two_phase: bool = False) -> str:
         """
         生成自动填写的 JavaScript 脚本（使用共享算法）
+        
+        Args:
+            two_phase: 是否生成两阶段协议脚本（提取字段 / 按 Python 端指令填充）
         """
         from core.tencent_docs_filler import TencentDocsFiller
         
         fill_data_json = json.dumps(fill_data, ensure_ascii=False)
         
         # 获取共享算法和执行逻辑
-        shared_algorithm = TencentDocsFiller.get_shared_match_algorithm()
-        shared_executor = TencentDocsFiller.get_shared_execution_logic()
+        shared_algorithm, shared_executor = TencentDocsFiller.get_shared_script_parts(two_phase)
+        ready_waiter = TencentDocsFiller.get_ready_waiter()
+        label_index = TencentDocsFiller.get_label_index()
         
         js_code = f"""
 (function() {{
@@ -39,22 +43,17 @@ class AutoFillEngineV2:
     // ═══════════════════════════════════════════════════════════════
     {shared_executor}
     
-    // 等待输入框加载完成（优化速度：减少等待时间）
-    function waitForInputs(maxAttempts = 5, interval = 300) {{
-        return new Promise((resolve) => {{
-            let attempts = 0;
-            const checkInputs = setInterval(() => {{
-                const inputs = document.querySelectorAll('input, textarea');
-                attempts++;
-                console.log(`🔍 尝试 ${{attempts}}/${{maxAttempts}}: 找到 ${{inputs.length}} 个输入框`);
-                
-                if (inputs.length > 0 || attempts >= maxAttempts) {{
-                    clearInterval(checkInputs);
-                    console.log(inputs.length > 0 ? '✅ 表单已加载' : '⚠️ 未找到输入框');
-                    resolve(inputs.length > 0);
-                }}
-            }}, interval);
-        }});
+    // 表单就绪检测（来自 TencentDocsFiller.get_ready_waiter()）
+    {ready_waiter}
+    
+    // 标签索引（来自 TencentDocsFiller.get_label_index()）
+    {label_index}
+    
+    // 等待输入框加载完成（MutationObserver 检测，见 TencentDocsFiller.get_ready_waiter()）
+    async function waitForInputs() {{
+        const {{ ready, count, elapsed }} = await waitForFormReady({{ selector: 'input:not([type="hidden"]), textarea' }});
+        console.log(`🔍 表单就绪检测: 找到 ${{count}} 个输入框（${{elapsed}}ms）`);
+        return ready;
     }}
     
     // 获取所有可能的输入框（简化版，直接获取所有input和textarea）
@@ -82,6 +81,8 @@ class AutoFillEngineV2:
         const MAX_LABEL_LENGTH = 50;
         // ⚡️ 主标题的最大长度（麦客的 t- 开头的 ID，允许更长）
         const MAX_TITLE_LENGTH = 150;
+        // 标签、直接文本、容器内输入框数量都从标签索引查询
+        const index = getLabelIndex(input);
         
         // 辅助函数：添加标识符（带去重和清理）
         function addIdentifier(text, priority = 0, isMainTitle = false) {{
@@ -154,11 +155,11 @@ class AutoFillEngineV2:
         let depth = 0;
         while (parent && depth < 6) {{
             // 检查这个容器是否只包含当前这一个输入框
-            const inputsInParent = parent.querySelectorAll('input, textarea');
-            if (inputsInParent.length === 1 && inputsInParent[0] === input) {{
+            const inputsInParent = index.controlCount(parent);
+            if (inputsInParent === 1) {{
                 // 这是直接包含该输入框的容器
                 formItemContainer = parent;
-            }} else if (inputsInParent.length > 1) {{
+            }} else if (inputsInParent > 1) {{
                 // 包含多个输入框，停止向上查找
                 break;
             }}
@@ -192,16 +193,14 @@ class AutoFillEngineV2:
         }}
         
         // 2. Label 标签
-        if (input.labels && input.labels.length > 0) {{
-            input.labels.forEach(label => {{
-                const text = (label.innerText || label.textContent || '').trim();
-                addIdentifier(text, 85);
-            }});
-        }}
+        index.labelsOf(input).forEach(label => {{
+            const text = (label.innerText || label.textContent || '').trim();
+            addIdentifier(text, 85);
+        }});
         
         // 3. 通过 for 属性查找 label
         if (input.id) {{
-            const label = document.querySelector(`label[for="${{input.id}}"]`);
+            const label = index.labelForId(input.id);
             if (label) {{
                 const text = (label.innerText || label.textContent || '').trim();
                 addIdentifier(text, 85);
@@ -228,7 +227,7 @@ class AutoFillEngineV2:
                 // 检查是否已经遍历到了表单级别的容器，如果是就停止
                 const parentClasses = parent.className || '';
                 if (parentClasses.includes('form') || parentClasses.includes('wrapper') || 
-                    parent.tagName === 'FORM' || parent.querySelectorAll('input, textarea').length > 1) {{
+                    parent.tagName === 'FORM' || index.controlCount(parent) > 1) {{
                     // 这是表单容器，停止遍历
                     console.log(`[麦客] 到达表单容器，停止向上遍历`);
                     break;
@@ -461,6 +460,7 @@ class AutoFillEngineV2:
             return {{
                 fillCount: 0,
                 totalCount: fillData.length,
+                status: 'failed',
                 success: false,
                 error: '未找到任何输入框',
                 results: []
@@ -478,7 +478,8 @@ class AutoFillEngineV2:
             allInputs: allInputs,
             getIdentifiers: getInputIdentifiers,
             fillInput: fillInputMike,
-            onProgress: (msg) => console.log(msg)
+            onProgress: (msg) => console.log(msg),
+            batchWrites: true   // 普通文本框批量写入，值未保留时再用 fillInputMike 重试
         }});
         
         const result = await executor.execute();
@@ -499,6 +500,7 @@ class AutoFillEngineV2:
         window.__autoFillResult__ = {{
             fillCount: 0,
             totalCount: fillData.length,
+            status: 'failed',
             success: false,
             error: error.message || '未知错误',
             results: []
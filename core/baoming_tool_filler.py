@@ -374,6 +374,8 @@ class BaomingToolFiller:
         self.eid: Optional[str] = None
         self.form_title: Optional[str] = None  # 表单标题（sign_name）
         self.form_short_info: Optional[Dict] = None  # 表单简要信息
+        self._option_indexes: Optional[List] = None  # 选择题选项索引（见 core.option_index）
+        self._option_indexes_source: Optional[List[Dict]] = None
         
     def initialize(self, url: str, card_id: Optional[str] = None) -> Tuple[bool, str]:
         """
@@ -613,12 +615,17 @@ class BaomingToolFiller:
         Returns:
             List[Dict]: 填充后的表单数据
         """
-        from core.tencent_docs_filler import SharedMatchAlgorithm
-        
+        from core.keyword_index import CompiledKeywordIndex
+
         result = []
-        
+
         print(f"  🎯 [报名工具] 开始智能匹配（使用共享算法），共有 {len(self.form_fields)} 个字段，{len(card_config)} 个名片项")
-        
+
+        # ⚡️ 每张名片只编译一次关键词索引，避免每个字段重复清理/分割所有 key
+        keyword_index = CompiledKeywordIndex([config.get('name', '') for config in card_config])
+        # ⚡️ 选项索引每次加载表单只建一次，同一 eid 的所有名片共用
+        option_indexes = self._get_option_indexes()
+
         for index, field in enumerate(self.form_fields):
             field_name = field.get('field_name', '')
             field_key = field.get('field_key', '')
@@ -632,20 +639,15 @@ class BaomingToolFiller:
             
             print(f"  📋 字段 #{index+1}: \"{field_name}\"")
             
-            # 遍历所有名片配置找最佳匹配
-            for config in card_config:
-                config_name = config.get('name', '')  # 名片上的key
-                config_value = config.get('value', '')
-                
-                # 使用共享匹配算法
-                score_result = SharedMatchAlgorithm.match_keyword(field_name, config_name)
-
-                if score_result['matched'] and score_result['score'] > best_match['score']:
-                    best_match = {
-                        'value': config_value,
-                        'score': score_result['score'],
-                        'matched_key': config_name
-                    }
+            # 在名片索引中找最佳匹配（与逐个调用共享匹配算法结果一致）
+            score_result = keyword_index.lookup(field_name)
+            if score_result['matched']:
+                config = card_config[score_result['index']]
+                best_match = {
+                    'value': config.get('value', ''),
+                    'score': score_result['score'],
+                    'matched_key': config.get('name', '')  # 名片上的key
+                }
             
             matched_value = ''
             if best_match['score'] >= 50:  # 阈值50
@@ -663,23 +665,11 @@ class BaomingToolFiller:
             
             if options and matched_value:
                 print(f"     🔄 [调试] 尝试匹配选项 Key，当前值: {matched_value}")
-                matched_option = None
                 
-                # 1. 精确匹配
-                for opt in options:
-                    if str(opt.get('value', '')).strip() == str(matched_value).strip():
-                        matched_option = opt
-                        break
-                
-                # 2. 如果没精确匹配，尝试模糊匹配
-                if not matched_option:
-                    for opt in options:
-                        opt_val = str(opt.get('value', '')).strip()
-                        # 选项值包含名片值，或名片值包含选项值
-                        if opt_val and (str(matched_value) in opt_val or opt_val in str(matched_value)):
-                            matched_option = opt
-                            print(f"     ⚠️ [调试] 模糊匹配成功: {matched_value} -> {opt_val}")
-                            break
+                # 1. 精确匹配 2. 如果没精确匹配，尝试模糊匹配（选项值包含名片值，或名片值包含选项值）
+                matched_option, fuzzy = option_indexes[index].find(matched_value)
+                if matched_option and fuzzy:
+                    print(f"     ⚠️ [调试] 模糊匹配成功: {matched_value} -> {str(matched_option.get('value', '')).strip()}")
                             
                 if matched_option:
                     new_field_value = matched_option.get('key')
@@ -710,6 +700,15 @@ class BaomingToolFiller:
         
         return result
 
+    def _get_option_indexes(self) -> List:
+        """获取当前表单的选项索引（表单字段重新加载后重建）"""
+        from core.option_index import get_form_option_indexes
+
+        if self._option_indexes_source is not self.form_fields:
+            self._option_indexes = get_form_option_indexes(self.eid, self.form_fields)
+            self._option_indexes_source = self.form_fields
+        return self._option_indexes
+
     def _match_field_name(self, form_field: str, config_name: str) -> bool:
         """保留旧方法接口，使用共享算法（为了兼容性）"""
         from core.tencent_docs_filler import SharedMatchAlgorithm
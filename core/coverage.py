@@ -0,0 +1,158 @@
+"""
+离线填写覆盖率计算
+不打开 WebView，用已保存的表单结构（字段标识符）和名片 key 估算每个 名片 × 链接 的填写率，
+在填写前发现名片 key 写得不好的情况。
+
+- 每张名片只编译一次关键词索引，再依次匹配所有表单
+- 名片按批分发到进程池；表单结构在每个进程启动时传入一次，不随任务重复序列化
+- 匹配规则与两阶段协议的 MatchService 一致（贪心或全局最优分配）
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+# 每个结果中保留的未匹配字段标题数
+MAX_UNMATCHED_TITLES = 10
+
+# 进程内的表单结构（由 _init_worker 设置）
+_worker_forms: Dict[str, List[List[str]]] = {}
+_worker_optimal = False
+
+
+def _field_title(identifiers: Sequence[str]) -> str:
+    return identifiers[0] if identifiers else ''
+
+
+def card_coverage(keys: Sequence[str], forms: Dict[str, List[List[str]]],
+                  optimal: bool = False) -> Dict[str, Dict]:
+    """
+    计算一张名片在所有表单上的覆盖率
+
+    Args:
+        keys: 名片 key 列表
+        forms: { 链接URL: [[字段标识符, ...], ...] }
+        optimal: 是否使用全局最优分配
+
+    Returns:
+        Dict[str, Dict]: { 链接URL: { matched, total, rate, unmatched: [字段位置, ...], used_keys: [key 下标, ...] } }
+    """
+    if optimal:
+        from core.field_assignment import OptimalFieldAssignment
+    else:
+        from core.keyword_index import CompiledKeywordIndex
+        keyword_index = CompiledKeywordIndex(keys)
+
+    coverage = {}
+    for url, fields in forms.items():
+        fields = [list(identifiers) for identifiers in fields if identifiers]
+        if optimal:
+            matches = OptimalFieldAssignment.assign(fields, keys, allow_reuse=True)
+        else:
+            matches = []
+            for identifiers in fields:
+                result = keyword_index.lookup(identifiers)
+                matches.append((result['index'], result['score']) if result['matched'] else None)
+
+        matched = sum(1 for match in matches if match is not None)
+        coverage[url] = {
+            'matched': matched,
+            'total': len(fields),
+            'rate': round(matched / len(fields), 4) if fields else 0.0,
+            'unmatched': [position for position, match in enumerate(matches) if match is None],
+            'used_keys': sorted({match[0] for match in matches if match is not None})
+        }
+    return coverage
+
+
+def _init_worker(forms: Dict[str, List[List[str]]], optimal: bool):
+    global _worker_forms, _worker_optimal
+    _worker_forms = forms
+    _worker_optimal = optimal
+
+
+def _run_batch(cards: List[Dict]) -> List[Dict]:
+    """进程池任务：一批名片在所有表单上的覆盖率"""
+    return [{'card': card, 'coverage': card_coverage(card['keys'], _worker_forms, _worker_optimal)}
+            for card in cards]
+
+
+def compute_coverage(cards: List[Dict], forms: Dict[str, List[List[str]]], optimal: bool = False,
+                     workers: Optional[int] = None, batch_size: int = 16, progress=None) -> Dict:
+    """
+    计算所有 名片 × 链接 的覆盖率矩阵
+
+    Args:
+        cards: [{ 'id', 'name', 'user', 'keys': [key, ...] }, ...]
+        forms: { 链接URL: [[字段标识符, ...], ...] }
+        optimal: 是否使用全局最优分配
+        workers: 进程数（默认 CPU 核数，为 1 时在当前进程计算）
+        batch_size: 每个任务包含的名片数
+        progress: 进度回调 progress(已完成名片数, 名片总数)
+
+    Returns:
+        Dict: { cards: [{ id, name, user, avg_rate, weak_keys, links: { URL: {...} } }],
+                links: { URL: { total, avg_rate, best_rate, never_matched: [标题, ...] } } }
+    """
+    workers = workers or os.cpu_count() or 1
+    batches = [cards[i:i + batch_size] for i in range(0, len(cards), batch_size)]
+
+    rows = []
+    if workers == 1 or len(batches) <= 1:
+        _init_worker(forms, optimal)
+        for batch in batches:
+            rows.extend(_run_batch(batch))
+            if progress:
+                progress(len(rows), len(cards))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(forms, optimal)) as executor:
+            for batch_rows in executor.map(_run_batch, batches):
+                rows.extend(batch_rows)
+                if progress:
+                    progress(len(rows), len(cards))
+
+    return _summarize(rows, forms)
+
+
+def _summarize(rows: List[Dict], forms: Dict[str, List[List[str]]]) -> Dict:
+    """汇总：名片的平均填写率和从未匹配的 key，链接的最佳填写率和没有任何名片能匹配的字段"""
+    card_reports = []
+    link_rates: Dict[str, List[float]] = {url: [] for url in forms}
+    link_unmatched: Dict[str, Optional[set]] = {url: None for url in forms}
+    titles = {url: [_field_title(identifiers) for identifiers in fields if identifiers]
+              for url, fields in forms.items()}
+
+    for row in rows:
+        card, coverage = row['card'], row['coverage']
+        used = set()
+        for url, result in coverage.items():
+            used.update(result['used_keys'])
+            link_rates[url].append(result['rate'])
+            unmatched = set(result['unmatched'])
+            link_unmatched[url] = unmatched if link_unmatched[url] is None else link_unmatched[url] & unmatched
+
+        rates = [result['rate'] for result in coverage.values()]
+        card_reports.append({
+            'id': card.get('id'),
+            'name': card.get('name'),
+            'user': card.get('user'),
+            'avg_rate': round(sum(rates) / len(rates), 4) if rates else 0.0,
+            'weak_keys': [key for index, key in enumerate(card['keys']) if index not in used],
+            'links': {url: {
+                'matched': result['matched'],
+                'total': result['total'],
+                'rate': result['rate'],
+                'unmatched': [titles[url][position] for position in result['unmatched'][:MAX_UNMATCHED_TITLES]]
+            } for url, result in coverage.items()}
+        })
+
+    link_reports = {}
+    for url, rates in link_rates.items():
+        link_reports[url] = {
+            'total': len(titles[url]),
+            'avg_rate': round(sum(rates) / len(rates), 4) if rates else 0.0,
+            'best_rate': max(rates) if rates else 0.0,
+            'never_matched': [titles[url][position] for position in sorted(link_unmatched[url] or ())]
+        }
+
+    return {'cards': card_reports, 'links': link_reports}
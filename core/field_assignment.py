@@ -0,0 +1,151 @@
+"""
+字段全局最优分配
+贪心匹配（逐个输入框取当前最高分、已用的名片 key 不再参与）在表单中存在多个相似标题
+（多个电话、多个姓名）时容易错配。这里基于完整的分数矩阵求解最大权二分匹配
+（匈牙利算法），一次性得到 表单字段 → 名片字段 的固定分配方案，再交给页面脚本执行
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.tencent_docs_filler import SharedMatchAlgorithm
+
+
+class OptimalFieldAssignment:
+    """基于匈牙利算法的字段分配"""
+
+    MATCH_THRESHOLD = 50
+
+    @staticmethod
+    def solve(scores, threshold: int = MATCH_THRESHOLD) -> List[Tuple[int, int]]:
+        """
+        求解最大权二分匹配
+
+        Args:
+            scores: 分数矩阵 (字段数, key数)，numpy.ndarray
+            threshold: 低于阈值的配对视为不可用
+
+        Returns:
+            List[Tuple[int, int]]: (字段下标, key 下标) 列表，按字段下标排序；
+            每个字段、每个 key 最多出现一次，总分最大
+        """
+        import numpy as np
+
+        weights = np.where(scores >= threshold, scores, 0.0).astype(np.float64)
+        if weights.size == 0 or not weights.any():
+            return []
+
+        # 匈牙利算法要求行数 <= 列数
+        transposed = weights.shape[0] > weights.shape[1]
+        if transposed:
+            weights = weights.T
+        n, m = weights.shape
+        cost = weights.max() - weights
+
+        # 势函数 u/v、列匹配 p（p[j] 为匹配到第 j 列的行，1 起始，0 表示未匹配）
+        u = np.zeros(n + 1)
+        v = np.zeros(m + 1)
+        p = np.zeros(m + 1, dtype=np.int64)
+        way = np.zeros(m + 1, dtype=np.int64)
+
+        for i in range(1, n + 1):
+            p[0] = i
+            j0 = 0
+            minv = np.full(m + 1, np.inf)
+            used = np.zeros(m + 1, dtype=bool)
+            while True:
+                used[j0] = True
+                i0 = p[j0]
+                free = ~used[1:]
+                # 以当前行 i0 更新所有未使用列的最小松弛量
+                reduced = cost[i0 - 1] - u[i0] - v[1:]
+                better = free & (reduced < minv[1:])
+                minv[1:][better] = reduced[better]
+                way[1:][better] = j0
+                candidates = np.where(free, minv[1:], np.inf)
+                j1 = int(np.argmin(candidates)) + 1
+                delta = candidates[j1 - 1]
+                used_cols = np.flatnonzero(used)
+                u[p[used_cols]] += delta
+                v[used_cols] -= delta
+                minv[1:][free] -= delta
+                j0 = j1
+                if p[j0] == 0:
+                    break
+            # 沿增广路径翻转匹配
+            while True:
+                j1 = way[j0]
+                p[j0] = p[j1]
+                j0 = j1
+                if j0 == 0:
+                    break
+
+        pairs = []
+        for j in range(1, m + 1):
+            if p[j] == 0:
+                continue
+            row, col = int(p[j]) - 1, j - 1
+            if weights[row, col] <= 0:
+                continue
+            pairs.append((col, row) if transposed else (row, col))
+        pairs.sort()
+        return pairs
+
+    @staticmethod
+    def assign(fields: Sequence, keys: Sequence[str], allow_reuse: bool = False,
+               threshold: int = MATCH_THRESHOLD) -> List[Optional[Tuple[int, float]]]:
+        """
+        为每个表单字段分配名片 key
+
+        Args:
+            fields: 表单字段列表，每项为标题字符串或标识符列表
+            keys: 名片 key 列表
+            allow_reuse: 最优分配后仍未分配的字段，是否退回到各自的最高分 key
+                         （与共享执行器“名片数据可以被多次使用”的语义一致）
+
+        Returns:
+            List[Optional[Tuple[int, float]]]: 每个字段的 (key 下标, 分数)，未分配为 None
+        """
+        scores = SharedMatchAlgorithm.score_matrix(fields, keys)
+        plan: List[Optional[Tuple[int, float]]] = [None] * len(fields)
+        for row, col in OptimalFieldAssignment.solve(scores, threshold):
+            plan[row] = (col, float(scores[row, col]))
+
+        if allow_reuse:
+            for row, col in enumerate(SharedMatchAlgorithm.best_matches(scores, threshold)):
+                if plan[row] is None and col is not None:
+                    plan[row] = (col, float(scores[row, col]))
+        return plan
+
+    @staticmethod
+    def build_plan(titles: Sequence[str], fill_data: List[Dict], allow_reuse: bool = False) -> Dict[str, Dict]:
+        """
+        生成注入页面的分配方案
+
+        Args:
+            titles: 页面提取到的表单标题列表
+            fill_data: 名片数据 [{'key': ..., 'value': ...}, ...]
+
+        Returns:
+            Dict: { 清理后的标题: { index: 名片数据下标, key: 名片key, score: 分数 } }
+            页面脚本通过 lookupAssignment() 按清理后的标题查找
+        """
+        unique_titles = []
+        seen = set()
+        for title in titles:
+            clean_title = SharedMatchAlgorithm.clean_text(title)
+            if clean_title and clean_title not in seen:
+                seen.add(clean_title)
+                unique_titles.append(title)
+
+        keys = [item.get('key', '') for item in fill_data]
+        plan = {}
+        for title, assigned in zip(unique_titles,
+                                   OptimalFieldAssignment.assign(unique_titles, keys, allow_reuse)):
+            if assigned is None:
+                continue
+            key_index, score = assigned
+            plan[SharedMatchAlgorithm.clean_text(title)] = {
+                'index': key_index,
+                'key': keys[key_index],
+                'score': score
+            }
+        return plan
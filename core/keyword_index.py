@@ -0,0 +1,150 @@
+"""
+预编译关键词索引
+一张名片只编译一次：预先清理/分割所有 key 的子关键词，建立字符倒排索引和字符集合，
+查找时只对有可能达到匹配阈值（50分）的候选计算分数；
+子关键词包含于标题的情况由 Aho–Corasick 自动机一次扫描全部找出
+评分规则与 SharedMatchAlgorithm.match_keyword 完全一致
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.aho_corasick import AhoCorasick
+from core.tencent_docs_filler import SharedMatchAlgorithm
+
+
+class CompiledKeywordIndex:
+    """
+    名片关键词索引
+
+    使用方法：
+        index = CompiledKeywordIndex([config['name'] for config in card_config])
+        result = index.lookup(field_name)
+        if result['matched']:
+            config = card_config[result['index']]
+    """
+
+    MATCH_THRESHOLD = 50
+
+    def __init__(self, keys: Sequence[str]):
+        """
+        Args:
+            keys: 名片上的 key 列表（支持 |,;，；、 分隔的多个关键词）
+        """
+        self.keys: List[str] = list(keys)
+        # 子关键词按 (key 下标, 子关键词下标) 的顺序编号，编号越小优先级越高
+        self.sub_keys: List[str] = []
+        self.owners: List[int] = []
+        self.char_sets: List[frozenset] = []
+        # 字符 -> [(子关键词编号, 该字符在子关键词中的出现次数)]
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+        for key_index, key in enumerate(self.keys):
+            seen = set()
+            for sub_key in SharedMatchAlgorithm.get_sub_keywords(key):
+                # 空子关键词不参与评分；同一 key 内重复的子关键词不可能得到更高分
+                if not sub_key or sub_key in seen:
+                    continue
+                seen.add(sub_key)
+                self._add_sub_key(key_index, sub_key)
+
+        # 不同 key 可能有相同的子关键词：自动机按去重后的文本建立，命中后展开为子关键词编号
+        pattern_ids: Dict[str, int] = {}
+        self.pattern_owners: List[List[int]] = []
+        for sub_id, sub_key in enumerate(self.sub_keys):
+            if sub_key not in pattern_ids:
+                pattern_ids[sub_key] = len(self.pattern_owners)
+                self.pattern_owners.append([])
+            self.pattern_owners[pattern_ids[sub_key]].append(sub_id)
+        self.automaton = AhoCorasick(list(pattern_ids))
+
+    def _add_sub_key(self, key_index: int, sub_key: str):
+        sub_id = len(self.sub_keys)
+        self.sub_keys.append(sub_key)
+        self.owners.append(key_index)
+        self.char_sets.append(frozenset(sub_key))
+
+        counts: Dict[str, int] = {}
+        for c in sub_key:
+            counts[c] = counts.get(c, 0) + 1
+        for c, count in counts.items():
+            self.postings[c].append((sub_id, count))
+
+    def _candidates(self, clean_identifier: str) -> List[int]:
+        """
+        返回可能达到阈值的子关键词编号
+
+        子关键词 s 与标识符 t 得分 >= 50 只有以下几种情况：
+        - s == t 或 s 包含于 t：s 的每个字符都出现在 t 中
+        - t 包含于 s：t 的字符集合是 s 字符集合的子集
+        - 字符相似度 >= 5/6：s 中至少 5/6 的字符（按出现次数）出现在 t 中
+        """
+        identifier_chars = set(clean_identifier)
+        weighted: Dict[int, int] = defaultdict(int)
+        distinct: Dict[int, int] = defaultdict(int)
+        for c in identifier_chars:
+            for sub_id, count in self.postings.get(c, ()):
+                weighted[sub_id] += count
+                distinct[sub_id] += 1
+
+        candidates = []
+        for sub_id, hit in weighted.items():
+            if hit * 60 >= self.MATCH_THRESHOLD * len(self.sub_keys[sub_id]) \
+                    or distinct[sub_id] == len(identifier_chars):
+                candidates.append(sub_id)
+        return candidates
+
+    def lookup(self, identifiers) -> Dict:
+        """
+        查找与标识符最匹配的 key
+
+        Args:
+            identifiers: 标识符列表或单个标题字符串
+
+        Returns:
+            Dict: { matched, score, identifier, matchedKey, key, index }
+            与逐个调用 match_keyword 取最高分（同分取靠前的 key）的结果一致；
+            未达到阈值时 index 为 None
+        """
+        if isinstance(identifiers, str):
+            identifiers = [identifiers]
+
+        best: Optional[Tuple[float, int, int]] = None  # (分数, 子关键词编号, 标识符下标)
+        best_identifier = None
+
+        for identifier_index, identifier in enumerate(identifiers):
+            clean_identifier = SharedMatchAlgorithm.clean_text(identifier)
+            if not clean_identifier:
+                continue
+
+            # 包含于标识符的子关键词（含完全相同）：一次扫描全部找出
+            contained = set()
+            for pattern_id in self.automaton.find_all(clean_identifier):
+                contained.update(self.pattern_owners[pattern_id])
+
+            for sub_id in self._candidates(clean_identifier):
+                sub_key = self.sub_keys[sub_id]
+                if sub_id in contained:
+                    score = SharedMatchAlgorithm.contained_score(sub_key, clean_identifier)
+                else:
+                    score = SharedMatchAlgorithm.uncontained_score(sub_key, clean_identifier)
+                if score < self.MATCH_THRESHOLD:
+                    continue
+                if best is None or score > best[0] \
+                        or (score == best[0] and (sub_id, identifier_index) < (best[1], best[2])):
+                    best = (score, sub_id, identifier_index)
+                    best_identifier = identifier
+
+        if best is None:
+            return {'matched': False, 'identifier': None, 'score': 0, 'matchedKey': None,
+                    'key': None, 'index': None}
+
+        score, sub_id, _ = best
+        key_index = self.owners[sub_id]
+        return {
+            'matched': True,
+            'identifier': best_identifier,
+            'score': score,
+            'matchedKey': self.sub_keys[sub_id],
+            'key': self.keys[key_index],
+            'index': key_index
+        }
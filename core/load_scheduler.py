@@ -0,0 +1,219 @@
+"""
+WebView 加载调度（滑动窗口）
+原来每个链接固定 2 个一批加载，整批加载完（最慢的页面最长要等 30 秒超时）才开始下一批。
+这里改为滑动窗口：同时加载的页面数不超过窗口大小，任意一个结束就立即开始下一个。
+
+窗口大小自动调整（加性增、乘性减）：
+- 页面加载耗时不超过目标耗时：每完成一个窗口的页面，窗口 +1
+- 加载失败、超时或耗时超过目标的 2 倍：窗口减半
+- 渲染进程内存合计或 CPU 占用超过上限：窗口 -1，回落到上限以下之前不再扩大
+- 同一域名同时加载的页面数有上限，避免触发表单平台的频率限制
+"""
+import os
+import time
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# 耗时超过目标耗时的多少倍视为慢加载
+SLOW_FACTOR = 2.0
+
+# 平均加载耗时的平滑系数
+EWMA_ALPHA = 0.3
+
+
+class LoadScheduler:
+    """
+    滑动窗口加载调度器（不依赖 Qt，由填充窗口在加载开始/结束时调用）
+
+    使用方法：
+        scheduler = LoadScheduler.from_config()
+        for info in scheduler.take(queue, key_of=key, domain_of=domain):
+            start_loading(info)
+        scheduler.finished(key(info), success=True)    # 加载完成/失败/超时后调用，再次 take()
+        scheduler.update_resources(memory_mb, cpu_percent)
+    """
+
+    def __init__(self, min_window: int = 1, max_window: int = 8, initial_window: int = 2,
+                 domain_limit: int = 4, target_load_time: float = 5.0,
+                 memory_limit_mb: float = 3072, cpu_limit: float = 85.0):
+        self.min_window = max(1, min_window)
+        self.max_window = max(self.min_window, max_window)
+        self.window = min(max(initial_window, self.min_window), self.max_window)
+        self.domain_limit = max(1, domain_limit)
+        self.target_load_time = target_load_time
+        self.memory_limit_mb = memory_limit_mb
+        self.cpu_limit = cpu_limit
+        self.average_load_time: Optional[float] = None
+        self.under_pressure = False
+        self._inflight: Dict[Hashable, Tuple[str, float]] = {}  # key → (域名, 开始时间)
+        self._credit = 0
+
+    @classmethod
+    def from_config(cls) -> 'LoadScheduler':
+        import config
+        return cls(
+            min_window=getattr(config, 'LOAD_WINDOW_MIN', 1),
+            max_window=getattr(config, 'LOAD_WINDOW_MAX', 8),
+            initial_window=getattr(config, 'LOAD_WINDOW_INITIAL', 2),
+            domain_limit=getattr(config, 'LOAD_DOMAIN_LIMIT', 4),
+            target_load_time=getattr(config, 'LOAD_TARGET_TIME', 5.0),
+            memory_limit_mb=getattr(config, 'LOAD_MEMORY_LIMIT_MB', 3072),
+            cpu_limit=getattr(config, 'LOAD_CPU_LIMIT', 85.0),
+        )
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def _domain_count(self, domain: str) -> int:
+        return sum(1 for inflight_domain, _ in self._inflight.values() if inflight_domain == domain)
+
+    def take(self, queue: List, key_of: Callable, domain_of: Callable, now: Optional[float] = None) -> List:
+        """
+        从队列中取出现在可以开始加载的任务并记为加载中（保持队列顺序；域名并发已满的任务留在队列中）
+
+        Args:
+            queue: 待加载任务列表（原地修改）
+            key_of: 任务 → 唯一标识（finished() 使用同一标识）
+            domain_of: 任务 → 域名
+        """
+        now = time.time() if now is None else now
+        taken = []
+        index = 0
+        while index < len(queue) and len(self._inflight) < self.window:
+            item = queue[index]
+            domain = domain_of(item) or ''
+            if self._domain_count(domain) >= self.domain_limit:
+                index += 1
+                continue
+            queue.pop(index)
+            self._inflight[key_of(item)] = (domain, now)
+            taken.append(item)
+        return taken
+
+    def finished(self, key: Hashable, success: bool = True, now: Optional[float] = None) -> Optional[float]:
+        """
+        任务加载结束（完成/失败/超时），按耗时调整窗口
+
+        Returns:
+            加载耗时（秒）；不是由本调度器开始的任务返回 None
+        """
+        entry = self._inflight.pop(key, None)
+        if entry is None:
+            return None
+        elapsed = (time.time() if now is None else now) - entry[1]
+        if self.average_load_time is None:
+            self.average_load_time = elapsed
+        else:
+            self.average_load_time += EWMA_ALPHA * (elapsed - self.average_load_time)
+
+        if not success or elapsed > self.target_load_time * SLOW_FACTOR:
+            self.window = max(self.min_window, self.window // 2)
+            self._credit = 0
+        elif elapsed <= self.target_load_time and not self.under_pressure:
+            self._credit += 1
+            if self._credit >= self.window:
+                self.window = min(self.max_window, self.window + 1)
+                self._credit = 0
+        return elapsed
+
+    def discard(self, alive_keys: Iterable[Hashable]):
+        """移除不在 alive_keys 中的加载中任务（WebView 已销毁、队列已清空），不调整窗口"""
+        alive = set(alive_keys)
+        for key in [key for key in self._inflight if key not in alive]:
+            del self._inflight[key]
+
+    def update_resources(self, memory_mb: Optional[float] = None, cpu_percent: Optional[float] = None):
+        """按渲染进程资源占用调整窗口（None 表示无法获取，不参与调整）"""
+        over = ((memory_mb is not None and memory_mb > self.memory_limit_mb) or
+                (cpu_percent is not None and cpu_percent > self.cpu_limit))
+        if over:
+            self.window = max(self.min_window, self.window - 1)
+            self._credit = 0
+        self.under_pressure = over
+
+    def stats(self) -> Dict:
+        return {
+            'window': self.window,
+            'inflight': len(self._inflight),
+            'average_load_time': round(self.average_load_time, 2) if self.average_load_time is not None else None,
+            'under_pressure': self.under_pressure,
+        }
+
+
+class RendererMonitor:
+    """
+    渲染进程资源采样：内存（RSS 合计，MB）和 CPU 占用（占整机的百分比）
+
+    优先使用 psutil（可选依赖）；没有 psutil 时在 Linux 上读取 /proc，其他平台返回 (None, None)
+    """
+
+    def __init__(self, min_interval: float = 2.0):
+        self.min_interval = min_interval
+        self._last_sample = 0.0
+        self._last_result: Tuple[Optional[float], Optional[float]] = (None, None)
+        self._processes: Dict[int, object] = {}  # psutil.Process 缓存（cpu_percent 需要同一对象）
+        self._cpu_times: Dict[int, Tuple[float, float]] = {}  # /proc 采样：pid → (CPU 秒数, 采样时间)
+
+    def sample(self, pids: Iterable[int]) -> Tuple[Optional[float], Optional[float]]:
+        """采样（间隔小于 min_interval 时返回上一次的结果）"""
+        now = time.time()
+        if now - self._last_sample < self.min_interval:
+            return self._last_result
+        self._last_sample = now
+        pids = {pid for pid in pids if pid and pid > 0}
+        if not pids:
+            self._last_result = (None, None)
+            return self._last_result
+        try:
+            import psutil
+        except ImportError:
+            psutil = None
+        if psutil is not None:
+            self._last_result = self._sample_psutil(psutil, pids)
+        elif os.path.isdir('/proc'):
+            self._last_result = self._sample_proc(pids, now)
+        else:
+            self._last_result = (None, None)
+        return self._last_result
+
+    def _sample_psutil(self, psutil, pids) -> Tuple[Optional[float], Optional[float]]:
+        memory = 0.0
+        cpu = 0.0
+        for pid in list(self._processes):
+            if pid not in pids:
+                del self._processes[pid]
+        for pid in pids:
+            try:
+                process = self._processes.get(pid)
+                if process is None:
+                    process = self._processes[pid] = psutil.Process(pid)
+                memory += process.memory_info().rss / (1024 * 1024)
+                cpu += process.cpu_percent(None)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                self._processes.pop(pid, None)
+        return memory, cpu / (psutil.cpu_count() or 1)
+
+    def _sample_proc(self, pids, now: float) -> Tuple[Optional[float], Optional[float]]:
+        page_size = os.sysconf('SC_PAGE_SIZE')
+        ticks = os.sysconf('SC_CLK_TCK')
+        memory = 0.0
+        cpu = 0.0
+        has_cpu = False
+        cpu_times = {}
+        for pid in pids:
+            try:
+                with open(f'/proc/{pid}/statm') as f:
+                    memory += int(f.read().split()[1]) * page_size / (1024 * 1024)
+                with open(f'/proc/{pid}/stat') as f:
+                    # 进程名可能包含空格，从最后一个 ) 之后开始按字段切分（utime、stime 为第 14、15 个字段）
+                    fields = f.read().rsplit(')', 1)[1].split()
+                seconds = (int(fields[11]) + int(fields[12])) / ticks
+            except (OSError, IndexError, ValueError):
+                continue
+            cpu_times[pid] = (seconds, now)
+            previous = self._cpu_times.get(pid)
+            if previous and now > previous[1]:
+                cpu += (seconds - previous[0]) / (now - previous[1]) * 100
+                has_cpu = True
+        self._cpu_times = cpu_times
+        return memory, (cpu / (os.cpu_count() or 1) if has_cpu else None)
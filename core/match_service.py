@@ -0,0 +1,111 @@
+"""
+Python 端字段匹配服务（两阶段填充协议）
+1. 页面执行精简的提取脚本，返回字段描述 { idx, identifiers, type, options }
+2. 本服务用 core 中的匹配实现计算 字段 → 名片字段 的分配，生成填充指令
+3. 页面执行填充脚本，按指令中的 data-af-idx 定位字段并填值
+
+同一表单（字段标识相同）+ 同一组名片 key 的匹配结果会被缓存，
+多个 WebView 打开同一表单时只需匹配一次
+"""
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.keyword_index import CompiledKeywordIndex
+from core.tencent_docs_filler import SharedMatchAlgorithm
+
+
+class MatchService:
+    """字段匹配服务"""
+
+    # 缓存的表单数（按 表单字段 + 名片 key 组合计）
+    CACHE_SIZE = 128
+
+    _cache: "OrderedDict[tuple, List[Optional[Tuple[int, float]]]]" = OrderedDict()
+    _hits = 0
+    _misses = 0
+
+    @staticmethod
+    def form_signature(fields: Sequence[Dict]) -> tuple:
+        """表单签名：所有字段的标识符（顺序相关）"""
+        return tuple(tuple(field.get('identifiers') or ()) for field in fields)
+
+    @classmethod
+    def match(cls, fields: Sequence[Dict], keys: Sequence[str],
+              optimal: bool = False) -> List[Optional[Tuple[int, float]]]:
+        """
+        计算每个字段匹配到的名片 key
+
+        Args:
+            fields: 页面提取的字段描述列表
+            keys: 名片 key 列表
+            optimal: 是否使用全局最优分配（匈牙利算法），否则逐个字段取最高分
+
+        Returns:
+            List[Optional[Tuple[int, float]]]: 每个字段的 (key 下标, 分数)，未匹配为 None
+        """
+        cache_key = (cls.form_signature(fields), tuple(keys), optimal)
+        cached = cls._cache.get(cache_key)
+        if cached is not None:
+            cls._cache.move_to_end(cache_key)
+            cls._hits += 1
+            return cached
+        cls._misses += 1
+
+        identifiers = [list(field.get('identifiers') or ()) for field in fields]
+        if optimal:
+            from core.field_assignment import OptimalFieldAssignment
+            # 与共享执行器一致：名片数据可以被多次使用
+            matches = OptimalFieldAssignment.assign(identifiers, keys, allow_reuse=True)
+        else:
+            keyword_index = CompiledKeywordIndex(keys)
+            matches = []
+            for field_identifiers in identifiers:
+                result = keyword_index.lookup(field_identifiers)
+                matches.append((result['index'], result['score']) if result['matched'] else None)
+
+        cls._cache[cache_key] = matches
+        if len(cls._cache) > cls.CACHE_SIZE:
+            cls._cache.popitem(last=False)
+        return matches
+
+    @classmethod
+    def build_instructions(cls, fields: Sequence[Dict], fill_data: List[Dict],
+                           optimal: bool = False) -> List[Dict]:
+        """
+        生成页面填充指令
+
+        Args:
+            fields: 页面提取的字段描述列表
+            fill_data: 名片数据 [{'key': ..., 'value': ...}, ...]
+
+        Returns:
+            List[Dict]: [{ idx, selector, title, key, value, score }, ...]，按字段顺序排列
+        """
+        keys = [item.get('key', '') for item in fill_data]
+        instructions = []
+        for field, matched in zip(fields, cls.match(fields, keys, optimal)):
+            if matched is None:
+                continue
+            key_index, score = matched
+            identifiers = field.get('identifiers') or []
+            instructions.append({
+                'idx': field['idx'],
+                'selector': f'[data-af-idx="{field["idx"]}"]',
+                'title': identifiers[0] if identifiers else '(无标题)',
+                'key': fill_data[key_index].get('key', ''),
+                'value': fill_data[key_index].get('value', ''),
+                'score': float(score)
+            })
+        return instructions
+
+    @classmethod
+    def cache_stats(cls) -> Dict[str, int]:
+        """返回匹配缓存的命中/未命中次数和当前大小"""
+        return {'hits': cls._hits, 'misses': cls._misses, 'size': len(cls._cache)}
+
+    @classmethod
+    def clear_cache(cls):
+        """清空匹配缓存（同时重置计数）"""
+        cls._cache.clear()
+        cls._hits = 0
+        cls._misses = 0
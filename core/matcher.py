@@ -2,9 +2,10 @@
 字段匹配算法
 实现智能模糊匹配
 """
-import re
 from typing import Optional
 
+from core import text_normalizer
+
 
 class FieldMatcher:
     """字段匹配器"""
@@ -15,16 +16,8 @@ class FieldMatcher:
         清理文本
         移除标点符号、空格，转小写
         """
-        if not text:
-            return ""
-        
-        # 转小写 
-        text = str(text).lower().strip()
-        
-        # 移除常见标点符号和空格
-        text = re.sub(r'[：:：*？?！!。.、，,\s\*\-_/\\]+', '', text)
-        
-        return text
+        # 转小写，移除常见标点符号和空格（预编译删除表 + LRU 缓存）
+        return text_normalizer.clean_field_text(text)
     
     @staticmethod
     def match_keyword(text: str, keyword: str) -> bool:
@@ -0,0 +1,133 @@
+"""
+选择题选项索引
+报名工具的单选/下拉字段（省市列表等）可能有上百个选项，match_and_fill 对每个字段
+先精确匹配、再包含匹配，每张名片都要把选项扫描两遍。这里在表单加载后为每个字段
+建一次索引，同一 eid 的所有名片共用：
+- 精确匹配：去除首尾空白后的选项值 → 第一个选项
+- 包含匹配：选项值 n-gram（1~3 字）倒排表，只验证候选选项；
+  选项值包含于名片值时只查名片值中与某个选项等长的子串，地址、自我介绍等长文本也只需
+  名片值长度 × 不同选项长度数 次查找
+返回结果与原来“按选项顺序取第一个满足条件的选项”完全一致
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# 倒排表使用的最大 n-gram 长度
+MAX_GRAM = 3
+
+# 缓存的表单数（按 eid 计）
+CACHE_SIZE = 64
+
+
+class OptionIndex:
+    """单个字段的选项索引"""
+
+    def __init__(self, options: List[Dict]):
+        self.options = options
+        self.values = [str(opt.get('value', '')).strip() for opt in options]
+        # 精确匹配：选项值 → 第一个下标
+        self.exact: Dict[str, int] = {}
+        # 选项值（非空）→ 第一个下标，用于“选项值包含于名片值”
+        self.by_value: Dict[str, int] = {}
+        # n-gram → 包含该 n-gram 的选项下标集合，用于“名片值包含于选项值”
+        self.grams: Dict[str, set] = {}
+        # 非空选项值的所有长度（从短到长）
+        self.lengths: List[int] = []
+
+        for position, value in enumerate(self.values):
+            self.exact.setdefault(value, position)
+            if not value:
+                continue
+            self.by_value.setdefault(value, position)
+            for n in range(1, MAX_GRAM + 1):
+                for start in range(len(value) - n + 1):
+                    self.grams.setdefault(value[start:start + n], set()).add(position)
+        self.lengths = sorted({len(value) for value in self.by_value})
+
+    def _find_exact(self, value: str) -> Optional[int]:
+        return self.exact.get(value.strip())
+
+    def _find_contains(self, value: str) -> Optional[int]:
+        """第一个满足 value in 选项值 或 选项值 in value 的非空选项"""
+        best = None
+
+        # 选项值是名片值的子串：只枚举与某个选项等长的子串
+        for length in self.lengths:
+            if length > len(value):
+                break
+            for start in range(len(value) - length + 1):
+                position = self.by_value.get(value[start:start + length])
+                if position is not None and (best is None or position < best):
+                    best = position
+
+        # 名片值是选项值的子串：候选 = 名片值所有 n-gram 倒排表的交集
+        if value:
+            n = min(MAX_GRAM, len(value))
+            candidates = None
+            for start in range(len(value) - n + 1):
+                postings = self.grams.get(value[start:start + n])
+                if not postings:
+                    candidates = set()
+                    break
+                candidates = set(postings) if candidates is None else candidates & postings
+            for position in sorted(candidates or ()):
+                if best is not None and position >= best:
+                    break
+                if value in self.values[position]:
+                    best = position
+                    break
+        return best
+
+    def find(self, value) -> Tuple[Optional[Dict], bool]:
+        """
+        查找名片值对应的选项
+
+        Returns:
+            Tuple[Optional[Dict], bool]: (选项, 是否为模糊匹配)，未找到为 (None, False)
+        """
+        value = str(value)
+        position = self._find_exact(value)
+        if position is not None:
+            return self.options[position], False
+        position = self._find_contains(value)
+        if position is not None:
+            return self.options[position], True
+        return None, False
+
+
+def _form_signature(form_fields: List[Dict]) -> tuple:
+    """选项结构签名：表单重新发布、选项变化时索引失效"""
+    return tuple(
+        tuple((opt.get('key'), str(opt.get('value', ''))) for opt in field.get('new_options') or ())
+        for field in form_fields
+    )
+
+
+_cache: Dict[str, Tuple[tuple, List[Optional[OptionIndex]]]] = {}
+_lock = threading.Lock()
+
+
+def get_form_option_indexes(eid: Optional[str], form_fields: List[Dict]) -> List[Optional[OptionIndex]]:
+    """
+    获取表单所有选择题字段的选项索引（按 eid 缓存，同一表单的所有名片共用）
+
+    Returns:
+        List[Optional[OptionIndex]]: 与 form_fields 一一对应，没有选项的字段为 None
+    """
+    signature = _form_signature(form_fields)
+    if eid:
+        with _lock:
+            cached = _cache.get(eid)
+            if cached and cached[0] == signature:
+                return cached[1]
+
+    indexes = [OptionIndex(field['new_options']) if field.get('new_options') else None
+               for field in form_fields]
+
+    if eid:
+        with _lock:
+            _cache.pop(eid, None)
+            _cache[eid] = (signature, indexes)
+            while len(_cache) > CACHE_SIZE:
+                _cache.pop(next(iter(_cache)))
+    return indexes
@@ -0,0 +1,155 @@
+"""
+Profile 管理（LRU + 磁盘预算）
+原来每个 名片 × 平台 创建一个持久化 QWebEngineProfile 并一直保留在 profile_cache 中，
+100 张名片 × 12 个平台就是几百个 Profile，每个都有自己的网络上下文和 HTTP 缓存目录。
+
+这里限制同时存在的 Profile 数量：
+- 超过上限时释放最久未使用、且没有页面在使用的 Profile（Cookie 已持久化在磁盘上，下次重新创建即可恢复登录状态）
+- 每个 Profile 的 HTTP 缓存大小由调用方创建时设置（config.PROFILE_HTTP_CACHE_MB）
+- 所有 Profile 的缓存目录合计超过磁盘预算时，删除最久未使用的、当前未加载的 Profile 的缓存目录
+  （只删除 HTTP 缓存目录，Cookie 和本地存储所在的持久化目录不受影响）
+"""
+import os
+import shutil
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+def directory_usage(path: str) -> Tuple[int, float]:
+    """目录下所有文件的字节数和最后修改时间（读取失败的文件忽略）"""
+    total = 0
+    newest = 0.0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            total += stat.st_size
+            newest = max(newest, stat.st_mtime)
+    return total, newest
+
+
+class ProfileManager:
+    """
+    Profile 的 LRU 管理器（不依赖 Qt，创建/释放/占用判断由填充窗口提供）
+
+    使用方法：
+        manager = ProfileManager.from_config(release=lambda profile: ..., in_use=lambda profile: ...)
+        profile = manager.get(key, create=lambda: QWebEngineProfile(...))
+        manager.trim_disk_cache(cache_root, prefix='profile_store_')
+    """
+
+    def __init__(self, release: Callable, in_use: Callable, max_live: int = 24,
+                 disk_budget_mb: float = 2048, trim_interval: float = 60.0):
+        self.release = release
+        self.in_use = in_use
+        self.max_live = max(1, max_live)
+        self.disk_budget_mb = disk_budget_mb
+        self.trim_interval = trim_interval
+        self._profiles: 'OrderedDict[Hashable, object]' = OrderedDict()  # 最久未使用 → 最近使用
+        self._last_trim = 0.0
+        self.created = 0
+        self.evicted = 0
+
+    @classmethod
+    def from_config(cls, release: Callable, in_use: Callable) -> 'ProfileManager':
+        import config
+        return cls(
+            release=release,
+            in_use=in_use,
+            max_live=getattr(config, 'PROFILE_MAX_LIVE', 24),
+            disk_budget_mb=getattr(config, 'PROFILE_DISK_BUDGET_MB', 2048),
+        )
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def __contains__(self, key):
+        return key in self._profiles
+
+    def profiles(self) -> List:
+        """当前存活的 Profile（最久未使用 → 最近使用）"""
+        return list(self._profiles.values())
+
+    def get(self, key: Hashable, create: Callable):
+        """取出 Profile 并标记为最近使用；不存在时创建，然后释放超出上限的空闲 Profile"""
+        profile = self._profiles.get(key)
+        if profile is not None:
+            self._profiles.move_to_end(key)
+            return profile
+        profile = create()
+        self._profiles[key] = profile
+        self.created += 1
+        self.evict_idle()
+        return profile
+
+    def evict_idle(self) -> List[Hashable]:
+        """按最久未使用优先释放没有页面在使用的 Profile，直到数量不超过上限（都在使用时允许暂时超出）"""
+        evicted = []
+        for key in list(self._profiles):
+            if len(self._profiles) <= self.max_live:
+                break
+            profile = self._profiles[key]
+            if key == next(reversed(self._profiles)) or self.in_use(profile):
+                continue
+            del self._profiles[key]
+            self.release(profile)
+            evicted.append(key)
+        self.evicted += len(evicted)
+        return evicted
+
+    def clear(self, release: bool = True):
+        """清空；release=False 时只丢弃引用（Profile 随父对象一起销毁）"""
+        if release:
+            for profile in self._profiles.values():
+                self.release(profile)
+        self._profiles.clear()
+
+    def trim_disk_cache(self, cache_root: Optional[str], prefix: str, live_names: Iterable[str] = (),
+                        force: bool = False) -> List[str]:
+        """
+        缓存目录合计超过磁盘预算时，按最后修改时间从旧到新删除未加载 Profile 的缓存目录
+
+        Args:
+            cache_root: 各 Profile 缓存目录的上级目录
+            prefix: 本程序创建的 Profile 缓存目录名前缀（其他目录不处理）
+            live_names: 当前已加载的 Profile 的缓存目录名（不删除）
+            force: 忽略 trim_interval 立即检查
+
+        Returns:
+            已删除的目录名
+        """
+        now = time.time()
+        if not force and now - self._last_trim < self.trim_interval:
+            return []
+        self._last_trim = now
+        if self.disk_budget_mb <= 0 or not cache_root or not os.path.isdir(cache_root):
+            return []
+
+        entries: List[Tuple[float, str, int]] = []  # (最后修改时间, 目录名, 字节数)
+        total = 0
+        for name in os.listdir(cache_root):
+            path = os.path.join(cache_root, name)
+            if not name.startswith(prefix) or not os.path.isdir(path):
+                continue
+            size, mtime = directory_usage(path)
+            total += size
+            entries.append((mtime, name, size))
+
+        budget = self.disk_budget_mb * 1024 * 1024
+        live = set(live_names)
+        removed = []
+        for _mtime, name, size in sorted(entries):
+            if total <= budget:
+                break
+            if name in live:
+                continue
+            shutil.rmtree(os.path.join(cache_root, name), ignore_errors=True)
+            total -= size
+            removed.append(name)
+        return removed
+
+    def stats(self) -> Dict:
+        return {'live': len(self._profiles), 'created': self.created, 'evicted': self.evicted}
@@ -0,0 +1,222 @@
+"""
+表单结构 → 字段映射 持久化缓存
+同一链接被多张名片反复填写时，每个 WebView 都要重新提取字段、重新匹配。
+这里按 链接 URL 保存 字段列表的哈希 和 已解析的 字段 → 名片 key 映射，
+再次填写同一表单时直接下发填充指令，跳过字段提取和匹配。
+
+- 本地 JSON 持久化（~/.auto-form-filler/form_schema_cache.json），跨会话有效
+- 按最近使用时间淘汰，条目数有上限
+- 页面字段结构变化（哈希不同）时整条失效
+- 保存匹配结果后最多每 SAVE_INTERVAL 秒写一次盘，窗口关闭时 flush_schema_cache() 写入剩余的修改
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+# 写盘的最小间隔（秒），批量填写时每个 WebView 都会保存一次匹配结果
+SAVE_INTERVAL = 5.0
+
+
+class FormSchemaCache:
+    """表单结构缓存：{ 链接URL: { schema_hash, count, titles, identifiers, mappings: { keys_hash: [[idx, key, score], ...] } } }"""
+
+    # 每个链接最多保留的名片 key 组合数
+    MAX_MAPPINGS_PER_FORM = 32
+
+    def __init__(self, cache_file: Path, max_entries: int = 500):
+        self._file = cache_file
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._hits = 0
+        self._misses = 0
+        self._dirty = False
+        self._last_save = 0.0
+        self._load()
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """去掉锚点和末尾斜杠（查询参数可能区分不同表单，保留）"""
+        return re.sub(r'#.*$', '', (url or '').strip()).rstrip('/')
+
+    @staticmethod
+    def schema_hash(fields: Sequence[Dict]) -> str:
+        """字段列表的哈希（按顺序的 idx + 标识符）"""
+        schema = [[field.get('idx'), list(field.get('identifiers') or ())] for field in fields]
+        return hashlib.sha1(json.dumps(schema, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def keys_hash(keys: Sequence[str]) -> str:
+        """名片 key 列表的哈希（顺序相关：同分时取靠前的 key）"""
+        return hashlib.sha1(json.dumps(list(keys), ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def get(self, url: str, keys: Sequence[str]) -> Optional[Dict]:
+        """
+        查找已缓存的映射
+
+        Returns:
+            Optional[Dict]: { schema_hash, count, titles: {idx: 标题}, mapping: [[idx, key, score], ...] }
+        """
+        url = self.normalize_url(url)
+        with self._lock:
+            entry = self._entries.get(url)
+            mapping = entry['mappings'].get(self.keys_hash(keys)) if entry else None
+            if mapping is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            entry['ts'] = time.time()
+            return {
+                'schema_hash': entry['schema_hash'],
+                'count': entry['count'],
+                'titles': entry['titles'],
+                'mapping': mapping
+            }
+
+    def put(self, url: str, fields: Sequence[Dict], keys: Sequence[str], instructions: List[Dict]):
+        """保存一次匹配结果；字段结构与已缓存的不同时替换整条记录"""
+        url = self.normalize_url(url)
+        schema_hash = self.schema_hash(fields)
+        with self._lock:
+            entry = self._entries.get(url)
+            if not entry or entry['schema_hash'] != schema_hash:
+                if entry:
+                    logger.info(f"表单结构已变化，缓存失效: {url}")
+                entry = {
+                    'schema_hash': schema_hash,
+                    'count': len(fields),
+                    'titles': {str(step['idx']): step['title'] for step in instructions},
+                    # 所有字段的标识符，供离线覆盖率报告使用（tools/coverage_report.py）
+                    'identifiers': [list(field.get('identifiers') or ()) for field in fields],
+                    'mappings': {}
+                }
+                self._entries[url] = entry
+            else:
+                entry['titles'].update({str(step['idx']): step['title'] for step in instructions})
+
+            mappings = entry['mappings']
+            mappings.pop(self.keys_hash(keys), None)
+            mappings[self.keys_hash(keys)] = [[step['idx'], step['key'], step['score']] for step in instructions]
+            while len(mappings) > self.MAX_MAPPINGS_PER_FORM:
+                mappings.pop(next(iter(mappings)))
+
+            now = time.time()
+            entry['ts'] = now
+            self._evict_locked()
+            self._dirty = True
+        if now - self._last_save >= SAVE_INTERVAL:
+            self.flush()
+
+    def invalidate(self, url: str):
+        """删除链接的缓存（页面字段结构变化时调用）"""
+        with self._lock:
+            removed = self._entries.pop(self.normalize_url(url), None)
+            if removed:
+                self._dirty = True
+        if removed:
+            self.flush()
+
+    @staticmethod
+    def build_instructions(cached: Dict, fill_data: List[Dict]) -> List[Dict]:
+        """用缓存的映射和当前名片的值生成填充指令（格式同 MatchService.build_instructions）"""
+        values = {}
+        for item in fill_data:
+            values.setdefault(item.get('key', ''), item.get('value', ''))
+
+        instructions = []
+        for idx, key, score in cached['mapping']:
+            if key not in values:
+                continue
+            instructions.append({
+                'idx': idx,
+                'selector': f'[data-af-idx="{idx}"]',
+                'title': cached['titles'].get(str(idx), ''),
+                'key': key,
+                'value': values[key],
+                'score': score
+            })
+        return instructions
+
+    def schemas(self) -> Dict[str, List[List[str]]]:
+        """所有已缓存表单的字段标识符 { 链接URL: [[标识符, ...], ...] }（旧版条目没有记录，跳过）"""
+        with self._lock:
+            return {url: entry['identifiers'] for url, entry in self._entries.items() if entry.get('identifiers')}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'size': len(self._entries)}
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._dirty = True
+        self.flush()
+        return count
+
+    def _evict_locked(self):
+        """按最近使用时间淘汰超出上限的链接"""
+        overflow = len(self._entries) - self._max_entries
+        if overflow <= 0:
+            return
+        for url, _ in sorted(self._entries.items(), key=lambda item: item[1].get('ts', 0))[:overflow]:
+            del self._entries[url]
+
+    def _load(self):
+        try:
+            if not self._file.exists():
+                return
+            data = json.loads(self._file.read_text(encoding='utf-8'))
+            if data.get('version') == CACHE_VERSION:
+                self._entries = data.get('entries', {})
+                self._evict_locked()
+        except Exception as e:
+            logger.warning(f"表单结构缓存读取失败，已忽略: {e}")
+            self._entries = {}
+
+    def flush(self):
+        """把缓存写盘（有修改时）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps({'version': CACHE_VERSION, 'entries': self._entries}, ensure_ascii=False)
+            self._dirty = False
+            self._last_save = time.time()
+        try:
+            self._file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self._file.with_suffix('.tmp')
+            tmp_file.write_text(payload, encoding='utf-8')
+            tmp_file.replace(self._file)
+        except Exception as e:
+            logger.warning(f"表单结构缓存写盘失败: {e}")
+            # 下次保存或关闭窗口时重试
+            with self._lock:
+                self._dirty = True
+
+
+_schema_cache: Optional[FormSchemaCache] = None
+
+
+def get_schema_cache() -> FormSchemaCache:
+    """获取全局表单结构缓存（首次调用时从磁盘加载）"""
+    global _schema_cache
+    if _schema_cache is None:
+        import config
+        cache_file = Path.home() / '.auto-form-filler' / 'form_schema_cache.json'
+        _schema_cache = FormSchemaCache(cache_file, getattr(config, 'SCHEMA_CACHE_MAX_ENTRIES', 500))
+    return _schema_cache
+
+
+def flush_schema_cache():
+    """写入尚未写盘的修改（窗口关闭时调用；本次运行没有用到缓存时不做任何事）"""
+    if _schema_cache is not None:
+        _schema_cache.flush()
@@ -0,0 +1,162 @@
+"""
+平台填充脚本引擎缓存
+原来每次填写都要重新渲染几百行的 f-string 填充脚本（名片 JSON 嵌在其中），
+同一平台开 50 个 WebView 就要渲染 50 次。这里把脚本拆成两部分：
+
+- 引擎：平台脚本本身，名片数据改为从 payload 读取，每个进程只渲染一次并缓存
+- 调用：window.__afFill(payload)，payload 只包含 { engine, fillData, assignmentPlan }
+
+页面内引擎注册在 window.__afEngines__[名称] 上（带版本号，脚本更新后自动替换），
+同一页面再次填写时只需执行调用部分。
+
+引擎也可以作为用户脚本预装到 Profile（user_script_source），由 Chromium 在每次导航的
+DocumentReady 时注入；填写时只发送 guarded_call，页面中没有同版本引擎时返回
+ENGINE_MISSING，由调用方回退到 fill_script
+
+引擎渲染后经过 ScriptPipeline 处理：production 配置下删除调试代码和 console.log、压缩脚本，
+并在 run() 内用静默的 console 遮蔽全局 console（覆盖 `const log = onProgress || console.log` 这类间接调用）
+"""
+import hashlib
+import json
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from core.script_pipeline import PROFILE_PRODUCTION, ScriptPipeline
+
+# 渲染引擎时代替名片数据/分配方案的占位值，渲染后替换为对 payload 的引用
+FILL_DATA_SENTINEL = [{'key': '__af_fill_data__', 'value': '__af_fill_data__'}]
+ASSIGNMENT_PLAN_SENTINEL = {'__af_assignment_plan__': {'index': -1, 'key': '', 'score': 0}}
+
+# guarded_call 在页面中找不到同版本引擎时的返回值
+ENGINE_MISSING = '__af_engine_missing__'
+
+ENGINE_TEMPLATE = """(function() {
+    const engines = window.__afEngines__ = window.__afEngines__ || {};
+    if (!engines[%(name)s] || engines[%(name)s].version !== %(version)s) {
+        engines[%(name)s] = {
+            version: %(version)s,
+            run: function(payload) {%(prelude)s
+                return %(script)s;
+            }
+        };
+    }
+    window.__afFill = function(payload) {
+        const engine = (window.__afEngines__ || {})[payload.engine];
+        if (!engine) {
+            console.error('❌ 填充引擎未加载:', payload.engine);
+            return null;
+        }
+        return engine.run(payload);
+    };
+})();
+"""
+
+# production 配置下 run() 内的 console：log/info/debug 不再进入 javaScriptConsoleMessage
+QUIET_CONSOLE = """
+                const console = {
+                    log() {}, info() {}, debug() {},
+                    warn: window.console.warn.bind(window.console),
+                    error: window.console.error.bind(window.console)
+                };"""
+
+
+class FillScriptEngines:
+    """
+    填充脚本引擎缓存
+
+    使用方法：
+        js_code = FillScriptEngines.fill_script(
+            'kdocs',
+            lambda fill_data, plan: self.generate_kdocs_fill_script(fill_data),
+            fill_data
+        )
+        web_view.page().runJavaScript(js_code)
+    """
+
+    _engines: Dict[str, Tuple[str, str]] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _render(name: str, render: Callable) -> Tuple[str, str]:
+        """用占位数据渲染平台脚本，把占位数据替换为 payload 引用，再按 config.SCRIPT_PROFILE 处理"""
+        script = render(FILL_DATA_SENTINEL, ASSIGNMENT_PLAN_SENTINEL).strip()
+        fill_data_literal = json.dumps(FILL_DATA_SENTINEL, ensure_ascii=False)
+        plan_literal = json.dumps(ASSIGNMENT_PLAN_SENTINEL, ensure_ascii=False)
+        if script.count(fill_data_literal) != 1 or script.count(plan_literal) > 1:
+            raise ValueError(f"填充脚本 {name} 无法拆分为引擎：名片数据必须且只能嵌入一次")
+
+        script = (script.replace(fill_data_literal, 'payload.fillData')
+                        .replace(plan_literal, '(payload.assignmentPlan || null)')
+                        .rstrip(';'))
+        profile = ScriptPipeline.profile()
+        script = ScriptPipeline.build(name, script, profile).rstrip(';')
+        version = hashlib.sha1(script.encode('utf-8')).hexdigest()[:12]
+        engine = ENGINE_TEMPLATE % {
+            'name': json.dumps(name),
+            'version': json.dumps(version),
+            'prelude': QUIET_CONSOLE if profile == PROFILE_PRODUCTION else '',
+            'script': script,
+        }
+        size = ScriptPipeline.sizes()[name]
+        print(f"📦 填充引擎 {name} ({profile}): {size['raw']} → {size['built']} 字节")
+        return engine, version
+
+    @classmethod
+    def get_engine(cls, name: str, render: Callable) -> str:
+        """
+        获取平台引擎脚本（每个进程只渲染一次）
+
+        Args:
+            name: 引擎名称（平台 + 变体，如 'kdocs'、'kdocs:two_phase'）
+            render: render(fill_data, assignment_plan) -> 平台填充脚本
+        """
+        cached = cls._engines.get(name)
+        if cached is None:
+            with cls._lock:
+                cached = cls._engines.get(name)
+                if cached is None:
+                    cached = cls._render(name, render)
+                    cls._engines[name] = cached
+        return cached[0]
+
+    @staticmethod
+    def fill_call(name: str, fill_data, assignment_plan: Optional[dict] = None) -> str:
+        """生成调用部分：window.__afFill(payload)"""
+        payload = json.dumps({'engine': name, 'fillData': fill_data, 'assignmentPlan': assignment_plan},
+                             ensure_ascii=False)
+        return f"window.__afFill({payload});"
+
+    @classmethod
+    def fill_script(cls, name: str, render: Callable, fill_data, assignment_plan: Optional[dict] = None) -> str:
+        """引擎 + 调用：页面已加载同版本引擎时只会重新注册一次函数，不会重新渲染"""
+        return cls.get_engine(name, render) + cls.fill_call(name, fill_data, assignment_plan)
+
+    @classmethod
+    def guarded_call(cls, name: str, render: Callable, fill_data, assignment_plan: Optional[dict] = None) -> str:
+        """只含调用的短脚本：引擎已预装时直接填写，否则返回 ENGINE_MISSING"""
+        cls.get_engine(name, render)
+        version = cls._engines[name][1]
+        return (f"(function() {{\n"
+                f"    const engine = (window.__afEngines__ || {{}})[{json.dumps(name)}];\n"
+                f"    if (!engine || engine.version !== {json.dumps(version)} || !window.__afFill) "
+                f"return {json.dumps(ENGINE_MISSING)};\n"
+                f"    return {cls.fill_call(name, fill_data, assignment_plan).rstrip(';')};\n"
+                f"}})();")
+
+    @classmethod
+    def user_script_source(cls, name: str, render: Callable, url_patterns) -> str:
+        """
+        预装到 QWebEngineProfile.scripts() 的用户脚本源码
+
+        Args:
+            url_patterns: @include 规则（如 '*wjx.cn*'），只在对应平台的页面注入
+        """
+        header = ['// ==UserScript==', f'// @name af-engine-{name}']
+        header += [f'// @include {pattern}' for pattern in url_patterns]
+        header.append('// ==/UserScript==')
+        return '\n'.join(header) + '\n' + cls.get_engine(name, render)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._engines.clear()
@@ -0,0 +1,310 @@
+"""
+填充脚本构建流水线
+生成的填充脚本里有几百条 console.log 和调试用的 DOM 扫描，每条日志都要经过
+javaScriptConsoleMessage 进入 Python 并在 GUI 线程打印，40 个 WebView 同时填写时会刷屏卡顿。
+
+两种配置（config.SCRIPT_PROFILE）：
+- production：删除 // @debug-begin ... // @debug-end 之间的调试代码、删除 console.log/info/debug 调用，
+  并压缩脚本（去掉注释、缩进和多余空白）；console.warn/error 保留
+- debug：原样输出，与之前的详细日志一致
+
+压缩只做不改变语义的处理：按 JS 词法切分（字符串、模板字符串、正则、注释整体保留或整体删除），
+换行保留以免影响自动分号插入，不重命名变量。
+"""
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+PROFILE_PRODUCTION = 'production'
+PROFILE_DEBUG = 'debug'
+
+DEBUG_BEGIN = '// @debug-begin'
+DEBUG_END = '// @debug-end'
+
+# 生产配置中删除的 console 方法（warn/error 保留，用于排查失败）
+STRIPPED_CONSOLE_METHODS = frozenset({'log', 'info', 'debug'})
+
+# 前一个有效词法单元为这些关键字时，后面的 / 是正则而不是除号
+_REGEX_KEYWORDS = frozenset({
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'case', 'do', 'else', 'yield', 'await'
+})
+
+# 两侧任意一侧是这些符号时，中间的空格可以删除（不含 + - / . < ! 等可能拼成其他词法单元的符号）
+_TIGHT_PUNCT = frozenset('{}()[];,:=?*%&|^~>')
+
+# 换行前是这些符号，或换行后是这些符号时，换行可以删除（不会触发或取消自动分号插入）
+_JOIN_AFTER = frozenset('{([,;')
+_JOIN_BEFORE = frozenset('})],;.')
+
+_WORD_RE = re.compile('[A-Za-z0-9_$\u0080-\uffff]+')
+_SPACE_CHARS = ' \t\r\n\f\v\u00a0\ufeff\u2028\u2029'
+_LINE_TERMINATORS = '\r\n\u2028\u2029'
+_SPACE_RE = re.compile('[' + _SPACE_CHARS + ']+')
+_DEBUG_BLOCK_RE = re.compile(r'[ \t]*' + re.escape(DEBUG_BEGIN) + r'.*?' + re.escape(DEBUG_END) + r'[^\n]*\n?',
+                             re.S)
+
+# 词法单元类型
+WORD, PUNCT, STRING, SPACE, NEWLINE, COMMENT = 'word', 'punct', 'string', 'space', 'newline', 'comment'
+
+
+def _skip_quoted(src: str, i: int) -> int:
+    """跳过 '...' / "..."，返回结束引号之后的位置"""
+    quote = src[i]
+    i += 1
+    while i < len(src):
+        ch = src[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if ch == quote or ch == '\n':
+            return i + 1
+        i += 1
+    return i
+
+
+def _skip_regex(src: str, i: int) -> int:
+    """跳过正则字面量（含 [...] 字符类和标志），返回结束位置"""
+    i += 1
+    in_class = False
+    while i < len(src):
+        ch = src[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if ch == '\n':
+            return i
+        if in_class:
+            if ch == ']':
+                in_class = False
+        elif ch == '[':
+            in_class = True
+        elif ch == '/':
+            i += 1
+            match = _WORD_RE.match(src, i)
+            return match.end() if match else i
+        i += 1
+    return i
+
+
+def _skip_template(src: str, i: int) -> int:
+    """跳过模板字符串（${...} 中的代码按词法扫描，支持嵌套），返回结束反引号之后的位置"""
+    i += 1
+    while i < len(src):
+        ch = src[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if ch == '`':
+            return i + 1
+        if ch == '$' and src.startswith('${', i):
+            _, i = _scan(src, i + 2, stop_at_close=True)
+            i += 1  # 跳过 }
+            continue
+        i += 1
+    return i
+
+
+def _regex_allowed(prev: Optional[Tuple[str, str]]) -> bool:
+    if prev is None:
+        return True
+    kind, text = prev
+    if kind == WORD:
+        return text in _REGEX_KEYWORDS
+    if kind == STRING:
+        return False
+    return text not in (')', ']')
+
+
+def _scan(src: str, i: int = 0, stop_at_close: bool = False) -> Tuple[List[Tuple[str, str]], int]:
+    """
+    按 JS 词法切分
+
+    Args:
+        stop_at_close: 用于模板字符串的 ${...}：遇到未配对的 } 时停止
+
+    Returns:
+        ([(类型, 文本), ...], 停止位置)
+    """
+    tokens: List[Tuple[str, str]] = []
+    prev = None  # 前一个有效（非空白、非注释）词法单元
+    depth = 0
+    n = len(src)
+    while i < n:
+        ch = src[i]
+        start = i
+        if ch in _SPACE_CHARS:
+            i = _SPACE_RE.match(src, i).end()
+            text = src[start:i]
+            tokens.append((NEWLINE if any(c in _LINE_TERMINATORS for c in text) else SPACE, text))
+            continue
+        if src.startswith('//', i):
+            end = src.find('\n', i)
+            i = n if end < 0 else end
+            tokens.append((COMMENT, src[start:i]))
+            continue
+        if src.startswith('/*', i):
+            end = src.find('*/', i + 2)
+            i = n if end < 0 else end + 2
+            tokens.append((COMMENT, src[start:i]))
+            continue
+
+        if ch in '\'"':
+            i = _skip_quoted(src, i)
+            token = (STRING, src[start:i])
+        elif ch == '`':
+            i = _skip_template(src, i)
+            token = (STRING, src[start:i])
+        elif ch == '/' and _regex_allowed(prev):
+            i = _skip_regex(src, i)
+            token = (STRING, src[start:i])
+        else:
+            match = _WORD_RE.match(src, i)
+            if match:
+                i = match.end()
+                token = (WORD, src[start:i])
+            else:
+                if ch in '{([':
+                    depth += 1
+                elif ch in '})]':
+                    if stop_at_close and ch == '}' and depth == 0:
+                        return tokens, i
+                    depth -= 1
+                i += 1
+                token = (PUNCT, ch)
+        tokens.append(token)
+        prev = token
+    return tokens, i
+
+
+def tokenize(src: str) -> List[Tuple[str, str]]:
+    return _scan(src)[0]
+
+
+def _significant(tokens, index: int, step: int) -> Optional[int]:
+    """从 index 开始向前/向后找第一个有效词法单元的下标"""
+    while 0 <= index < len(tokens):
+        if tokens[index][0] not in (SPACE, NEWLINE, COMMENT):
+            return index
+        index += step
+    return None
+
+
+class ScriptPipeline:
+    """
+    填充脚本构建流水线
+
+    使用方法：
+        js_code = ScriptPipeline.build('kdocs', js_code)    # 按 config.SCRIPT_PROFILE 处理
+        ScriptPipeline.sizes()                              # { 'kdocs': { 'raw': 字节, 'built': 字节 } }
+    """
+
+    _sizes: Dict[str, Dict[str, int]] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def profile() -> str:
+        import config
+        profile = getattr(config, 'SCRIPT_PROFILE', PROFILE_PRODUCTION)
+        return PROFILE_DEBUG if profile == PROFILE_DEBUG else PROFILE_PRODUCTION
+
+    @staticmethod
+    def strip_debug_blocks(js: str) -> str:
+        """删除 // @debug-begin 与 // @debug-end 之间的调试代码（含标记所在行）"""
+        return _DEBUG_BLOCK_RE.sub('', js)
+
+    @staticmethod
+    def strip_console_calls(tokens: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        删除 console.log/info/debug(...) 调用
+
+        作为独立语句时（前面是语句边界、后面是分号）只删除调用本身，留下空语句；
+        其他位置（箭头函数体、逗号表达式等）替换为 void 0
+        """
+        result: List[Tuple[str, str]] = []
+        i = 0
+        n = len(tokens)
+        while i < n:
+            kind, text = tokens[i]
+            if kind == WORD and text == 'console':
+                before = _significant(result, len(result) - 1, -1)
+                dot = _significant(tokens, i + 1, 1)
+                method = _significant(tokens, dot + 1, 1) if dot is not None else None
+                paren = _significant(tokens, method + 1, 1) if method is not None else None
+                if ((before is None or result[before][1] != '.')
+                        and dot is not None and tokens[dot][1] == '.'
+                        and method is not None and tokens[method][1] in STRIPPED_CONSOLE_METHODS
+                        and paren is not None and tokens[paren][1] == '('):
+                    close = paren
+                    depth = 0
+                    while close < n:
+                        if tokens[close][0] == PUNCT:
+                            if tokens[close][1] in '([{':
+                                depth += 1
+                            elif tokens[close][1] in ')]}':
+                                depth -= 1
+                                if depth == 0:
+                                    break
+                        close += 1
+                    after = _significant(tokens, close + 1, 1)
+                    statement = (after is not None and tokens[after][1] == ';'
+                                 and (before is None or result[before][1] in (';', '{', '}', ')', 'else')))
+                    if not statement:
+                        result.append((WORD, 'void 0'))
+                    i = close + 1
+                    continue
+            result.append(tokens[i])
+            i += 1
+        return result
+
+    @staticmethod
+    def minify(tokens: List[Tuple[str, str]]) -> str:
+        """去掉注释、缩进和多余空白；换行只在不影响自动分号插入的位置删除"""
+        tokens = [token for token in tokens if token[0] != COMMENT]
+        out: List[str] = []
+        last = None  # 已输出的最后一个有效词法单元
+        pending = None  # 上一个有效单元之后的空白：SPACE / NEWLINE
+        for kind, text in tokens:
+            if kind in (SPACE, NEWLINE):
+                if pending != NEWLINE:
+                    pending = kind
+                continue
+            if last is not None and pending is not None:
+                joinable = (last[1][-1] in _JOIN_AFTER or
+                            (text[0] in _JOIN_BEFORE and not (text[0] == '.' and last[1][0].isdigit())))
+                if pending == NEWLINE and not joinable:
+                    out.append('\n')
+                elif pending == SPACE or pending == NEWLINE:
+                    if last[1][-1] not in _TIGHT_PUNCT and text[0] not in _TIGHT_PUNCT:
+                        out.append(' ')
+            out.append(text)
+            last = (kind, text)
+            pending = None
+        return ''.join(out)
+
+    @classmethod
+    def build(cls, name: str, js: str, profile: Optional[str] = None) -> str:
+        """
+        按配置处理脚本并记录处理前后的字节数
+
+        Args:
+            name: 脚本名称（用于 sizes() 统计）
+            profile: 'production' / 'debug'，默认读取 config.SCRIPT_PROFILE
+        """
+        profile = profile or cls.profile()
+        built = js
+        if profile == PROFILE_PRODUCTION:
+            built = cls.minify(cls.strip_console_calls(tokenize(cls.strip_debug_blocks(js))))
+
+        with cls._lock:
+            cls._sizes[name] = {
+                'raw': len(js.encode('utf-8')),
+                'built': len(built.encode('utf-8'))
+            }
+        return built
+
+    @classmethod
+    def sizes(cls) -> Dict[str, Dict[str, int]]:
+        """各脚本处理前后的字节数 { 名称: { raw, built } }"""
+        with cls._lock:
+            return {name: dict(size) for name, size in cls._sizes.items()}
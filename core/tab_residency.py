@@ -0,0 +1,84 @@
+"""
+标签页驻留策略（LRU）
+原来切换标签页时只保留当前链接的 WebView，其他链接全部卸载，切回去要重新等 5~30 秒加载。
+这里按最近访问顺序保留最近 K 个标签页（含预加载的下一个链接），超出数量或后台标签页的渲染进程内存
+超出预算时卸载最久未访问的标签页；当前标签页和正在预加载的标签页不会被卸载。
+内存预算只计算后台标签页的部分（按 WebView 数量从合计中扣除当前标签页的份额），当前标签页加载得再多
+也只由加载窗口（config.LOAD_MEMORY_LIMIT_MB）限制，不会因此把刚预加载的标签页卸载掉。
+"""
+from typing import Dict, Iterable, List, Optional
+
+
+class TabResidency:
+    """
+    标签页驻留策略（不依赖 Qt，由填充窗口在切换/预加载/加载完成时调用）
+
+    使用方法：
+        residency = TabResidency.from_config()
+        residency.touch(link_id)                                   # 切换到标签页
+        for link_id in residency.evictions(active_link_id, view_counts, memory_mb, protected=prefetching):
+            unload(link_id)
+    """
+
+    def __init__(self, max_tabs: int = 3, memory_budget_mb: float = 2048):
+        self.max_tabs = max(1, max_tabs)
+        self.memory_budget_mb = memory_budget_mb
+        self._order: List[str] = []  # 最久未访问 → 最近访问
+
+    @classmethod
+    def from_config(cls) -> 'TabResidency':
+        import config
+        return cls(
+            max_tabs=getattr(config, 'TAB_RESIDENCY_MAX_TABS', 3),
+            memory_budget_mb=getattr(config, 'TAB_RESIDENCY_MEMORY_MB', 2048),
+        )
+
+    @property
+    def resident(self) -> List[str]:
+        return list(self._order)
+
+    def touch(self, link_id: str):
+        """标记为最近访问"""
+        if link_id in self._order:
+            self._order.remove(link_id)
+        self._order.append(link_id)
+
+    def remove(self, link_id: str):
+        if link_id in self._order:
+            self._order.remove(link_id)
+
+    def evictions(self, active_link_id: str, view_counts: Dict[str, int],
+                  memory_mb: Optional[float] = None, protected: Iterable[str] = ()) -> List[str]:
+        """
+        需要卸载的标签页（按最久未访问优先），并从驻留列表中移除
+
+        Args:
+            view_counts: 链接 → 当前存活的 WebView 数量（没有 WebView 的链接不占驻留名额）
+            memory_mb: 渲染进程内存合计，None 表示无法获取，只按数量限制
+            protected: 不卸载的链接（正在预加载的），仍占驻留名额
+        """
+        resident = [link_id for link_id in self._order if view_counts.get(link_id) or link_id == active_link_id]
+        total_views = sum(view_counts.get(link_id, 0) for link_id in resident)
+        per_view = memory_mb / total_views if memory_mb is not None and total_views else 0.0
+        if memory_mb is not None:
+            # 只有后台标签页的内存计入预算
+            memory_mb -= per_view * view_counts.get(active_link_id, 0)
+        protected = set(protected)
+
+        evicted = []
+        for link_id in resident:
+            if link_id == active_link_id or link_id in protected:
+                continue
+            over_count = len(resident) - len(evicted) > self.max_tabs
+            over_memory = (memory_mb is not None and self.memory_budget_mb > 0
+                           and memory_mb > self.memory_budget_mb)
+            if not (over_count or over_memory):
+                break
+            evicted.append(link_id)
+            if memory_mb is not None:
+                # 按 WebView 数量估算卸载后释放的内存（同站点页面可能共用渲染进程，只是近似值）
+                memory_mb -= per_view * view_counts.get(link_id, 0)
+
+        for link_id in evicted:
+            self._order.remove(link_id)
+        return evicted
@@ -2,9 +2,10 @@
 腾讯文档表单填写引擎
 专门针对腾讯文档（docs.qq.com）表单的自动填写
 """
-import re
 import logging
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+from core import text_normalizer
 
 logger = logging.getLogger(__name__)
 
@@ -17,22 +18,65 @@ class SharedMatchAlgorithm:
     
     @staticmethod
     def clean_text(text: str) -> str:
-        """清理文本用于匹配"""
-        if not text:
-            return ''
-        text = str(text).lower()
-        # 去除特殊字符
-        text = re.sub(r'[：:*？?！!。.、，,\s\-_\(\)（）【】\[\]]+', '', text)
-        return text.strip()
+        """清理文本用于匹配（去除空白、常见标点和括号，结果带缓存）"""
+        return text_normalizer.clean_match_text(text)
     
     @staticmethod
     def split_keywords(keyword: str) -> List[str]:
         """分割关键词为子关键词数组"""
+        return list(text_normalizer.split_keywords(keyword))
+
+    @staticmethod
+    def get_sub_keywords(keyword: str) -> List[str]:
+        """
+        获取关键词参与评分的子关键词（已清理，保持原顺序）
+
+        分割结果为空时回退为整个关键词；关键词清理后为空时返回空列表
+        """
         if not keyword:
             return []
-        parts = re.split(r'[|,;，；、\n\r\t/／\\｜\u2795+]+', keyword)
-        return [SharedMatchAlgorithm.clean_text(p) for p in parts if p.strip()]
-    
+        clean_keyword = SharedMatchAlgorithm.clean_text(keyword)
+        if not clean_keyword:
+            return []
+        sub_keywords = SharedMatchAlgorithm.split_keywords(keyword)
+        if not sub_keywords:
+            sub_keywords = [clean_keyword]
+        return sub_keywords
+
+    @staticmethod
+    def score_pair(sub_key: str, clean_identifier: str) -> float:
+        """
+        计算单个子关键词与单个标识符的分数（两者均为已清理文本且非空）
+
+        评分规则：完全匹配 100，子关键词包含于标识符 80-90，
+        标识符包含于子关键词 70，字符相似度 >= 0.5 时 30-60，否则 0
+        """
+        if sub_key in clean_identifier:
+            return SharedMatchAlgorithm.contained_score(sub_key, clean_identifier)
+        return SharedMatchAlgorithm.uncontained_score(sub_key, clean_identifier)
+
+    @staticmethod
+    def contained_score(sub_key: str, clean_identifier: str) -> float:
+        """子关键词包含于标识符时的分数（调用方已确认包含关系，如多模式匹配命中）"""
+        # 1. 完全匹配（100分）
+        if len(sub_key) == len(clean_identifier):
+            return 100
+        # 2. 包含匹配（80-90分）
+        ratio = len(sub_key) / len(clean_identifier)
+        return 80 + (ratio * 10)
+
+    @staticmethod
+    def uncontained_score(sub_key: str, clean_identifier: str) -> float:
+        """子关键词不包含于标识符时的分数"""
+        if clean_identifier in sub_key:
+            return 70
+        # 3. 字符相似度匹配（30-60分）
+        common = sum(1 for c in sub_key if c in clean_identifier)
+        similarity = common / len(sub_key) if sub_key else 0
+        if similarity >= 0.5:
+            return int(similarity * 60)
+        return 0
+
     @staticmethod
     def match_keyword(identifiers, keyword: str) -> Dict:
         """
@@ -52,46 +96,28 @@ class SharedMatchAlgorithm:
         if isinstance(identifiers, str):
             identifiers = [identifiers]
         
-        clean_keyword = SharedMatchAlgorithm.clean_text(keyword)
-        if not clean_keyword:
-            return {'matched': False, 'identifier': None, 'score': 0, 'matchedKey': None}
-        
-        # 分割子关键词
-        sub_keywords = SharedMatchAlgorithm.split_keywords(keyword)
+        sub_keywords = SharedMatchAlgorithm.get_sub_keywords(keyword)
         if not sub_keywords:
-            sub_keywords = [clean_keyword]
+            return {'matched': False, 'identifier': None, 'score': 0, 'matchedKey': None}
         
         best_score = 0
         best_identifier = None
         best_sub_key = None
         
+        # 标识符只清理一次
+        clean_identifiers = [(identifier, SharedMatchAlgorithm.clean_text(identifier))
+                             for identifier in identifiers]
+        
         for sub_key in sub_keywords:
             if not sub_key:
                 continue
                 
-            for identifier in identifiers:
-                clean_identifier = SharedMatchAlgorithm.clean_text(identifier)
+            for identifier, clean_identifier in clean_identifiers:
                 if not clean_identifier:
                     continue
-                
-                current_score = 0
-                
-                # 1. 完全匹配（100分）
-                if clean_identifier == sub_key:
-                    current_score = 100
-                # 2. 包含匹配（80-90分）
-                elif sub_key in clean_identifier:
-                    ratio = len(sub_key) / len(clean_identifier)
-                    current_score = 80 + (ratio * 10)
-                elif clean_identifier in sub_key:
-                    current_score = 70
-                # 3. 字符相似度匹配（30-60分）
-                else:
-                    common = sum(1 for c in sub_key if c in clean_identifier)
-                    similarity = common / len(sub_key) if sub_key else 0
-                    if similarity >= 0.5:
-                        current_score = int(similarity * 60)
-                
+
+                current_score = SharedMatchAlgorithm.score_pair(sub_key, clean_identifier)
+
                 if current_score > best_score:
                     best_score = current_score
                     best_identifier = identifier
@@ -105,6 +131,106 @@ class SharedMatchAlgorithm:
             'matchedKey': best_sub_key
         }
 
+    @staticmethod
+    def score_matrix(identifiers, keys: List[str]):
+        """
+        批量计算 表单字段 × 名片key 的分数矩阵（NumPy 向量化，评分规则与 match_keyword 一致）
+
+        完全匹配、包含匹配在字符串数组上批量比较；字符相似度通过
+        “标识符字符出现矩阵 × 子关键词字符计数矩阵” 一次矩阵乘法得到
+
+        Args:
+            identifiers: 表单字段列表，每项为标题字符串或该字段的标识符列表
+            keys: 名片 key 列表
+
+        Returns:
+            numpy.ndarray: 形状 (字段数, key数) 的 float64 分数矩阵，
+            matrix[i, j] == match_keyword(identifiers[i], keys[j])['score']
+        """
+        import numpy as np
+
+        rows = [[item] if isinstance(item, str) else list(item or []) for item in identifiers]
+        matrix = np.zeros((len(rows), len(keys)), dtype=np.float64)
+
+        # 展开所有（已清理的）标识符和子关键词，记录所属的字段/key
+        id_texts, id_rows = [], []
+        for row_index, row in enumerate(rows):
+            for identifier in row:
+                clean_identifier = SharedMatchAlgorithm.clean_text(identifier)
+                if clean_identifier:
+                    id_texts.append(clean_identifier)
+                    id_rows.append(row_index)
+
+        sub_texts, sub_cols = [], []
+        for key_index, key in enumerate(keys):
+            for sub_key in SharedMatchAlgorithm.get_sub_keywords(key):
+                if sub_key:
+                    sub_texts.append(sub_key)
+                    sub_cols.append(key_index)
+
+        if not id_texts or not sub_texts:
+            return matrix
+
+        ids = np.array(id_texts)
+        subs = np.array(sub_texts)
+        id_lens = np.array([len(t) for t in id_texts], dtype=np.float64)
+        sub_lens = np.array([len(s) for s in sub_texts], dtype=np.float64)
+
+        # 字符编码：只需要子关键词中出现过的字符
+        vocab = {}
+        for sub_key in sub_texts:
+            for c in sub_key:
+                vocab.setdefault(c, len(vocab))
+        sub_counts = np.zeros((len(sub_texts), len(vocab)), dtype=np.float64)
+        for sub_index, sub_key in enumerate(sub_texts):
+            for c in sub_key:
+                sub_counts[sub_index, vocab[c]] += 1
+        id_presence = np.zeros((len(id_texts), len(vocab)), dtype=np.float64)
+        for id_index, text in enumerate(id_texts):
+            codes = [vocab[c] for c in set(text) if c in vocab]
+            id_presence[id_index, codes] = 1
+
+        # 1. 完全匹配（100分）
+        exact = ids[:, None] == subs[None, :]
+        # 2. 包含匹配（80-90分 / 70分）
+        sub_in_id = np.char.find(ids[:, None], subs[None, :]) >= 0
+        id_in_sub = np.char.find(subs[None, :], ids[:, None]) >= 0
+        contain_score = 80 + (sub_lens[None, :] / id_lens[:, None]) * 10
+        # 3. 字符相似度匹配（30-60分）
+        similarity = (id_presence @ sub_counts.T) / sub_lens[None, :]
+        overlap_score = np.where(similarity >= 0.5, np.floor(similarity * 60), 0)
+
+        pair_scores = np.where(exact, 100,
+                      np.where(sub_in_id, contain_score,
+                      np.where(id_in_sub, 70, overlap_score)))
+
+        # 同一 key 的子关键词、同一字段的标识符取最高分
+        sub_cols = np.array(sub_cols)
+        id_rows = np.array(id_rows)
+        col_starts = np.flatnonzero(np.r_[True, sub_cols[1:] != sub_cols[:-1]])
+        row_starts = np.flatnonzero(np.r_[True, id_rows[1:] != id_rows[:-1]])
+        by_key = np.maximum.reduceat(pair_scores, col_starts, axis=1)
+        by_field = np.maximum.reduceat(by_key, row_starts, axis=0)
+        matrix[np.ix_(id_rows[row_starts], sub_cols[col_starts])] = by_field
+        return matrix
+
+    @staticmethod
+    def best_matches(matrix, threshold: int = 50) -> List:
+        """
+        从分数矩阵中取每个字段的最佳 key（同分取靠前的 key，与逐个匹配取最高分一致）
+
+        Returns:
+            List[Optional[int]]: 每个字段匹配到的 key 下标，未达到阈值为 None
+        """
+        import numpy as np
+
+        if matrix.shape[0] == 0 or matrix.shape[1] == 0:
+            return [None] * matrix.shape[0]
+        best_cols = np.argmax(matrix, axis=1)
+        best_scores = matrix[np.arange(matrix.shape[0]), best_cols]
+        return [int(col) if score >= threshold else None
+                for col, score in zip(best_cols, best_scores)]
+
 
 class TencentDocsFiller:
     """腾讯文档表单填写引擎"""
@@ -112,25 +238,108 @@ class TencentDocsFiller:
     def __init__(self):
         self.logger = logger
     
+    @staticmethod
+    def get_similarity_kernels() -> str:
+        """
+        获取共享的相似度内核 JavaScript 代码（已包含在 get_shared_match_algorithm() 中）
+        
+        - longestCommonSubstring(s1, s2): 最长公共子串长度。单行滚动 DP，行缓冲区为复用的 Int32Array，
+          不再每次调用分配 (m+1)×(n+1) 的二维数组
+        - charOverlap(subKey, text): subKey 中出现在 text 里的字符数（matchKeyword 字符相似度的分子）
+        
+        页面内性能对比见 benchmarks/bench_js_kernels.py
+        """
+        return """
+    // 相似度内核的复用行缓冲区（按需扩容）
+    let similarityRow = new Int32Array(64);
+    
+    /**
+     * 最长公共子串长度（按 UTF-16 码元比较）
+     */
+    function longestCommonSubstring(s1, s2) {
+        let m = s1.length, n = s2.length;
+        if (m === 0 || n === 0) return 0;
+        // 较短的字符串作为列，行缓冲区更小
+        if (n > m) {
+            const t = s1; s1 = s2; s2 = t;
+            m = s1.length; n = s2.length;
+        }
+        if (similarityRow.length <= n) {
+            similarityRow = new Int32Array(Math.max(n + 1, similarityRow.length * 2));
+        }
+        const row = similarityRow;
+        row.fill(0, 0, n + 1);
+        
+        let maxLen = 0;
+        for (let i = 0; i < m; i++) {
+            const c = s1.charCodeAt(i);
+            // 从右往左更新，row[j - 1] 仍是上一行的值
+            for (let j = n; j >= 1; j--) {
+                if (s2.charCodeAt(j - 1) === c) {
+                    const len = row[j - 1] + 1;
+                    row[j] = len;
+                    if (len > maxLen) maxLen = len;
+                } else {
+                    row[j] = 0;
+                }
+            }
+        }
+        return maxLen;
+    }
+    
+    /**
+     * subKey 中出现在 text 里的字符数（按字符计，重复字符重复计数）
+     */
+    function charOverlap(subKey, text) {
+        let common = 0;
+        // V8 对单字符 includes 有专门优化，比逐码元手写扫描更快
+        for (const c of subKey) {
+            if (text.includes(c)) common++;
+        }
+        return common;
+    }
+"""
+
     @staticmethod
     def get_shared_match_algorithm() -> str:
         """
         获取共享的匹配算法 JavaScript 代码
         这个算法可以被多个表单平台复用（腾讯文档、WPS 等）
         
+        同一次脚本执行中，清理后的标识符和名片 key 的子关键词分别缓存在 Map 中，
+        每个标签只清理一次、每个 key 只分割一次（原来每个子关键词 × 每个名片字段都要重新清理）
+        
         Returns:
             JavaScript 函数代码字符串，包含：
-            - cleanText(): 清理文本
+            - longestCommonSubstring() / charOverlap(): 相似度内核（见 get_similarity_kernels()）
+            - cleanText(): 清理文本（带缓存）
             - splitKeywords(): 分割关键词
+            - prepareKeywords(): 预先分割名片 key 的子关键词
             - matchKeyword(): 匹配关键词（评分系统）
+            - getMatchStats(): 匹配次数、耗时（performance.now）和缓存命中统计
+            - lookupAssignment(): 查找 Python 端生成的全局最优分配方案
         """
-        return """
+        return TencentDocsFiller.get_similarity_kernels() + """
+    // 本次执行的匹配缓存：原始文本 → 清理后的文本，名片 key → 子关键词
+    const cleanTextCache = new Map();
+    const keywordCache = new Map();
+    const matchStats = { calls: 0, time: 0, cleanHits: 0, cleanMisses: 0 };
+    
     /**
      * 清理文本用于匹配
      */
     function cleanText(text) {
         if (!text) return '';
-        return String(text).toLowerCase().replace(/[：:*？?！!。.、，,\\s\\-_\\(\\)（）【】\\[\\]]/g, '').trim();
+        const raw = String(text);
+        const cached = cleanTextCache.get(raw);
+        if (cached !== undefined) {
+            matchStats.cleanHits++;
+            return cached;
+        }
+        matchStats.cleanMisses++;
+        const cleaned = raw.toLowerCase().replace(/[：:*？?！!。.、，,\\s\\-_\\(\\)（）【】\\[\\]]/g, '').trim();
+        cleanTextCache.set(raw, cleaned);
+        return cleaned;
     }
     
     /**
@@ -144,6 +353,36 @@ class TencentDocsFiller:
             .filter(k => k.length > 0);
     }
     
+    /**
+     * 获取名片 key 清理后的子关键词（每个 key 只分割、清理一次）
+     * @returns {Array<string>} 子关键词数组，key 清理后为空时返回空数组
+     */
+    function getSubKeywords(keyword) {
+        let subKeywords = keywordCache.get(keyword);
+        if (subKeywords === undefined) {
+            const cleanKeyword = cleanText(keyword);
+            subKeywords = cleanKeyword ? splitKeywords(keyword).map(k => cleanText(k)).filter(k => k) : [];
+            if (cleanKeyword && subKeywords.length === 0) subKeywords.push(cleanKeyword);
+            keywordCache.set(keyword, subKeywords);
+        }
+        return subKeywords;
+    }
+    
+    /**
+     * 预先分割所有名片 key 的子关键词（脚本开始时调用一次）
+     * @param {Array<string>} keywords - 名片 key 列表
+     */
+    function prepareKeywords(keywords) {
+        keywords.forEach(keyword => keyword && getSubKeywords(keyword));
+    }
+    
+    /**
+     * 匹配统计：matchKeyword 调用次数、总耗时（毫秒）、cleanText 缓存命中
+     */
+    function getMatchStats() {
+        return Object.assign({}, matchStats, { time: Math.round(matchStats.time * 100) / 100 });
+    }
+    
     /**
      * 匹配关键词 - 评分系统（支持多关键词）
      * @param {string|Array<string>} titleOrIdentifiers - 标题字符串或标识符数组
@@ -153,23 +392,25 @@ class TencentDocsFiller:
     function matchKeyword(titleOrIdentifiers, keyword) {
         if (!keyword) return { matched: false, identifier: null, score: 0 };
         
-        // 支持传入标题字符串或标识符数组
-        const identifiers = Array.isArray(titleOrIdentifiers) ? titleOrIdentifiers : [titleOrIdentifiers];
+        // 支持顿号、逗号、竖线分隔的多个关键词
+        const subKeywords = getSubKeywords(keyword);
+        if (subKeywords.length === 0) return { matched: false, identifier: null, score: 0 };
         
-        const cleanKeyword = cleanText(keyword);
-        if (!cleanKeyword) return { matched: false, identifier: null, score: 0 };
+        const startTime = performance.now();
+        matchStats.calls++;
         
-        // 支持顿号、逗号、竖线分隔的多个关键词
-        const subKeywords = splitKeywords(keyword).map(k => cleanText(k)).filter(k => k);
-        if (subKeywords.length === 0) subKeywords.push(cleanKeyword);
+        // 支持传入标题字符串或标识符数组
+        const identifiers = Array.isArray(titleOrIdentifiers) ? titleOrIdentifiers : [titleOrIdentifiers];
+        const cleanIdentifiers = identifiers.map(identifier => cleanText(identifier));
         
         let bestScore = 0;
         let bestIdentifier = null;
         let bestSubKey = null;
         
         for (const subKey of subKeywords) {
-            for (const identifier of identifiers) {
-                const cleanIdentifier = cleanText(identifier);
+            for (let i = 0; i < identifiers.length; i++) {
+                const identifier = identifiers[i];
+                const cleanIdentifier = cleanIdentifiers[i];
                 if (!cleanIdentifier) continue;
                 
                 let currentScore = 0;
@@ -188,11 +429,7 @@ class TencentDocsFiller:
                 }
                 // 3. 字符相似度匹配（30-60分）
                 else {
-                    let common = 0;
-                    for (const c of subKey) {
-                        if (cleanIdentifier.includes(c)) common++;
-                    }
-                    const similarity = common / subKey.length;
+                    const similarity = charOverlap(subKey, cleanIdentifier) / subKey.length;
                     if (similarity >= 0.5) {
                         currentScore = Math.floor(similarity * 60);
                     }
@@ -206,6 +443,8 @@ class TencentDocsFiller:
             }
         }
         
+        matchStats.time += performance.now() - startTime;
+        
         const threshold = 50;
         return { 
             matched: bestScore >= threshold, 
@@ -214,6 +453,26 @@ class TencentDocsFiller:
             matchedKey: bestSubKey
         };
     }
+    
+    /**
+     * 查找全局最优分配方案（来自 OptimalFieldAssignment.build_plan）
+     * @param {Object|null} plan - { 清理后的标题: { index, key, score } }
+     * @param {string|Array<string>} titleOrIdentifiers - 标题字符串或标识符数组
+     * @returns {Object|null} 分配项，方案中没有该字段时返回 null（由调用方回退到逐个匹配）
+     */
+    function lookupAssignment(plan, titleOrIdentifiers) {
+        if (!plan) return null;
+        const identifiers = Array.isArray(titleOrIdentifiers) ? titleOrIdentifiers : [titleOrIdentifiers];
+        for (const identifier of identifiers) {
+            const text = String(identifier || '');
+            // 页面提取的标题可能只取了第一行
+            for (const candidate of [text, text.split('\\n')[0]]) {
+                const entry = plan[cleanText(candidate)];
+                if (entry) return entry;
+            }
+        }
+        return null;
+    }
 """
     
     @staticmethod
@@ -233,11 +492,13 @@ class TencentDocsFiller:
                 allInputs: [...],             // 所有输入框数组
                 getIdentifiers: (input, i) => [...],  // 获取输入框标识符的函数
                 fillInput: (input, value) => {},      // 填充函数
-                onProgress: (msg) => {}       // 进度回调（可选）
+                onProgress: (msg) => {},      // 进度回调（可选）
+                assignmentPlan: {...},        // 全局最优分配方案（可选，见 OptimalFieldAssignment）
+                batchWrites: true             // 普通文本框批量写入（可选，也可传 (input) => boolean，见 get_value_writer）
             });
             await executor.execute();
         """
-        return """
+        return TencentDocsFiller.get_value_writer() + """
     /**
      * 创建共享的表单填充执行器（腾讯文档算法）
      * @param {Object} config - 配置对象
@@ -249,10 +510,16 @@ class TencentDocsFiller:
             allInputs,          // 所有输入框数组
             getIdentifiers,     // 函数：(input, index) => [标识符数组]
             fillInput,          // 函数：(input, value) => {} 执行填充
-            onProgress          // 可选回调：(message) => {} 进度信息
+            onProgress,         // 可选回调：(message) => {} 进度信息
+            assignmentPlan,     // 可选：全局最优分配方案 { 清理后的标题: { index, key, score } }
+            batchWrites         // 可选：true 或 (input) => boolean，普通文本框交给批量写入器
         } = config;
         
         const log = onProgress || console.log;
+        const writer = createValueWriter({
+            fallback: fillInput,
+            accepts: typeof batchWrites === 'function' ? batchWrites : null
+        });
         
         return {
             async execute() {
@@ -261,18 +528,22 @@ class TencentDocsFiller:
                 log('═══════════════════════════════════════════════════════════════');
                 log(`找到 ${allInputs.length} 个输入框`);
                 
-                // 打印名片字段列表
+                // @debug-begin 打印名片字段列表
                 log('\\n📇 名片字段列表:');
                 fillData.forEach((item, i) => {
                     const valuePreview = String(item.value).substring(0, 20) + 
                                         (String(item.value).length > 20 ? '...' : '');
                     log(`   ${i + 1}. "${item.key}" = "${valuePreview}"`);
                 });
+                // @debug-end
                 
                 log('\\n═══════════════════════════════════════════════════════════════');
                 log('📝 开始逐个匹配并填充（腾讯文档算法）...');
                 log('═══════════════════════════════════════════════════════════════');
                 
+                // 名片 key 只分割一次，后续每个输入框直接复用
+                prepareKeywords(fillData.map(item => item.key));
+                
                 let fillCount = 0;
                 const results = [];
                 const usedCardKeys = new Set();
@@ -295,13 +566,24 @@ class TencentDocsFiller:
                     let maxScore = 0;
                     let matchedCardItem = null;
                     
-                    for (const cardItem of fillData) {
-                        const result = matchKeyword(identifiers, cardItem.key);
-                        if (result.matched && result.score > maxScore) {
-                            maxScore = result.score;
-                            matchedKey = cardItem.key;
-                            matchedValue = cardItem.value;
-                            matchedCardItem = cardItem;
+                    // 优先使用全局最优分配方案
+                    const planned = lookupAssignment(assignmentPlan, identifiers);
+                    const plannedItem = planned ? fillData[planned.index] : null;
+                    if (plannedItem && plannedItem.key === planned.key) {
+                        maxScore = planned.score;
+                        matchedKey = plannedItem.key;
+                        matchedValue = plannedItem.value;
+                        matchedCardItem = plannedItem;
+                        log(`  🧮 使用最优分配方案`);
+                    } else {
+                        for (const cardItem of fillData) {
+                            const result = matchKeyword(identifiers, cardItem.key);
+                            if (result.matched && result.score > maxScore) {
+                                maxScore = result.score;
+                                matchedKey = cardItem.key;
+                                matchedValue = cardItem.value;
+                                matchedCardItem = cardItem;
+                            }
                         }
                     }
                     
@@ -313,22 +595,24 @@ class TencentDocsFiller:
                     
                     log(`  ✅ 匹配成功: "${mainTitle}" ← "${matchedKey}" (分数: ${maxScore.toFixed(1)})`);
                     
-                    // 执行填充
+                    // 执行填充（普通文本框排队批量写入，其他字段立即填充）
+                    const queued = Boolean(batchWrites) && writer.accepts(input);
                     try {
-                        fillInput(input, matchedValue);
+                        const record = {
+                            key: matchedKey,
+                            value: matchedValue,
+                            matched: mainTitle,
+                            score: maxScore,
+                            success: true
+                        };
+                        if (queued) writer.write(input, matchedValue, record); else fillInput(input, matchedValue);
                         usedCardKeys.add(matchedKey);
                         fillCount++;
                         const valuePreview = String(matchedValue).substring(0, 30) + 
                                             (String(matchedValue).length > 30 ? '...' : '');
                         log(`  ✅ 填写成功: "${mainTitle}" = "${valuePreview}"`);
                         
-                        results.push({
-                            key: matchedKey,
-                            value: matchedValue,
-                            matched: mainTitle,
-                            score: maxScore,
-                            success: true
-                        });
+                        results.push(record);
                     } catch (error) {
                         log(`  ❌ 填写失败: ${error.message}`);
                         results.push({
@@ -341,10 +625,17 @@ class TencentDocsFiller:
                         });
                     }
                     
-                    // 延迟，避免操作过快
-                    await new Promise(resolve => setTimeout(resolve, 50));
+                    // 延迟，避免操作过快（批量写入的字段不需要）
+                    if (!queued) await new Promise(resolve => setTimeout(resolve, 50));
                 }
                 
+                // 批量写入的字段统一校验
+                const writeCheck = await writer.flush();
+                writeCheck.failed.forEach(job => {
+                    job.tag.verified = false;
+                    log(`  ⚠️  值未保留: "${job.tag.matched}"`);
+                });
+                
                 // 汇总结果
                 log('\\n═══════════════════════════════════════════════════════════════');
                 log('📊 填写汇总:');
@@ -362,26 +653,700 @@ class TencentDocsFiller:
                     log(`✅ 所有名片字段都已使用`);
                 }
                 
-                log(`\\n✅ 表单填写完成: ${fillCount}/${allInputs.length} 个输入框`);
+                const matchStats = getMatchStats();
+                log(`\\n⏱️  匹配耗时: ${matchStats.time}ms（${matchStats.calls} 次匹配，` +
+                    `文本清理缓存命中 ${matchStats.cleanHits}/${matchStats.cleanHits + matchStats.cleanMisses}）`);
+                log(`✅ 表单填写完成: ${fillCount}/${allInputs.length} 个输入框`);
                 log('═══════════════════════════════════════════════════════════════\\n');
                 
                 return {
                     fillCount,
                     totalCount: allInputs.length,
                     status: 'completed',
-                    results
+                    results,
+                    matchStats
                 };
             }
         };
     }
 """
-    
-    def generate_fill_script(self, field_data: Dict[str, str]) -> str:
+
+    @staticmethod
+    def get_two_phase_execution_logic() -> str:
+        """
+        获取两阶段协议的执行逻辑 JavaScript 代码
+        与 get_shared_execution_logic() 提供同名的 createSharedExecutor(config)，
+        平台脚本无需修改即可切换；但不包含匹配算法，匹配交给 Python 端的 MatchService
+
+        阶段由注入脚本前设置的 window.__autoFillPhase__ 决定：
+            { mode: 'extract' }                      → 给每个字段打上 data-af-idx 标记，
+                                                       返回字段描述 { idx, identifiers, type, options }
+            { mode: 'apply', instructions: [...] }   → 按 idx 找到字段并填入指令中的值
+            { mode: 'apply', instructions, expect }  → 缓存的指令：先校验字段数量和标题，
+                                                       不一致时返回 status 'stale' 和最新字段描述
+
+        提取阶段没有单独的精简脚本：平台脚本中的字段扫描（allInputs、getIdentifiers）和填值函数
+        （fillInput）两个阶段都要用，所以两个阶段执行同一个去掉匹配算法的平台脚本（约 25~40KB，
+        生产构建压缩后约一半）。脚本由 Profile 预装为用户脚本（FillScriptEngines），每个页面只编译一次，
+        之后每个阶段只发送阶段参数
+
+        Returns:
+            JavaScript 函数代码字符串：createSharedExecutor(config)
+        """
+        return TencentDocsFiller.get_value_writer() + """
+    /**
+     * 创建两阶段协议的表单填充执行器（提取字段 / 按指令填充）
+     * @param {Object} config - 配置对象（与共享执行器相同，fillData 不再使用）
+     * @returns {Object} - 执行器对象，包含 execute() 方法
+     */
+    function createSharedExecutor(config) {
+        const {
+            allInputs,          // 所有输入框数组（元素或平台字段对象）
+            getIdentifiers,     // 函数：(input, index) => [标识符数组]
+            fillInput,          // 函数：(input, value) => {} 执行填充
+            onProgress,         // 可选回调：(message) => {} 进度信息
+            batchWrites         // 可选：true 或 (input) => boolean，普通文本框交给批量写入器
+        } = config;
+
+        const log = onProgress || console.log;
+        const phase = window.__autoFillPhase__ || { mode: 'extract' };
+        const writer = createValueWriter({
+            fallback: fillInput,
+            accepts: typeof batchWrites === 'function' ? batchWrites : null
+        });
+
+        // 字段对应的 DOM 元素（平台字段对象取 input/editor/element/selector）
+        function targetElement(item) {
+            if (item instanceof Element) return item;
+            if (!item) return null;
+            for (const name of ['input', 'editor', 'element', 'selector']) {
+                if (item[name] instanceof Element) return item[name];
+            }
+            return null;
+        }
+
+        // 给每个字段打上 data-af-idx 标记（清除上一次的标记）
+        function stamp() {
+            document.querySelectorAll('[data-af-idx]').forEach(el => el.removeAttribute('data-af-idx'));
+            allInputs.forEach((item, i) => {
+                const el = targetElement(item);
+                if (el) el.setAttribute('data-af-idx', String(i));
+            });
+        }
+
+        function extract() {
+            stamp();
+            const fields = [];
+            for (let i = 0; i < allInputs.length; i++) {
+                const item = allInputs[i];
+                const el = targetElement(item);
+                fields.push({
+                    idx: i,
+                    identifiers: getIdentifiers(item, i).filter(Boolean).map(String),
+                    type: (item && item.fieldType) || (el ? (el.type || el.tagName.toLowerCase()) : ''),
+                    options: el && el.tagName === 'SELECT'
+                        ? Array.from(el.options).map(option => option.text.trim())
+                        : []
+                });
+            }
+            log(`📤 已提取 ${fields.length} 个字段，等待 Python 端匹配`);
+            return {
+                fillCount: 0,
+                totalCount: allInputs.length,
+                status: 'extracted',
+                fields,
+                results: []
+            };
+        }
+
+        // 缓存的指令：字段数量和标题与缓存一致才可直接使用
+        function matchesExpected(instructions, expect) {
+            if (expect.count !== allInputs.length) return false;
+            // 与 extract() 提取的标识符、Python 端生成的标题使用相同的规则
+            return instructions.every(step => {
+                const item = allInputs[step.idx];
+                if (!item) return false;
+                const identifiers = getIdentifiers(item, step.idx).filter(Boolean).map(String);
+                return (identifiers.length > 0 ? identifiers[0] : '(无标题)') === step.title;
+            });
+        }
+
+        async function apply(instructions, expect) {
+            if (expect) {
+                if (!matchesExpected(instructions, expect)) {
+                    log('♻️ 表单结构已变化，缓存的填充指令失效，返回最新字段');
+                    return Object.assign(extract(), { status: 'stale' });
+                }
+                stamp();
+            }
+
+            // 优先按 data-af-idx 标记定位，标记丢失时退回到扫描顺序
+            const byIdx = new Map();
+            allInputs.forEach((item, i) => {
+                const el = targetElement(item);
+                const stamp = el ? el.getAttribute('data-af-idx') : null;
+                byIdx.set(stamp !== null ? Number(stamp) : i, item);
+            });
+
+            let fillCount = 0;
+            const results = [];
+            for (const step of instructions) {
+                const item = byIdx.get(step.idx);
+                const record = {
+                    key: step.key,
+                    value: step.value,
+                    matched: step.title,
+                    score: step.score,
+                    success: false
+                };
+                if (!item) {
+                    log(`  ⚠️  字段 ${step.idx} 已不存在: "${step.title}"`);
+                    record.error = '字段不存在';
+                    results.push(record);
+                    continue;
+                }
+                const queued = Boolean(batchWrites) && writer.accepts(item);
+                try {
+                    if (queued) writer.write(item, step.value, record); else fillInput(item, step.value);
+                    fillCount++;
+                    record.success = true;
+                    log(`  ✅ 填写成功: "${step.title}" ← "${step.key}" (分数: ${Number(step.score).toFixed(1)})`);
+                } catch (error) {
+                    log(`  ❌ 填写失败: ${error.message}`);
+                    record.error = error.message;
+                }
+                results.push(record);
+
+                // 延迟，避免操作过快（批量写入的字段不需要）
+                if (!queued) await new Promise(resolve => setTimeout(resolve, 50));
+            }
+
+            // 批量写入的字段统一校验
+            const writeCheck = await writer.flush();
+            writeCheck.failed.forEach(job => {
+                job.tag.verified = false;
+                log(`  ⚠️  值未保留: "${job.tag.matched}"`);
+            });
+
+            log(`\\n✅ 表单填写完成: ${fillCount}/${allInputs.length} 个输入框`);
+            return {
+                fillCount,
+                totalCount: allInputs.length,
+                status: 'completed',
+                results
+            };
+        }
+
+        return {
+            async execute() {
+                if (phase.mode === 'apply') {
+                    return await apply(phase.instructions || [], phase.expect);
+                }
+                return extract();
+            }
+        };
+    }
+"""
+
+    @staticmethod
+    def get_incremental_observer() -> str:
+        """
+        获取增量模式的 JavaScript 代码：observeNewQuestions(options)
+
+        带条件逻辑的表单在前面的题目填写后才插入新题目，或者把已有的隐藏题目改为显示（修改 style / class）。
+        增量模式用 MutationObserver 收集新插入和新显示的问题节点，已处理的节点记录在 WeakSet 中，
+        不再重新扫描、重新匹配整张表单；仍然隐藏的节点留到显示后再处理
+
+        使用方法：
+            const processed = new WeakSet();      // 首轮处理过的问题节点也要加入
+            observeNewQuestions({
+                selector: '.question[data-qid]',  // 问题节点选择器
+                processed: processed,
+                onNewQuestions: async (nodes) => {},   // 按文档顺序传入新问题节点
+                timeoutMs: 60000                  // 监听时长（可选）
+            });
+        """
+        return """
+    /**
+     * 增量模式：监听新插入或新显示的问题节点，只处理未处理过的节点
+     * @param {Object} options - { selector, processed, onNewQuestions, timeoutMs }
+     * @returns {MutationObserver}
+     */
+    function observeNewQuestions(options) {
+        const { selector, processed, onNewQuestions, timeoutMs = 60000 } = options;
+        const pending = new Set();
+        let scheduled = false;
+        let running = Promise.resolve();
+
+        // 同一页面重复执行填充脚本时，先停止上一次的监听
+        if (window.__autoFillObserver__) {
+            window.__autoFillObserver__.disconnect();
+        }
+
+        function collect(node) {
+            if (node.nodeType !== Node.ELEMENT_NODE) return;
+            if (node.matches(selector)) pending.add(node);
+            node.querySelectorAll(selector).forEach(el => pending.add(el));
+        }
+
+        // 显示状态改变（style / class）的节点：问题容器本身或其中的元素
+        function collectShown(node) {
+            if (node.nodeType !== Node.ELEMENT_NODE) return;
+            const question = node.closest(selector);
+            if (question && !processed.has(question)) pending.add(question);
+        }
+
+        function flush() {
+            scheduled = false;
+            // 仍然隐藏的节点不处理，显示后由属性变化再次收集
+            const nodes = Array.from(pending).filter(node =>
+                node.isConnected && !processed.has(node) && node.getClientRects().length > 0);
+            pending.clear();
+            if (nodes.length === 0) return;
+
+            nodes.sort((a, b) => (a.compareDocumentPosition(b) & Node.DOCUMENT_POSITION_FOLLOWING) ? -1 : 1);
+            nodes.forEach(node => processed.add(node));
+            console.log(`🆕 [增量模式] 发现 ${nodes.length} 个新问题`);
+            // 串行处理，避免与上一批的填充交错
+            running = running
+                .then(() => onNewQuestions(nodes))
+                .catch(error => console.error('❌ [增量模式] 处理新问题失败:', error));
+        }
+
+        const observer = new MutationObserver(mutations => {
+            for (const mutation of mutations) {
+                if (mutation.type === 'attributes') {
+                    collectShown(mutation.target);
+                } else {
+                    mutation.addedNodes.forEach(collect);
+                }
+            }
+            // 合并同一轮渲染插入的节点
+            if (pending.size > 0 && !scheduled) {
+                scheduled = true;
+                setTimeout(flush, 100);
+            }
+        });
+        observer.observe(document.body, {
+            childList: true,
+            subtree: true,
+            attributes: true,
+            attributeFilter: ['style', 'class']
+        });
+        window.__autoFillObserver__ = observer;
+
+        setTimeout(() => observer.disconnect(), timeoutMs);
+        window.addEventListener('pagehide', () => observer.disconnect(), { once: true });
+        console.log('👀 [增量模式] 开始监听新插入的问题');
+        return observer;
+    }
+"""
+
+    @staticmethod
+    def get_ready_waiter() -> str:
+        """
+        获取表单就绪检测的 JavaScript 代码：waitForFormReady(options)
+
+        替代固定间隔的轮询：用 MutationObserver 监听 DOM，问题容器出现且 DOM 连续 quietMs 毫秒
+        没有节点增删时立即返回；页面持续变化（轮播、倒计时等）时，容器出现 maxSettleMs 毫秒后也返回；
+        超过 timeoutMs 仍未出现则放弃。默认值来自 config.FORM_READY_QUIET_MS / FORM_READY_TIMEOUT
+
+        使用方法：
+            const { ready, count, elapsed } = await waitForFormReady({
+                selector: '.question[data-qid]',  // 问题容器选择器
+                quietMs: 150,                     // DOM 静默时长（可选）
+                timeoutMs: 15000                  // 最长等待时间（可选）
+            });
+        """
+        import config
+        quiet_ms = int(getattr(config, 'FORM_READY_QUIET_MS', 150))
+        timeout_ms = int(getattr(config, 'FORM_READY_TIMEOUT', 15) * 1000)
+        return """
+    /**
+     * 等待表单就绪：问题容器出现且 DOM 静默一段时间
+     * @param {Object} options - { selector, quietMs, maxSettleMs, timeoutMs, minCount }
+     * @returns {Promise<{ ready: boolean, count: number, elapsed: number }>}
+     */
+    function waitForFormReady(options) {
+        const {
+            selector,
+            quietMs = %(quiet_ms)d,
+            maxSettleMs = 1500,
+            timeoutMs = %(timeout_ms)d,
+            minCount = 1
+        } = options;
+        const start = performance.now();
+
+        return new Promise(resolve => {
+            let observer = null;
+            let quietTimer = null;
+            let settleTimer = null;
+            let deadlineTimer = null;
+            let found = false;
+            let done = false;
+
+            function finish() {
+                if (done) return;
+                done = true;
+                if (observer) observer.disconnect();
+                clearTimeout(quietTimer);
+                clearTimeout(settleTimer);
+                clearTimeout(deadlineTimer);
+                const count = document.querySelectorAll(selector).length;
+                resolve({ ready: count >= minCount, count, elapsed: Math.round(performance.now() - start) });
+            }
+
+            function onChange() {
+                // 容器出现之前每批变化检查一次；出现之后只需重新计时
+                if (!found) {
+                    if (document.querySelectorAll(selector).length < minCount) return;
+                    found = true;
+                    settleTimer = setTimeout(finish, maxSettleMs);
+                }
+                clearTimeout(quietTimer);
+                quietTimer = setTimeout(finish, quietMs);
+            }
+
+            observer = new MutationObserver(onChange);
+            observer.observe(document.documentElement, { childList: true, subtree: true });
+            deadlineTimer = setTimeout(finish, timeoutMs);
+            onChange();
+        });
+    }
+""" % {'quiet_ms': quiet_ms, 'timeout_ms': timeout_ms}
+
+    @staticmethod
+    def get_label_index() -> str:
+        """
+        获取标签索引的 JavaScript 代码：createLabelIndex(root) / getLabelIndex(element)
+
+        提取标识符时每个输入框都要查 input.labels、label[for]、父元素里的 label 和直接文本，
+        每次查询都会扫描一遍 DOM（input.labels 和 querySelector 都是整树查找），大表单上是 O(输入框数 × 节点数)。
+        这里用一次 TreeWalker 遍历预先建立查询表，同一次填写中的所有输入框共用：
+
+        - labelsOf(input)：等价于 input.labels（for 关联 + 包裹的 label，按文档顺序）
+        - labelForId(id)：等价于 document.querySelector(`label[for="${id}"]`)
+        - firstLabel(el)：等价于 el.querySelector('label')
+        - ownText(el)：el 的直接子文本节点（trim 后以空格连接）
+        - controlCount(el)：等价于 el.querySelectorAll('input, textarea').length
+
+        getLabelIndex(el) 返回本次填写缓存的索引；el 是建立索引之后才插入的元素（增量填写、异步渲染）时重建
+
+        使用方法：
+            const index = getLabelIndex(input);
+            index.labelsOf(input).forEach(label => addIdentifier(label.innerText || label.textContent));
+        """
+        return """
+    /**
+     * 标签索引：一次 TreeWalker 遍历建立 输入框 → 标签 的查询表
+     * @param {Element} root - 遍历的根元素（默认 document.body）
+     */
+    function createLabelIndex(root) {
+        root = root || document.body || document.documentElement;
+        const LABELABLE = new Set(['INPUT', 'TEXTAREA', 'SELECT', 'BUTTON', 'METER', 'OUTPUT', 'PROGRESS']);
+        const labelOrder = new Map();       // label → 文档顺序
+        const labelsByFor = new Map();      // for 属性值 → [label, ...]
+        const wrappingLabels = new Map();   // 控件 → [包裹它的 label, ...]
+        const elementsById = new Map();     // id → 文档中第一个该 id 的元素
+        const firstLabels = new Map();      // 元素 → 子树中第一个 label
+        const ownTexts = new Map();         // 元素 → [直接子文本节点, ...]
+        const controlRanges = new Map();    // 元素 → [进入时 input/textarea 计数, 离开时计数]
+        const unclaimed = [];               // 尚未关联控件的包裹式 label（没有 for 属性）
+        const stack = [];
+        let controls = 0;
+
+        function isLabelable(el) {
+            return LABELABLE.has(el.tagName) && !(el.tagName === 'INPUT' && el.type === 'hidden');
+        }
+
+        function open(el) {
+            const tag = el.tagName;
+            if (el.id && !elementsById.has(el.id)) elementsById.set(el.id, el);
+            if (tag === 'INPUT' || tag === 'TEXTAREA') controls++;
+            if (isLabelable(el) && unclaimed.length > 0) {
+                // 没有 for 属性的 label 关联子树中的第一个控件
+                wrappingLabels.set(el, unclaimed.splice(0));
+            }
+            if (tag === 'LABEL') {
+                labelOrder.set(el, labelOrder.size);
+                // 祖先中还没有记录 label 的都以它为第一个 label（文档顺序）
+                for (let i = stack.length - 1; i >= 0 && !firstLabels.has(stack[i]); i--) {
+                    firstLabels.set(stack[i], el);
+                }
+                if (el.hasAttribute('for')) {
+                    const id = el.htmlFor;
+                    if (!labelsByFor.has(id)) labelsByFor.set(id, []);
+                    labelsByFor.get(id).push(el);
+                } else {
+                    unclaimed.push(el);
+                }
+            }
+            controlRanges.set(el, [controls, controls]);
+            stack.push(el);
+        }
+
+        function close(el) {
+            controlRanges.get(el)[1] = controls;
+            const pos = unclaimed.indexOf(el);
+            if (pos >= 0) unclaimed.splice(pos, 1);
+        }
+
+        const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT);
+        open(root);
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            const parent = node.parentNode;
+            while (stack.length > 1 && stack[stack.length - 1] !== parent) close(stack.pop());
+            if (node.nodeType === Node.TEXT_NODE) {
+                if (!ownTexts.has(parent)) ownTexts.set(parent, []);
+                ownTexts.get(parent).push(node);
+            } else {
+                open(node);
+            }
+        }
+        while (stack.length > 0) close(stack.pop());
+
+        function has(el) {
+            return controlRanges.has(el);
+        }
+
+        function labelsOf(input) {
+            if (!has(input)) return Array.from(input.labels || []);
+            if (!isLabelable(input)) return [];
+            const byFor = input.id && elementsById.get(input.id) === input ? (labelsByFor.get(input.id) || []) : [];
+            const labels = byFor.concat(wrappingLabels.get(input) || []);
+            return labels.length > 1 ? labels.sort((a, b) => labelOrder.get(a) - labelOrder.get(b)) : labels;
+        }
+
+        function labelForId(id) {
+            const labels = labelsByFor.get(id);
+            return labels ? labels[0] : null;
+        }
+
+        function firstLabel(el) {
+            if (!has(el)) return el.querySelector('label');
+            return firstLabels.get(el) || null;
+        }
+
+        function ownText(el) {
+            const nodes = has(el) ? (ownTexts.get(el) || []) :
+                Array.from(el.childNodes).filter(node => node.nodeType === Node.TEXT_NODE);
+            return nodes.map(node => node.textContent.trim()).join(' ');
+        }
+
+        function controlCount(el) {
+            if (!has(el)) return el.querySelectorAll('input, textarea').length;
+            const range = controlRanges.get(el);
+            return range[1] - range[0];
+        }
+
+        return { root, has, labelsOf, labelForId, firstLabel, ownText, controlCount };
+    }
+
+    // 本次填写使用的标签索引
+    let labelIndex = null;
+
+    /**
+     * 获取标签索引（本次填写内缓存）
+     * @param {Element} element - 要查询的元素；它是建立索引之后才插入的新元素时重建索引
+     */
+    function getLabelIndex(element) {
+        if (!labelIndex || !labelIndex.root.isConnected ||
+            (element && !labelIndex.has(element) && labelIndex.root.contains(element))) {
+            labelIndex = createLabelIndex();
+        }
+        return labelIndex;
+    }
+"""
+
+    @staticmethod
+    def get_value_writer() -> str:
+        """
+        获取批量写入输入框的 JavaScript 代码：createValueWriter(options)
+
+        逐个填写时每个字段都要 focus/click、原生 setter 赋值、依次派发 input/change/keydown/keypress/keyup/blur，
+        中间还读回 input.value，每个字段都触发一次样式计算和布局，字段之间再等待 50ms。
+        批量写入器把普通文本框的写入排队，在动画帧中集中写入（每帧限时），只写不读，
+        并按输入框所属的框架只派发需要的事件：
+        - React：input（onChange 由 input 事件触发，写入前重置 _valueTracker）
+        - Vue：input、change（v-model 监听 input，.lazy 和组件库监听 change）
+        - 其他页面：input、change、blur
+        全部写完后一次性读取校验，值没有保留的字段再用平台原来的填充函数逐个重试。
+        config.FILL_BATCH_WRITES = False 时 accepts() 始终返回 false，平台脚本退回逐个填写
+
+        使用方法：
+            const writer = createValueWriter({ fallback: fillInput });
+            if (writer.accepts(input)) writer.write(input, value, record); else fillInput(input, value);
+            const { written, retried, failed } = await writer.flush();   // failed: [{ input, value, tag }]
+        """
+        import config
+        enabled = bool(getattr(config, 'FILL_BATCH_WRITES', True))
+        return """
+    /**
+     * 批量写入器：普通文本框按动画帧批量写入，只派发框架需要的事件，最后一次性校验
+     * @param {Object} options - { fallback, accepts, frameBudgetMs }
+     */
+    function createValueWriter(options = {}) {
+        const {
+            fallback = null,        // 校验失败时逐个重试的平台填充函数 (input, value) => {}
+            accepts = null,         // 可选：(input) => boolean，平台特殊输入框返回 false 仍走原填充函数
+            frameBudgetMs = 8       // 每帧写入最多占用的时间（毫秒）
+        } = options;
+        const ENABLED = %(enabled)s;
+        const TEXT_TYPES = new Set(['text', 'tel', 'email', 'number', 'url', 'search', 'password']);
+        const EVENTS = {
+            react: ['input'],
+            vue: ['input', 'change'],
+            plain: ['input', 'change', 'blur']
+        };
+        const SETTERS = {
+            INPUT: Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set,
+            TEXTAREA: Object.getOwnPropertyDescriptor(HTMLTextAreaElement.prototype, 'value').set
+        };
+        const VUE_KEYS = ['_vei', '_vModifiers', '_assign', '__vue__', '__vueParentComponent'];
+        const queue = [];
+        const written = [];
+        let draining = null;
+        let pageFramework = null;
+
+        function isTextControl(input) {
+            if (!(input instanceof Element) || input.disabled || input.readOnly) return false;
+            if (input.tagName === 'TEXTAREA') return true;
+            return input.tagName === 'INPUT' && TEXT_TYPES.has(input.type);
+        }
+
+        // 按输入框上框架留下的属性判断（React 在每个 DOM 节点上挂 __reactFiber$ / __reactProps$）
+        function frameworkOf(input) {
+            const keys = Object.keys(input);
+            if (keys.some(key => key.startsWith('__react'))) return 'react';
+            if (keys.some(key => VUE_KEYS.includes(key)) ||
+                Object.getOwnPropertySymbols(input).length > 0 ||
+                Array.from(input.attributes).some(attr => attr.name.startsWith('data-v-'))) {
+                return 'vue';
+            }
+            if (pageFramework === null) {
+                pageFramework = window.__VUE__ || window.Vue || document.querySelector('[data-v-app]') ? 'vue' : 'plain';
+            }
+            return pageFramework;
+        }
+
+        function createEvent(type, value) {
+            if (type === 'input') {
+                return new InputEvent('input', { bubbles: true, cancelable: true, inputType: 'insertText', data: value });
+            }
+            return new Event(type, { bubbles: true, cancelable: true });
+        }
+
+        // 写入一个输入框：只写不读，避免每个字段触发一次同步布局
+        function commit(job) {
+            const { input, value } = job;
+            // React 用 _valueTracker 判断值是否变化，重置后 input 事件才会触发 onChange
+            if (input._valueTracker) input._valueTracker.setValue('');
+            SETTERS[input.tagName].call(input, value);
+            EVENTS[frameworkOf(input)].forEach(type => input.dispatchEvent(createEvent(type, value)));
+        }
+
+        // 下一动画帧；后台页面不执行 requestAnimationFrame，用定时器兜底
+        function nextFrame() {
+            return new Promise(resolve => {
+                const timer = setTimeout(resolve, 50);
+                requestAnimationFrame(() => {
+                    clearTimeout(timer);
+                    resolve();
+                });
+            });
+        }
+
+        async function drain() {
+            while (queue.length > 0) {
+                await nextFrame();
+                const start = performance.now();
+                do {
+                    const job = queue.shift();
+                    try {
+                        commit(job);
+                    } catch (e) {
+                        console.warn('⚠️ 批量写入失败，校验时重试:', e.message);
+                    }
+                    written.push(job);
+                } while (queue.length > 0 && performance.now() - start < frameBudgetMs);
+            }
+        }
+
+        function schedule() {
+            if (!draining) {
+                draining = drain().then(() => {
+                    draining = null;
+                    if (queue.length > 0) schedule();
+                });
+            }
+        }
+
+        return {
+            accepts(input) {
+                return ENABLED && isTextControl(input) && (!accepts || Boolean(accepts(input)));
+            },
+
+            /**
+             * 排队写入（下一动画帧执行）
+             * @param {*} tag - 调用方的标记（如结果记录），校验失败时原样返回
+             */
+            write(input, value, tag = null) {
+                queue.push({ input, value: String(value), tag });
+                schedule();
+            },
+
+            /**
+             * 等待排队的写入完成，一次性校验，值未保留的用 fallback 重试
+             * @returns {Promise<{ written: number, retried: number, failed: Array }>}
+             */
+            async flush() {
+                while (draining) await draining;
+                if (written.length === 0) return { written: 0, retried: 0, failed: [] };
+
+                // 等框架完成本轮渲染（受控组件会在这之前把值改回 state）再统一读取
+                await nextFrame();
+                const jobs = written.splice(0);
+                const mismatched = jobs.filter(job => job.input.isConnected && job.input.value !== job.value);
+                const failed = [];
+                for (const job of mismatched) {
+                    try {
+                        if (fallback) await fallback(job.input, job.value);
+                    } catch (e) {
+                        console.warn('⚠️ 重试填写失败:', e.message);
+                    }
+                    if (job.input.value !== job.value) failed.push(job);
+                }
+                if (mismatched.length > 0) {
+                    console.warn(`⚠️ 批量写入: ${mismatched.length} 个输入框的值未保留，已逐个重试，仍不一致 ${failed.length} 个`);
+                }
+                return { written: jobs.length, retried: mismatched.length, failed };
+            }
+        };
+    }
+""" % {'enabled': 'true' if enabled else 'false'}
+
+    @staticmethod
+    def get_shared_script_parts(two_phase: bool = False) -> Tuple[str, str]:
+        """
+        获取平台脚本需要内嵌的 (匹配算法, 执行逻辑)
+
+        Args:
+            two_phase: 是否使用两阶段协议（不内嵌匹配算法，由 Python 端匹配）
+        """
+        if two_phase:
+            return '', TencentDocsFiller.get_two_phase_execution_logic()
+        return (TencentDocsFiller.get_shared_match_algorithm(),
+                TencentDocsFiller.get_shared_execution_logic())
+
+    def generate_fill_script(self, field_data: Dict[str, str], incremental: bool = False,
+                             incremental_timeout: int = 60) -> str:
         """
         生成填写腾讯文档表单的 JavaScript 脚本（使用共享匹配算法和执行逻辑）
         
         Args:
             field_data: 字段数据，格式 {字段名: 值}
+            incremental: 增量模式，填写后继续监听新显示的问题，只用未使用的字段匹配新问题
+            incremental_timeout: 增量模式监听时长（秒）
         
         Returns:
             JavaScript 代码字符串
@@ -389,6 +1354,8 @@ class TencentDocsFiller:
         # 获取共享的匹配算法和执行逻辑
         shared_algorithm = self.get_shared_match_algorithm()
         shared_executor = self.get_shared_execution_logic()
+        incremental_observer = self.get_incremental_observer() if incremental else ''
+        ready_waiter = self.get_ready_waiter()
         
         js_code = f"""
 (async function() {{
@@ -403,27 +1370,26 @@ class TencentDocsFiller:
     }};
     
     const fieldData = {self._dict_to_js_object(field_data)};
+    // 增量模式：填写完成后继续监听条件逻辑新显示的问题
+    const incrementalMode = {'true' if incremental else 'false'};
     
 {shared_algorithm}
     
 {shared_executor}
     
+{incremental_observer}
+    
+{ready_waiter}
+    
     /**
      * 等待页面加载完成
      */
     async function waitForPageReady() {{
         console.log('⏳ 等待页面加载...');
-        const maxAttempts = 10;
-        let attempts = 0;
-        
-        while (attempts < maxAttempts) {{
-            const questions = document.querySelectorAll('.question[data-qid]');
-            if (questions.length > 0) {{
-                console.log(`✅ 页面已加载，找到 ${{questions.length}} 个问题`);
-                return true;
-            }}
-            await new Promise(resolve => setTimeout(resolve, 500));
-            attempts++;
+        const {{ ready, count, elapsed }} = await waitForFormReady({{ selector: '.question[data-qid]' }});
+        if (ready) {{
+            console.log(`✅ 页面已加载，找到 ${{count}} 个问题（${{elapsed}}ms）`);
+            return true;
         }}
         
         console.error('❌ 页面加载超时');
@@ -457,10 +1423,48 @@ class TencentDocsFiller:
         return null;
     }}
     
+    // 普通文本框的批量写入器（createValueWriter 随共享执行逻辑内嵌），校验失败时用 typeIntoInput 重试
+    const valueWriter = createValueWriter({{ fallback: typeIntoInput }});
+    // 已排队批量写入的结果（不需要逐题等待）
+    const batchedResults = new WeakSet();
+    
+    /**
+     * 逐个填写：聚焦、赋值、派发事件
+     */
+    async function typeIntoInput(input, value) {{
+        input.focus();
+        await new Promise(resolve => setTimeout(resolve, 50));
+        
+        // 设置值
+        input.value = value;
+        
+        // 触发事件
+        const events = ['input', 'change', 'blur'];
+        events.forEach(eventType => {{
+            const event = new Event(eventType, {{ bubbles: true, cancelable: true }});
+            input.dispatchEvent(event);
+        }});
+        
+        // 再次失焦
+        input.blur();
+    }}
+    
+    /**
+     * 等待批量写入完成并校验，值未保留的结果标记 verified: false
+     */
+    async function flushWrites() {{
+        const writeCheck = await valueWriter.flush();
+        writeCheck.failed.forEach(job => {{
+            job.tag.verified = false;
+            console.warn(`  ⚠️ 值未保留: "${{job.tag.field}}"`);
+        }});
+    }}
+    
     /**
      * 填写单个问题
+     * @param {{Set}} excludedKeys - 跳过的字段（增量模式下为已使用的字段）
      */
-    async function fillQuestion(questionElement) {{
+    async function fillQuestion(questionElement, excludedKeys = null) {{
         try {{
             const title = getQuestionTitle(questionElement);
             if (!title) {{
@@ -474,6 +1478,7 @@ class TencentDocsFiller:
             let maxScore = 0;
             
             for (const [key, value] of Object.entries(fieldData)) {{
+                if (excludedKeys && excludedKeys.has(key)) continue;
                 const result = matchKeyword(title, key);
                 if (result.matched && result.score > maxScore) {{
                     maxScore = result.score;
@@ -510,25 +1515,17 @@ class TencentDocsFiller:
                 console.log('  🔓 已移除只读属性');
             }}
             
-            // 聚焦输入框
-            input.focus();
-            await new Promise(resolve => setTimeout(resolve, 50));
-            
-            // 设置值
-            input.value = matchedValue;
-            
-            // 触发事件
-            const events = ['input', 'change', 'blur'];
-            events.forEach(eventType => {{
-                const event = new Event(eventType, {{ bubbles: true, cancelable: true }});
-                input.dispatchEvent(event);
-            }});
-            
-            // 再次失焦
-            input.blur();
+            const result = {{ field: title, status: 'success', key: matchedKey, value: matchedValue }};
+            if (valueWriter.accepts(input)) {{
+                // 普通文本框排队，下一动画帧批量写入
+                valueWriter.write(input, matchedValue, result);
+                batchedResults.add(result);
+            }} else {{
+                await typeIntoInput(input, matchedValue);
+            }}
             
             console.log(`  ✅ 填写成功: "${{title}}" = "${{matchedValue}}"`);
-            return {{ field: title, status: 'success', value: matchedValue }};
+            return result;
             
         }} catch (error) {{
             console.error('  ❌ 填写失败:', error);
@@ -555,12 +1552,16 @@ class TencentDocsFiller:
             
             // 获取所有问题
             const questions = document.querySelectorAll('.question[data-qid]');
+            const processedQuestions = new WeakSet(questions);
             console.log(`\\n📋 共找到 ${{questions.length}} 个问题`);
             console.log(`📊 待填写字段数: ${{Object.keys(fieldData).length}}`);
             console.log('');
             
             const results = [];
             
+            // 名片 key 只分割一次，后续每个问题直接复用
+            prepareKeywords(Object.keys(fieldData));
+            
             // 遍历所有问题
             for (let i = 0; i < questions.length; i++) {{
                 const question = questions[i];
@@ -576,9 +1577,10 @@ class TencentDocsFiller:
                     results.push(result);
                 }}
                 
-                // 延迟，避免操作过快
-                await new Promise(resolve => setTimeout(resolve, 100));
+                // 延迟，避免操作过快（批量写入的问题不需要）
+                if (!batchedResults.has(result)) await new Promise(resolve => setTimeout(resolve, 100));
             }}
+            await flushWrites();
             
             // 统计结果
             const filled = results.filter(r => r.status === 'success');
@@ -603,6 +1605,9 @@ class TencentDocsFiller:
                 }});
             }}
             
+            const matchStats = getMatchStats();
+            console.log(`\\n⏱️ 匹配耗时: ${{matchStats.time}}ms（${{matchStats.calls}} 次匹配，` +
+                `文本清理缓存命中 ${{matchStats.cleanHits}}/${{matchStats.cleanHits + matchStats.cleanMisses}}）`);
             console.log('\\n====== 填写完成 ======');
             
             // 更新结果
@@ -611,9 +1616,42 @@ class TencentDocsFiller:
                 message: `成功填写 ${{filled.length}} 个字段，失败 ${{failed.length}} 个`,
                 filled: filled,
                 failed: failed,
-                total: results.length
+                total: results.length,
+                matchStats: matchStats
             }};
             
+            if (incrementalMode) {{
+                observeNewQuestions({{
+                    selector: '.question[data-qid]',
+                    processed: processedQuestions,
+                    timeoutMs: {int(incremental_timeout * 1000)},
+                    onNewQuestions: async (nodes) => {{
+                        // 新问题只用尚未填写过的字段匹配
+                        const usedKeys = new Set(results.filter(r => r.status === 'success').map(r => r.key));
+                        for (const question of nodes) {{
+                            const result = await fillQuestion(question, usedKeys);
+                            if (result) {{
+                                results.push(result);
+                                if (result.key) usedKeys.add(result.key);
+                            }}
+                            if (!batchedResults.has(result)) await new Promise(resolve => setTimeout(resolve, 100));
+                        }}
+                        await flushWrites();
+                        
+                        const filled = results.filter(r => r.status === 'success');
+                        const failed = results.filter(r => r.status === 'failed');
+                        window.__autoFillResult__ = {{
+                            status: filled.length > 0 ? 'success' : 'failed',
+                            message: `成功填写 ${{filled.length}} 个字段，失败 ${{failed.length}} 个`,
+                            filled: filled,
+                            failed: failed,
+                            total: results.length
+                        }};
+                        console.log(`✅ [增量模式] 已更新: 成功 ${{filled.length}} 个，失败 ${{failed.length}} 个`);
+                    }}
+                }});
+            }}
+            
         }} catch (error) {{
             console.error('❌ 填写过程出错:', error);
             window.__autoFillResult__ = {{
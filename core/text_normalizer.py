@@ -0,0 +1,88 @@
+"""
+文本归一化
+FieldMatcher 与 SharedMatchAlgorithm 共用的文本清理/关键词分割实现：
+- 预编译 str.translate 删除表（替代每次调用 re.sub）
+- 有界 LRU 缓存清理结果和分割结果，同一填充会话中相同的标题/key 只处理一次
+- 缓存命中/未命中计数，便于观察效果
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Tuple
+
+# 与正则 \s 等价的空白字符集合（Unicode 空白字符最大码位为 U+3000）
+_WHITESPACE = ''.join(chr(c) for c in range(0x3001) if chr(c).isspace())
+
+# 两个匹配器共有的标点
+_COMMON_PUNCTUATION = '：:*？?！!。.、，,'
+
+# FieldMatcher：额外去除 - _ / \
+FIELD_MATCHER_TABLE = str.maketrans('', '', _COMMON_PUNCTUATION + _WHITESPACE + '-_/\\')
+
+# SharedMatchAlgorithm：额外去除 - _ 以及各种括号
+SHARED_MATCH_TABLE = str.maketrans('', '', _COMMON_PUNCTUATION + _WHITESPACE + '-_()（）【】[]')
+
+# 关键词分隔符：| , ; ， ； 、 换行 制表 / ／ \ ｜ ➕ +
+_KEYWORD_SEPARATOR = re.compile(r'[|,;，；、\n\r\t/／\\｜\u2795+]+')
+
+# 缓存容量（按条目计）
+CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _clean_field_text(text: str) -> str:
+    return text.lower().translate(FIELD_MATCHER_TABLE)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _clean_match_text(text: str) -> str:
+    return text.lower().translate(SHARED_MATCH_TABLE)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _split_keywords(keyword: str) -> Tuple[str, ...]:
+    parts = _KEYWORD_SEPARATOR.split(keyword)
+    return tuple(_clean_match_text(p) for p in parts if p.strip())
+
+
+def clean_field_text(text) -> str:
+    """FieldMatcher 规则：转小写，去除空白和常见标点（含 - _ / \\）"""
+    if not text:
+        return ''
+    return _clean_field_text(str(text))
+
+
+def clean_match_text(text) -> str:
+    """SharedMatchAlgorithm 规则：转小写，去除空白、常见标点和括号"""
+    if not text:
+        return ''
+    return _clean_match_text(str(text))
+
+
+def split_keywords(keyword: str) -> Tuple[str, ...]:
+    """分割关键词为已清理的子关键词（结果为元组，调用方不可修改缓存内容）"""
+    if not keyword:
+        return ()
+    return _split_keywords(keyword)
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """返回各缓存的命中/未命中次数和当前大小"""
+    stats = {}
+    for name, func in (('field_text', _clean_field_text),
+                       ('match_text', _clean_match_text),
+                       ('keywords', _split_keywords)):
+        info = func.cache_info()
+        stats[name] = {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': info.maxsize
+        }
+    return stats
+
+
+def clear_cache():
+    """清空所有缓存（同时重置计数）"""
+    _clean_field_text.cache_clear()
+    _clean_match_text.cache_clear()
+    _split_keywords.cache_clear()
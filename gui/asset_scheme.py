@@ -0,0 +1,242 @@
+"""
+共享静态资源缓存的拦截和提供（afasset:// 协议）
+每个 Profile 都装同一个拦截器和协议处理器：
+
+- AssetRequestInterceptor：白名单静态资源域名（config.SHARED_ASSET_HOSTS）上的 GET 脚本/样式/图片/字体请求
+  重定向到 afasset://，其他请求（页面、接口、带登录态的请求）不处理，Cookie 仍按 Profile 隔离
+- AssetSchemeHandler：命中共享缓存（core/asset_cache.py）时直接返回；未命中时用一个不带 Cookie 的
+  QNetworkAccessManager 下载，同一资源同时被多个页面请求时只下载一次
+- 下载失败（非 200、防盗链等）时把请求重定向回原 https 地址，并让拦截器之后不再改写该地址，
+  由 Profile 自己的网络栈正常加载
+- 缓存文件的读写在 AssetIOWorker 所在的后台线程完成，不阻塞界面线程
+- 响应带 Access-Control-Allow-Origin（页面来源），字体、<script crossorigin>、type=module、带 SRI 校验的资源
+  按 CORS 模式加载也能通过；Qt 版本不支持设置响应头时不改写字体和脚本请求（这类请求大多是 CORS 模式）
+
+afasset 协议必须在创建 QApplication 之前注册（main.py 调用 register_asset_scheme()），
+没有注册时 install() 不做任何处理
+"""
+from PyQt6.QtCore import QBuffer, QIODevice, QObject, QThread, QUrl, pyqtSignal, pyqtSlot
+from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
+from PyQt6.QtWebEngineCore import (QWebEngineProfile, QWebEngineUrlRequestInfo, QWebEngineUrlRequestInterceptor,
+                                   QWebEngineUrlRequestJob, QWebEngineUrlScheme, QWebEngineUrlSchemeHandler)
+
+from core.asset_cache import ASSET_SCHEME, from_cache_url, get_asset_store, host_allowed, to_cache_url
+
+# 走共享缓存的资源类型
+CACHED_RESOURCE_TYPES = frozenset({
+    QWebEngineUrlRequestInfo.ResourceType.ResourceTypeScript,
+    QWebEngineUrlRequestInfo.ResourceType.ResourceTypeStylesheet,
+    QWebEngineUrlRequestInfo.ResourceType.ResourceTypeImage,
+    QWebEngineUrlRequestInfo.ResourceType.ResourceTypeFontResource,
+})
+
+# 不能设置响应头（没有 Access-Control-Allow-Origin）时只改写这些类型，字体和脚本多按 CORS 模式加载
+NO_CORS_RESOURCE_TYPES = frozenset({
+    QWebEngineUrlRequestInfo.ResourceType.ResourceTypeStylesheet,
+    QWebEngineUrlRequestInfo.ResourceType.ResourceTypeImage,
+})
+
+# 下载失败、之后不再改写的地址最多记录的数量
+MAX_BYPASS_URLS = 2000
+
+# QWebEngineUrlRequestJob.setAdditionalResponseHeaders 从 Qt 6.6 开始提供
+RESPONSE_HEADERS_SUPPORTED = hasattr(QWebEngineUrlRequestJob, 'setAdditionalResponseHeaders')
+
+
+def _is_deleted(obj) -> bool:
+    try:
+        from PyQt6 import sip
+    except ImportError:
+        import sip
+    return sip.isdeleted(obj)
+
+
+def register_asset_scheme():
+    """注册 afasset 协议（必须在创建 QApplication 之前调用）"""
+    scheme = QWebEngineUrlScheme(ASSET_SCHEME.encode())
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    # 安全协议（https 页面加载不算混合内容）、允许跨域请求、不受页面 CSP 限制（CSP 中只写了 https 的 CDN 域名）
+    scheme.setFlags(QWebEngineUrlScheme.Flag.SecureScheme |
+                    QWebEngineUrlScheme.Flag.CorsEnabled |
+                    QWebEngineUrlScheme.Flag.ContentSecurityPolicyIgnored)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+def asset_scheme_registered() -> bool:
+    return bytes(QWebEngineUrlScheme.schemeByName(ASSET_SCHEME.encode()).name()) == ASSET_SCHEME.encode()
+
+
+class AssetRequestInterceptor(QWebEngineUrlRequestInterceptor):
+    """把白名单域名上的静态资源请求重定向到 afasset://"""
+
+    def __init__(self, hosts, parent=None):
+        super().__init__(parent)
+        self.hosts = tuple(hosts)
+        self.bypass = set()  # 下载失败的地址，交给 Profile 自己加载
+        self.resource_types = CACHED_RESOURCE_TYPES if RESPONSE_HEADERS_SUPPORTED else NO_CORS_RESOURCE_TYPES
+
+    def interceptRequest(self, info):
+        if info.requestMethod() != b'GET' or info.resourceType() not in self.resource_types:
+            return
+        url = info.requestUrl()
+        if url.scheme() != 'https' or url.port() != -1 or not host_allowed(url.host(), self.hosts):
+            return
+        source = url.toString()
+        if source in self.bypass:
+            return
+        info.redirect(QUrl(to_cache_url(source)))
+
+
+class AssetIOWorker(QObject):
+    """在后台线程读写共享缓存（缓存文件的读写不占用界面线程）"""
+
+    loaded = pyqtSignal(str, object)  # 原地址, (Content-Type, 内容) 或 None
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+
+    @pyqtSlot(str)
+    def load(self, source: str):
+        self.loaded.emit(source, self.store.get(source))
+
+    @pyqtSlot(str, str, object, str)
+    def save(self, source: str, content_type: str, data, cache_control: str):
+        self.store.put(source, content_type, data, cache_control)
+
+
+class AssetSchemeHandler(QWebEngineUrlSchemeHandler):
+    """从共享缓存提供 afasset:// 资源，未命中时下载并保存"""
+
+    load_requested = pyqtSignal(str)
+    save_requested = pyqtSignal(str, str, object, str)
+
+    def __init__(self, interceptor: AssetRequestInterceptor, worker: AssetIOWorker, parent=None):
+        super().__init__(parent)
+        self.interceptor = interceptor
+        # 跨线程信号（排队执行）：读写在 worker 所在线程完成，结果回到界面线程
+        self.load_requested.connect(worker.load)
+        self.save_requested.connect(worker.save)
+        worker.loaded.connect(self._on_loaded)
+        # 独立的网络栈：没有任何名片的 Cookie
+        self.network = QNetworkAccessManager(self)
+        self.user_agent = QWebEngineProfile.defaultProfile().httpUserAgent()
+        self._pending = {}  # 原地址 → [等待中的 job]（读取缓存和下载期间）
+
+    def requestStarted(self, job):
+        source = from_cache_url(job.requestUrl().toString())
+        if source is None:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlInvalid)
+            return
+
+        waiting = self._pending.get(source)
+        if waiting is not None:
+            waiting.append(job)
+            return
+        self._pending[source] = [job]
+        self.load_requested.emit(source)
+
+    def _on_loaded(self, source: str, cached):
+        """后台线程读取完成：命中时直接返回，未命中时下载"""
+        jobs = [job for job in self._pending.get(source, []) if not _is_deleted(job)]
+        if cached is not None:
+            self._pending.pop(source, None)
+            for job in jobs:
+                self._reply(job, *cached)
+            return
+        if not jobs:
+            self._pending.pop(source, None)
+            return
+
+        request = QNetworkRequest(QUrl(source))
+        request.setAttribute(QNetworkRequest.Attribute.RedirectPolicyAttribute,
+                             QNetworkRequest.RedirectPolicy.NoLessSafeRedirectPolicy)
+        # 静态资源 CDN 常按 Referer 做防盗链，带上发起请求的页面来源
+        initiator = jobs[0].initiator()
+        if initiator.isValid():
+            request.setRawHeader(b'Referer', (initiator.toString() + '/').encode())
+        request.setRawHeader(b'User-Agent', self.user_agent.encode('latin-1', 'ignore'))
+        reply = self.network.get(request)
+        reply.finished.connect(lambda reply=reply, source=source: self._on_downloaded(source, reply))
+
+    def _on_downloaded(self, source: str, reply: QNetworkReply):
+        jobs = [job for job in self._pending.pop(source, []) if not _is_deleted(job)]
+        status = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        if reply.error() == QNetworkReply.NetworkError.NoError and status == 200:
+            data = bytes(reply.readAll())
+            content_type = reply.header(QNetworkRequest.KnownHeaders.ContentTypeHeader) or 'application/octet-stream'
+            cache_control = bytes(reply.rawHeader(b'Cache-Control')).decode('latin-1')
+            self.save_requested.emit(source, content_type, data, cache_control)
+            for job in jobs:
+                self._reply(job, content_type, data)
+        else:
+            print(f"  ⚠️ 共享资源下载失败，改由页面直接加载: {source} ({status or reply.errorString()})")
+            if len(self.interceptor.bypass) >= MAX_BYPASS_URLS:
+                self.interceptor.bypass.clear()
+            self.interceptor.bypass.add(source)
+            for job in jobs:
+                job.redirect(QUrl(source))
+        reply.deleteLater()
+
+    @staticmethod
+    def _reply(job, content_type: str, data: bytes):
+        if _is_deleted(job):
+            return
+        if RESPONSE_HEADERS_SUPPORTED:
+            # 资源来自另一个源（afasset://），CORS 模式的请求需要允许发起请求的页面来源
+            initiator = job.initiator()
+            origin = initiator.toString().encode() if initiator.isValid() else b''
+            headers = {b'Access-Control-Allow-Origin': origin or b'*'}
+            if origin:
+                headers[b'Access-Control-Allow-Credentials'] = b'true'
+            job.setAdditionalResponseHeaders(headers)
+        buffer = QBuffer(job)
+        buffer.setData(data)
+        buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+        job.reply(content_type.encode('latin-1', 'ignore'), buffer)
+
+
+class SharedAssetCache(QObject):
+    """
+    所有 Profile 共用的拦截器和协议处理器（进程内一个）
+
+    使用方法：
+        SharedAssetCache.install(profile)     # 创建 Profile 后调用
+    """
+
+    _instance = None
+
+    def __init__(self, hosts, parent=None):
+        super().__init__(parent)
+        self.interceptor = AssetRequestInterceptor(hosts, self)
+        self.io_thread = QThread(self)
+        self.io_worker = AssetIOWorker(get_asset_store())
+        self.io_worker.moveToThread(self.io_thread)
+        self.io_thread.finished.connect(self.io_worker.deleteLater)
+        self.io_thread.start()
+        self.handler = AssetSchemeHandler(self.interceptor, self.io_worker, self)
+
+    def shutdown(self):
+        """停止后台读写线程（程序退出时）"""
+        if self.io_thread.isRunning():
+            self.io_thread.quit()
+            # wait() 确保正在进行的写入完成
+            self.io_thread.wait(5000)
+
+    @classmethod
+    def install(cls, profile) -> bool:
+        """为 Profile 安装拦截器和 afasset 协议处理器；协议未注册或白名单为空时返回 False"""
+        import config
+        from PyQt6.QtWidgets import QApplication
+
+        hosts = getattr(config, 'SHARED_ASSET_HOSTS', ())
+        if not hosts or not asset_scheme_registered():
+            return False
+        if cls._instance is None or _is_deleted(cls._instance):
+            # 挂在 QApplication 上，生命周期长于所有 Profile
+            app = QApplication.instance()
+            cls._instance = cls(hosts, app)
+            app.aboutToQuit.connect(cls._instance.shutdown)
+        profile.setUrlRequestInterceptor(cls._instance.interceptor)
+        profile.installUrlSchemeHandler(ASSET_SCHEME.encode(), cls._instance.handler)
+        return True
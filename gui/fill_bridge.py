@@ -0,0 +1,145 @@
+"""
+填写结果推送通道（QWebChannel）
+原来填写后固定等待 3 秒，再每 2 秒 runJavaScript 读取一次 window.__autoFillResult__，
+每个 WebView 都有几秒的空等。这里给每个页面注册一个 QWebChannel 对象 afBridge，
+平台引擎写入 window.__autoFillResult__ 时由页面直接推送到 Python：
+
+- 最终结果（completed / success / failed）→ FillBridge.completed 信号，立即保存填写记录
+- 其他状态（waiting 等）→ FillBridge.progress 信号
+- 引擎不需要修改：Profile 用户脚本在 DocumentCreation 时把 window.__autoFillResult__
+  换成 setter，赋值即推送；引擎也可以直接调用 window.__afReport__(result)
+
+通道没有连上（qwebchannel.js 不可用、页面在用户脚本注册前已打开等）时 attached 为 False，
+调用方继续使用轮询；页面重新开始加载时 attached 重置为 False，等新页面的通道连上后再置为 True
+"""
+import json
+
+from PyQt6.QtCore import QFile, QIODevice, QObject, pyqtSignal, pyqtSlot
+
+# 页面中注册的对象名
+BRIDGE_OBJECT_NAME = 'afBridge'
+
+# 视为填写结束的状态
+FINAL_STATUSES = ('completed', 'success', 'failed')
+
+BRIDGE_BOOTSTRAP = """
+(function() {
+    if (window.__afReport__) return;
+    const FINAL_STATUSES = %(final_statuses)s;
+    let bridge = null;
+    const queue = [];
+
+    function deliver(result) {
+        if (FINAL_STATUSES.includes(result.status)) {
+            bridge.fillCompleted(result);
+        } else {
+            bridge.fillProgress(String(result.status || ''), String(result.message || ''));
+        }
+    }
+
+    // 推送填写结果（通道连上之前先排队）
+    window.__afReport__ = function(result) {
+        if (!result || typeof result !== 'object') return;
+        let payload;
+        try {
+            payload = JSON.parse(JSON.stringify(result));
+        } catch (e) {
+            return;
+        }
+        if (bridge) deliver(payload); else queue.push(payload);
+    };
+
+    // 引擎对 window.__autoFillResult__ 的每次赋值都会推送
+    let current = window.__autoFillResult__;
+    Object.defineProperty(window, '__autoFillResult__', {
+        configurable: true,
+        get() { return current; },
+        set(value) {
+            current = value;
+            window.__afReport__(value);
+        }
+    });
+
+    if (typeof QWebChannel === 'undefined' || !window.qt || !window.qt.webChannelTransport) return;
+    new QWebChannel(window.qt.webChannelTransport, channel => {
+        bridge = channel.objects[%(object_name)s];
+        if (!bridge) return;
+        bridge.channelReady();
+        queue.splice(0).forEach(deliver);
+    });
+})();
+"""
+
+
+class FillBridge(QObject):
+    """
+    页面 → Python 的填写结果通道，每个 QWebEnginePage 一个
+
+    使用方法：
+        bridge = FillBridge.attach(page)
+        bridge.completed.connect(lambda result: ...)
+        bridge.pending = (card, form_type)   # 开始填写时记录，收到结果后清空
+    """
+
+    completed = pyqtSignal(dict)
+    progress = pyqtSignal(str, str)
+
+    _qwebchannel_js = None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.attached = False
+        self.pending = None
+
+    @pyqtSlot()
+    def channelReady(self):
+        """页面中的 QWebChannel 已连接"""
+        self.attached = True
+
+    def _on_load_started(self):
+        """页面开始加载（导航、刷新）：旧页面的通道已失效"""
+        self.attached = False
+
+    @pyqtSlot('QVariantMap')
+    def fillCompleted(self, result):
+        self.completed.emit(dict(result or {}))
+
+    @pyqtSlot(str, str)
+    def fillProgress(self, status, message):
+        self.progress.emit(status, message)
+
+    @classmethod
+    def attach(cls, page) -> 'FillBridge':
+        """为页面创建 QWebChannel 并注册 afBridge（主世界，与平台引擎相同）"""
+        from PyQt6.QtWebChannel import QWebChannel
+
+        bridge = cls(page)
+        channel = QWebChannel(page)
+        channel.registerObject(BRIDGE_OBJECT_NAME, bridge)
+        page.setWebChannel(channel)
+        page.loadStarted.connect(bridge._on_load_started)
+        page.fill_bridge = bridge
+        return bridge
+
+    @classmethod
+    def qwebchannel_js(cls) -> str:
+        """Qt 自带的 qwebchannel.js（读取失败时返回空字符串）"""
+        if cls._qwebchannel_js is None:
+            source = ''
+            file = QFile(':/qtwebchannel/qwebchannel.js')
+            if file.open(QIODevice.OpenModeFlag.ReadOnly):
+                source = bytes(file.readAll()).decode('utf-8')
+                file.close()
+            cls._qwebchannel_js = source
+        return cls._qwebchannel_js
+
+    @classmethod
+    def user_script_source(cls) -> str:
+        """注册到 Profile 的用户脚本：qwebchannel.js + 推送逻辑；qwebchannel.js 不可用时返回空字符串"""
+        qwebchannel_js = cls.qwebchannel_js()
+        if not qwebchannel_js:
+            return ''
+        return qwebchannel_js + BRIDGE_BOOTSTRAP % {
+            'final_statuses': json.dumps(list(FINAL_STATUSES)),
+            'object_name': json.dumps(BRIDGE_OBJECT_NAME),
+        }
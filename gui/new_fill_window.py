@@ -12,16 +12,29 @@ from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
 from .icons import safe_qta_icon as qta_icon
 import json
+import os
 import time
 from collections import defaultdict
 from database import DatabaseManager
+from urllib.parse import urlparse
 from core import AutoFillEngineV2, TencentDocsFiller
+from core.load_scheduler import LoadScheduler, RendererMonitor
+from core.profile_manager import ProfileManager
+from core.tab_residency import TabResidency
 from .baoming_tool_window import BaomingToolWindow
+from .fill_bridge import FillBridge
+from .webview_pool import GENERATION_PROPERTY, WebViewPool
 from .styles import COLORS
 from .icons import Icons
 import config
 
 
+def _console_message_visible(level) -> bool:
+    """production 配置下只打印页面的 warning/error，info 级日志（包括页面自身的 console.log）直接丢弃"""
+    return (getattr(config, 'SCRIPT_PROFILE', 'production') == 'debug' or
+            level != QWebEnginePage.JavaScriptConsoleMessageLevel.InfoMessageLevel)
+
+
 class ElidedLabel(QLabel):
     """支持自动省略的标签"""
     def __init__(self, text="", parent=None):
@@ -247,6 +260,27 @@ class NewFillWindow(QDialog):
     
     fill_completed = pyqtSignal()
     
+    # Profile 存储名前缀（同时是 HTTP 缓存目录名前缀，磁盘预算只清理这些目录）
+    PROFILE_STORAGE_PREFIX = 'profile_store_'
+    
+    # 支持两阶段协议（提取字段 → Python 匹配 → 按指令填充）的平台：均基于 createSharedExecutor
+    TWO_PHASE_FORM_TYPES = ('mikecrm', 'jinshuju', 'shimo', 'credamo', 'wenjuan', 'feishu', 'kdocs', 'tencent_wj')
+    
+    # 预装填充引擎的 @include 规则（与 detect_form_type 的判断一致）
+    ENGINE_URL_PATTERNS = {
+        'tencent_docs': ['*docs.qq.com/form*'],
+        'mikecrm': ['*mikecrm.com*', '*mike-x.com*'],
+        'wjx': ['*wjx.cn*', '*wjx.top*'],
+        'jinshuju': ['*jsj.top*', '*jinshuju.net*'],
+        'shimo': ['*shimo.im*'],
+        'credamo': ['*credamo.com*'],
+        'wenjuan': ['*wenjuan.com*'],
+        'fanqier': ['*fanqier.cn*'],
+        'feishu': ['*feishu.cn*'],
+        'kdocs': ['*kdocs.cn*', '*wps.cn*', '*wps.com*'],
+        'tencent_wj': ['*wj.qq.com*'],
+    }
+    
     def __init__(self, selected_cards, selected_links, parent=None, current_user=None, columns=4, fill_mode="multi"):
         super().__init__(parent)
         self.selected_cards = selected_cards  # 选中的名片列表
@@ -266,7 +300,12 @@ class NewFillWindow(QDialog):
         
         # ⚡️ Profile 缓存：同一名片 + 同一平台共享同一个 Profile 实例
         # key: "{card_id}_{form_type}", value: QWebEngineProfile 实例
-        self.profile_cache = {}
+        # 数量有上限，超出时释放最久未使用的空闲 Profile（见 core/profile_manager.py）
+        self.profile_cache = ProfileManager.from_config(release=self._release_profile, in_use=self._profile_in_use)
+        # Profile 存储名 → 已预装的填充引擎名称
+        self.profile_engines = {}
+        # 已释放但还没有销毁（deleteLater 尚未执行）的 Profile 的缓存目录名，清理磁盘缓存时不能删除
+        self.releasing_profile_caches = set()
         
         # ⚡️ 分类相关：按分类分组名片，默认显示第一个分类
         self.cards_by_category = {}  # {category: [cards]}
@@ -415,10 +454,27 @@ class NewFillWindow(QDialog):
         
         self.web_views_by_link.clear()
         
+        # ⚡️ 销毁复用池中的空闲 WebView
+        if getattr(self, 'webview_pool', None) is not None:
+            print(f"🧹 销毁复用池中的 {len(self.webview_pool)} 个 WebView (复用 {self.webview_pool.reused} 次)")
+            self.webview_pool.clear()
+        
         # ⚡️ 清理 Profile 缓存
         if hasattr(self, 'profile_cache'):
-            print(f"🧹 清理 {len(self.profile_cache)} 个 Profile 缓存...")
-            self.profile_cache.clear()
+            print(f"🧹 清理 {len(self.profile_cache)} 个 Profile 缓存... {self.profile_cache.stats()}")
+            # 页面还没有销毁，Profile 随窗口一起销毁
+            self.profile_cache.clear(release=False)
+        
+        # ⚡️ 共享静态资源缓存索引写盘
+        if getattr(config, 'SHARED_ASSET_CACHE', True):
+            from core.asset_cache import get_asset_store
+            store = get_asset_store()
+            print(f"📦 共享资源缓存: {store.stats()}")
+            store.flush()
+        
+        # ⚡️ 表单结构缓存写入剩余的修改
+        from core.schema_cache import flush_schema_cache
+        flush_schema_cache()
         
         print("✅ 资源清理完成")
         
@@ -1300,6 +1356,8 @@ class NewFillWindow(QDialog):
             
             def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
                 """重写此方法以捕获JavaScript控制台消息"""
+                if not _console_message_visible(level):
+                    return
                 # 直接输出到终端
                 print(f"  [JS] {message}", flush=True)
                 if lineNumber > 0:
@@ -1311,6 +1369,7 @@ class NewFillWindow(QDialog):
                 return True
         
         custom_page = CustomWebEnginePage(profile, web_view)
+        self._attach_fill_bridge(custom_page, web_view)
         web_view.setPage(custom_page)
         print(f"  🔧 已设置自定义Page，类型: {type(custom_page).__name__}")
         
@@ -1325,7 +1384,7 @@ class NewFillWindow(QDialog):
             # 报名工具直接显示自定义登录页面，不加载原始URL
             print(f"  📱 检测到报名工具链接，直接显示登录页面")
             # 延迟初始化报名工具（等待 WebView 完全创建）
-            QTimer.singleShot(100, lambda: self.init_baoming_tool_for_webview(web_view, link.url, card))
+            QTimer.singleShot(100, self._webview_callback(web_view, lambda: self.init_baoming_tool_for_webview(web_view, link.url, card)))
         else:
             # 其他链接正常加载
             web_view.setUrl(QUrl(link.url))
@@ -3140,12 +3199,14 @@ class NewFillWindow(QDialog):
             # 创建新的 Page（使用新名片的 Profile）
             class WebEnginePage(QWebEnginePage):
                 def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
-                    print(f"  [JS] {message}", flush=True)
+                    if _console_message_visible(level):
+                        print(f"  [JS] {message}", flush=True)
                 
                 def javaScriptConfirm(self, securityOrigin, msg):
                     return True
             
             new_page = WebEnginePage(new_profile, web_view)
+            self._attach_fill_bridge(new_page, web_view)
             web_view.setPage(new_page)
             
             # 加载空白页，视觉上重置
@@ -3247,9 +3308,13 @@ class NewFillWindow(QDialog):
         print(f"\n📑 切换到标签页: {current_link.name}")
         
         link_id = str(current_link.id)
+        self.active_link_id = link_id
+        # 预加载的链接被切换到后，按普通标签页处理（加载完成后自动填充）
+        was_prefetching = link_id in self._get_prefetching_links()
+        self._get_prefetching_links().discard(link_id)
         
-        # ⚡️ 清理其他标签页的资源，减少内存占用和卡顿
-        self.unload_inactive_tabs(link_id)
+        # ⚡️ 只保留最近访问的几个标签页，卸载其他标签页的资源，减少内存占用和卡顿
+        self._apply_tab_residency(link_id)
         
         # ⚡️ 检查标签页是否因分类切换需要重建（多开模式 + 多分类时）
         current_tab_widget = self.tab_widget.widget(index)
@@ -3263,10 +3328,10 @@ class NewFillWindow(QDialog):
                     web_view = info.get('web_view')
                     if web_view:
                         try:
-                            web_view.stop()
-                            web_view.loadFinished.disconnect()
-                        except:
-                            pass
+                            # 摘下后放回复用池，旧标签页销毁时不会一起销毁
+                            self._release_webview(web_view)
+                        except Exception as e:
+                            print(f"⚠️ 归还 WebView 失败: {e}")
                 del self.web_views_by_link[link_id]
             
             if hasattr(self, 'loading_queues') and link_id in self.loading_queues:
@@ -3287,6 +3352,7 @@ class NewFillWindow(QDialog):
             webview_infos = self.web_views_by_link.get(link_id, [])
             if webview_infos:
                 self.load_webviews_only(webview_infos)
+            self._prefetch_next_link(real_index)
             return
         
         # ⚡️ 强制刷新当前标签页的UI
@@ -3313,63 +3379,63 @@ class NewFillWindow(QDialog):
              # 重新初始化加载队列并开始加载
              self.load_webviews_only(webview_infos)
         else:
-             # 如果已经初始化过，检查是否有挂起的加载任务（继续加载剩余的）
-             # 或者只是单纯的切换显示（WebView已经创建）
-             pass
+             # 标签页仍驻留（之前访问过或已预加载）：只加载还没有 WebView 的名片
+             queued = self.loading_queues.get(link_id, [])
+             missing = [info for info in webview_infos if not info.get('web_view') and info not in queued]
+             if missing:
+                 print(f"⚡️ 标签页已驻留，继续加载剩余 {len(missing)} 个 WebView...")
+                 self.loading_queues[link_id] = queued + missing
+                 self.pump_loading_queues()
+             elif was_prefetching and not queued and not any(info.get('web_view') and info['web_view'].property("status") == "loading"
+                                         for info in webview_infos):
+                 # 预加载已覆盖所有名片：按链接加载完成处理
+                 self._on_link_load_complete(link_id)
+        
+        self._prefetch_next_link(real_index)
              
-    def unload_inactive_tabs(self, active_link_id: str):
-        """销毁非当前标签页的 WebView 以释放资源"""
+    def unload_tabs(self, link_ids):
+        """把指定链接的 WebView 归还到复用池（池满时销毁）并清理其加载队列"""
         # ⚡️ 安全检查
         if not self._is_valid():
             return
         
-        print(f"🧹 正在清理非当前标签页资源，保留: {active_link_id}")
-        
         try:
             from PyQt6 import sip
         except ImportError:
             import sip
         
-        # 遍历所有链接的 WebView 信息
-        for link_id, webview_infos in list(self.web_views_by_link.items()):  # 使用 list() 避免迭代时修改
-            if link_id == active_link_id:
-                continue
-                
-            # 清理该链接下的所有 WebView
+        residency = self._get_tab_residency()
+        for link_id in list(link_ids):  # 使用 list() 避免迭代时修改
+            webview_infos = self.web_views_by_link.get(link_id, [])
+            residency.remove(link_id)
+            self._get_prefetching_links().discard(link_id)
+            
+            # 归还该链接下的所有 WebView（断开信号、停止加载、摘下后放回复用池）
+            pooled_count = 0
             destroyed_count = 0
             for info in webview_infos:
                 web_view = info.get('web_view')
                 if web_view:
-                    # 停止加载并销毁
                     try:
                         # 检查 WebView 是否已被销毁
                         if not sip.isdeleted(web_view):
-                            # 先断开信号连接，防止回调触发
-                            try:
-                                web_view.loadFinished.disconnect()
-                            except:
-                                pass
-                            web_view.stop()
-                            web_view.setParent(None)
-                            web_view.deleteLater()
+                            if self._release_webview(web_view):
+                                pooled_count += 1
+                            else:
+                                destroyed_count += 1
                     except Exception as e:
-                        print(f"⚠️ 销毁 WebView 失败: {e}")
+                        print(f"⚠️ 归还 WebView 失败: {e}")
                     
                     # 重置信息
                     info['web_view'] = None
                     info['loaded'] = False
-                    destroyed_count += 1
             
-            if destroyed_count > 0:
-                print(f"  - 已销毁链接 {link_id} 的 {destroyed_count} 个 WebView")
+            if pooled_count or destroyed_count:
+                print(f"  - 链接 {link_id}: {pooled_count} 个 WebView 放回复用池，{destroyed_count} 个已销毁")
             
             # 清理加载队列，防止后台继续加载
             if hasattr(self, 'loading_queues') and link_id in self.loading_queues:
                 del self.loading_queues[link_id]
-                
-        # 强制垃圾回收
-        import gc
-        gc.collect()
         
     def refresh_webview(self, link_id: str, index: int):
         """刷新指定的WebView"""
@@ -3493,14 +3559,8 @@ class NewFillWindow(QDialog):
         # 使用 list(webview_infos) 创建副本，避免引用问题
         self.loading_queues[link_id] = list(webview_infos)
         
-        # 开始分批加载
-        if not hasattr(self, 'current_batches'):
-            self.current_batches = {}
-        self.current_batches[link_id] = 0
-        
-        # 立即开始第一批加载
-        BATCH_SIZE = 2
-        self.load_next_batch_for_link(link_id, BATCH_SIZE)
+        # 滑动窗口加载：任意一个页面加载结束就立即开始下一个（见 core/load_scheduler.py）
+        self.pump_loading_queues()
         
         # ⚡️ 自动填充逻辑：如果是在单开模式下加载，且这是一个重新加载的操作
         if self.fill_mode == "single":
@@ -3523,35 +3583,54 @@ class NewFillWindow(QDialog):
             if child.widget():
                 child.widget().deleteLater()
         
-        # 创建WebView - 使用支持中文右键菜单的自定义类
-        web_view = ChineseContextWebView()
-        web_view.setMinimumHeight(450)
-        
-        # ⚡️ 确保WebView可以交互和实时渲染
-        web_view.setAttribute(Qt.WidgetAttribute.WA_AcceptTouchEvents, True)
-        web_view.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
-        
-        # ⚡️ 禁用双缓冲优化，确保实时渲染
-        # web_view.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent, False)
-        # web_view.setAttribute(Qt.WidgetAttribute.WA_NoSystemBackground, False)
-        web_view.setAttribute(Qt.WidgetAttribute.WA_DontCreateNativeAncestors, False)
-        
         # ⚡️ 获取或创建 Profile（同一名片+同一平台共享登录状态）
         form_type = self.detect_form_type(link.url)
         profile = self.get_or_create_profile(str(card.id), form_type)
         
-        class WebEnginePage(QWebEnginePage):
-            def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
-                """重写此方法以捕获JavaScript控制台消息"""
-                print(f"  [JS] {message}", flush=True)
+        # ⚡️ 优先复用池中的 WebView（Profile 相同时页面一起复用）
+        web_view = self._get_webview_pool().acquire(profile)
+        old_page = web_view.page() if web_view is not None else None
+        if web_view is None:
+            # 创建WebView - 使用支持中文右键菜单的自定义类
+            web_view = ChineseContextWebView()
+            web_view.setMinimumHeight(450)
+            
+            # ⚡️ 确保WebView可以交互和实时渲染
+            web_view.setAttribute(Qt.WidgetAttribute.WA_AcceptTouchEvents, True)
+            web_view.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+            
+            # ⚡️ 禁用双缓冲优化，确保实时渲染
+            # web_view.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent, False)
+            # web_view.setAttribute(Qt.WidgetAttribute.WA_NoSystemBackground, False)
+            web_view.setAttribute(Qt.WidgetAttribute.WA_DontCreateNativeAncestors, False)
+        
+        if old_page is not None and old_page.profile() is profile:
+            print(f"  ♻️ 复用 WebView 和页面: {card.name}")
+        else:
+            class WebEnginePage(QWebEnginePage):
+                def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
+                    """重写此方法以捕获JavaScript控制台消息"""
+                    if _console_message_visible(level):
+                        print(f"  [JS] {message}", flush=True)
+                
+                def javaScriptConfirm(self, securityOrigin, msg):
+                    """自动接受离开页面的确认对话框（如登录跳转时的 beforeunload）"""
+                    return True
             
-            def javaScriptConfirm(self, securityOrigin, msg):
-                """自动接受离开页面的确认对话框（如登录跳转时的 beforeunload）"""
-                return True
-        
-        web_view.setPage(WebEnginePage(profile, web_view))
+            page = WebEnginePage(profile, web_view)
+            self._attach_fill_bridge(page, web_view)
+            web_view.setPage(page)
+            if old_page is not None:
+                # 复用的 WebView 换了 Profile，旧页面不再使用（只复用控件）
+                try:
+                    from PyQt6 import sip
+                except ImportError:
+                    import sip
+                if not sip.isdeleted(old_page):
+                    old_page.deleteLater()
         
-        # 存储相关信息
+        # 存储相关信息（新的代数让复用前安排的延迟回调失效）
+        self._get_webview_pool().stamp(web_view)
         web_view.setProperty("card_data", card)
         web_view.setProperty("link_data", link)
         web_view.setProperty("status", "created")
@@ -3573,69 +3652,224 @@ class NewFillWindow(QDialog):
         
         return web_view
     
-    def load_next_batch_for_link(self, link_id: str, batch_size: int):
-        """为指定链接加载下一批WebView"""
+    def _get_tab_residency(self) -> TabResidency:
+        """标签页驻留策略（保留最近访问的几个标签页，超出数量或内存预算时卸载最久未访问的）"""
+        if getattr(self, 'tab_residency', None) is None:
+            self.tab_residency = TabResidency.from_config()
+        return self.tab_residency
+    
+    def _get_prefetching_links(self) -> set:
+        """正在后台预加载（还没有切换到）的链接"""
+        if getattr(self, 'prefetching_links', None) is None:
+            self.prefetching_links = set()
+        return self.prefetching_links
+    
+    def _apply_tab_residency(self, active_link_id: str):
+        """标记当前标签页为最近访问，卸载超出驻留数量或内存预算的标签页"""
+        residency = self._get_tab_residency()
+        residency.touch(active_link_id)
+        self._enforce_tab_residency()
+    
+    def _enforce_tab_residency(self):
+        """按驻留数量和后台标签页的内存预算卸载最久未访问的标签页（当前标签页和正在预加载的不会被卸载）"""
+        active_link_id = getattr(self, 'active_link_id', None)
+        if active_link_id is None:
+            return
+        try:
+            from PyQt6 import sip
+        except ImportError:
+            import sip
+        
+        view_counts = {
+            link_id: sum(1 for info in webview_infos if info.get('web_view') and not sip.isdeleted(info['web_view']))
+            for link_id, webview_infos in self.web_views_by_link.items()
+        }
+        # 预加载还没有结束（有排队或加载中的 WebView）的标签页不卸载
+        loading_queues = getattr(self, 'loading_queues', {})
+        prefetching = {
+            link_id for link_id in self._get_prefetching_links()
+            if loading_queues.get(link_id) or any(
+                info.get('web_view') and not sip.isdeleted(info['web_view'])
+                and info['web_view'].property("status") == "loading"
+                for info in self.web_views_by_link.get(link_id, []))
+        }
+        self._get_load_scheduler()
+        memory_mb, _ = self._sample_renderer_usage()
+        evicted = self._get_tab_residency().evictions(active_link_id, view_counts, memory_mb, protected=prefetching)
+        if evicted:
+            memory_text = f"，渲染进程内存 {memory_mb:.0f}MB" if memory_mb is not None else ""
+            print(f"🧹 卸载最久未访问的标签页 {evicted}{memory_text}")
+            self.unload_tabs(evicted)
+    
+    def _prefetch_next_link(self, real_index: int):
+        """后台预加载下一个链接的前几张名片（当前标签页的加载队列空了以后才开始）"""
+        prefetch_cards = getattr(config, 'TAB_PREFETCH_CARDS', 3)
+        residency = self._get_tab_residency()
+        if prefetch_cards <= 0 or residency.max_tabs < 2 or real_index + 1 >= len(self.selected_links):
+            return
+        
+        next_link = self.selected_links[real_index + 1]
+        next_link_id = str(next_link.id)
+        webview_infos = self.web_views_by_link.get(next_link_id, [])
+        if not hasattr(self, 'loading_queues'):
+            self.loading_queues = {}
+            self.loaded_views = []
+        if not webview_infos or next_link_id in self.loading_queues or any(info.get('web_view') for info in webview_infos):
+            return
+        
+        # 分类已变更的标签页切换过去时会重建，预加载没有意义
+        next_tab = self.tab_widget.widget(real_index + 2)
+        built_category = getattr(next_tab, 'built_category', None)
+        if (self.fill_mode == "multi" and len(self.category_list) > 1
+                and built_category is not None and built_category != self.current_category):
+            return
+        
+        print(f"🔮 预加载下一个链接 '{next_link.name}' 的前 {min(prefetch_cards, len(webview_infos))} 个 WebView")
+        self._get_prefetching_links().add(next_link_id)
+        self.loading_queues[next_link_id] = list(webview_infos[:prefetch_cards])
+        # 预加载的标签页排在当前标签页之后（当前标签页保持最近访问）
+        residency.touch(next_link_id)
+        residency.touch(self.active_link_id)
+        self._enforce_tab_residency()
+        self.pump_loading_queues()
+    
+    def _get_webview_pool(self) -> WebViewPool:
+        """空闲 WebView 池（切换标签页时归还、重新加载时取出）"""
+        if getattr(self, 'webview_pool', None) is None:
+            self.webview_pool = WebViewPool(getattr(config, 'WEBVIEW_POOL_SIZE', 16))
+        return self.webview_pool
+    
+    def _release_webview(self, web_view) -> bool:
+        """取消加载超时定时器并把 WebView 归还到池中（池满时销毁）"""
+        webview_id = id(web_view)
+        if hasattr(self, 'load_timeout_timers') and webview_id in self.load_timeout_timers:
+            timer = self.load_timeout_timers.pop(webview_id)
+            if timer.isActive():
+                timer.stop()
+        return self._get_webview_pool().release(web_view)
+    
+    def _get_load_scheduler(self) -> LoadScheduler:
+        """WebView 加载调度器（所有链接共用一个窗口，窗口大小按加载耗时和渲染进程资源调整）"""
+        if getattr(self, 'load_scheduler', None) is None:
+            self.load_scheduler = LoadScheduler.from_config()
+            self.renderer_monitor = RendererMonitor()
+        return self.load_scheduler
+    
+    @staticmethod
+    def _load_key(link_id: str, index) -> tuple:
+        """加载调度器中的任务标识（info 通过 setProperty 取回时是副本，不能用 id(info)）"""
+        return (link_id, index)
+    
+    def _sample_renderer_usage(self):
+        """采样所有 WebView 渲染进程的内存和 CPU，超过上限时缩小加载窗口；返回 (内存 MB, CPU %)"""
+        try:
+            from PyQt6 import sip
+        except ImportError:
+            import sip
+        
+        pids = set()
+        for webview_infos in self.web_views_by_link.values():
+            for info in webview_infos:
+                web_view = info.get('web_view')
+                if web_view and not sip.isdeleted(web_view):
+                    try:
+                        pids.add(web_view.page().renderProcessPid())
+                    except Exception:
+                        pass
+        memory_mb, cpu_percent = self.renderer_monitor.sample(pids)
+        self.load_scheduler.update_resources(memory_mb, cpu_percent)
+        return memory_mb, cpu_percent
+    
+    def pump_loading_queues(self):
+        """按加载窗口的空位，开始加载排队中的 WebView（当前标签页优先，其他标签页等当前标签页排完再加载）"""
         # ⚡️ 安全检查：窗口是否已关闭
         if not self._is_valid():
-            print("🛑 [load_next_batch_for_link] 窗口已关闭，停止加载")
+            print("🛑 [pump_loading_queues] 窗口已关闭，停止加载")
             return
         
-        if not hasattr(self, 'loading_queues') or link_id not in self.loading_queues:
+        if not getattr(self, 'loading_queues', None):
             return
         
-        queue = self.loading_queues[link_id]
-        if not queue:
-            print(f"\n✅ 链接 {link_id} 的所有WebView已加载完成")
-            return
+        try:
+            from PyQt6 import sip
+        except ImportError:
+            import sip
         
-        # 取出一批
-        batch = queue[:batch_size]
-        self.loading_queues[link_id] = queue[batch_size:]
+        scheduler = self._get_load_scheduler()
         
-        self.current_batches[link_id] += 1
-        print(f"\n📦 链接 {link_id} - 加载批次 #{self.current_batches[link_id]}（{len(batch)} 个）")
+        # 已销毁或不再处于加载中的 WebView 不再占用窗口（标签页被卸载、链接被重建等）
+        scheduler.discard(
+            self._load_key(link_id, info.get('index'))
+            for link_id, webview_infos in self.web_views_by_link.items()
+            for info in webview_infos
+            if info.get('web_view') and not sip.isdeleted(info['web_view'])
+            and info['web_view'].property("status") == "loading"
+        )
+        self._sample_renderer_usage()
         
         # ⚡️ 初始化加载超时定时器存储（如果不存在）
         if not hasattr(self, 'load_timeout_timers'):
             self.load_timeout_timers = {}
         
-        # 开始加载
-        for info in batch:
-            # ⚡️ 优化：在需要加载时才创建WebView对象
-            if not info['web_view']:
-                print(f"  🔨 延迟实例化 WebView: {info['card'].name}")
-                web_view = self.create_webview_for_placeholder(info)
-                info['web_view'] = web_view
-                info['loaded'] = False
-            
-            web_view = info['web_view']
-            link = info['link']
-            card = info['card']
-            
-            print(f"  🌐 加载: {card.name} -> {link.url}")
-            
-            # 检测是否是报名工具链接
-            if 'baominggongju.com' in link.url:
-                print(f"    📱 报名工具链接，显示登录页面")
-                QTimer.singleShot(100, lambda wv=web_view, u=link.url, c=card: self.init_baoming_tool_for_webview(wv, u, c))
-            else:
-                web_view.setUrl(QUrl(link.url))
-            
-            web_view.setProperty("status", "loading")
-            # ⚡️ 记录加载开始时间，用于超时检测
-            web_view.setProperty("load_start_time", time.time())
-            
-            # ⚡️ 设置加载超时定时器（30秒）
-            webview_id = id(web_view)
-            timeout_timer = QTimer()
-            timeout_timer.setSingleShot(True)
-            timeout_timer.timeout.connect(lambda wv=web_view, lid=link_id: self.on_webview_load_timeout(wv, lid))
-            timeout_timer.start(30000)  # 30秒超时
-            self.load_timeout_timers[webview_id] = timeout_timer
-            
-            # ⚡️ 强制刷新，确保加载立即可见
-            web_view.show()
-            # web_view.update()
+        started = 0
+        active_link_id = getattr(self, 'active_link_id', None)
+        queues = sorted(self.loading_queues.items(), key=lambda item: item[0] != active_link_id)
+        for link_id, queue in queues:
+            if link_id != active_link_id and self.loading_queues.get(active_link_id):
+                break  # 当前标签页还有排队的，后台标签页（驻留、预加载）先不加载
+            batch = scheduler.take(
+                queue,
+                key_of=lambda info, lid=link_id: self._load_key(lid, info.get('index')),
+                domain_of=lambda info: urlparse(info['link'].url).hostname
+            )
+            for info in batch:
+                self._start_webview_load(link_id, info)
+            started += len(batch)
+            if scheduler.inflight >= scheduler.window:
+                break
+        
+        if started > 0:
+            stats = scheduler.stats()
+            remaining = sum(len(queue) for queue in self.loading_queues.values())
+            print(f"📦 加载窗口 {stats['window']}：加载中 {stats['inflight']} 个，排队 {remaining} 个")
+    
+    def _start_webview_load(self, link_id: str, info: dict):
+        """开始加载一个 WebView（需要时才创建 WebView 对象），并设置加载超时"""
+        # ⚡️ 优化：在需要加载时才创建WebView对象
+        if not info['web_view']:
+            print(f"  🔨 延迟实例化 WebView: {info['card'].name}")
+            web_view = self.create_webview_for_placeholder(info)
+            info['web_view'] = web_view
+            info['loaded'] = False
+        
+        web_view = info['web_view']
+        link = info['link']
+        card = info['card']
+        
+        print(f"  🌐 加载: {card.name} -> {link.url}")
+        
+        # 检测是否是报名工具链接
+        if 'baominggongju.com' in link.url:
+            print(f"    📱 报名工具链接，显示登录页面")
+            QTimer.singleShot(100, self._webview_callback(web_view, lambda wv=web_view, u=link.url, c=card: self.init_baoming_tool_for_webview(wv, u, c)))
+        else:
+            web_view.setUrl(QUrl(link.url))
+        
+        web_view.setProperty("status", "loading")
+        # ⚡️ 记录加载开始时间，用于超时检测
+        web_view.setProperty("load_start_time", time.time())
+        
+        # ⚡️ 设置加载超时定时器（30秒）
+        webview_id = id(web_view)
+        timeout_timer = QTimer()
+        timeout_timer.setSingleShot(True)
+        timeout_timer.timeout.connect(lambda wv=web_view, lid=link_id: self.on_webview_load_timeout(wv, lid))
+        timeout_timer.start(30000)  # 30秒超时
+        self.load_timeout_timers[webview_id] = timeout_timer
+        
+        # ⚡️ 强制刷新，确保加载立即可见
+        web_view.show()
+        # web_view.update()
     
     def on_webview_load_timeout(self, web_view: QWebEngineView, link_id: str):
         """WebView 加载超时处理"""
@@ -3700,7 +3934,7 @@ class NewFillWindow(QDialog):
             # 检测是否是报名工具链接
             if 'baominggongju.com' in link.url:
                 print(f"    📱 报名工具链接，显示登录页面")
-                QTimer.singleShot(100, lambda wv=web_view, u=link.url, c=card: self.init_baoming_tool_for_webview(wv, u, c))
+                QTimer.singleShot(100, self._webview_callback(web_view, lambda wv=web_view, u=link.url, c=card: self.init_baoming_tool_for_webview(wv, u, c)))
             else:
                 web_view.setUrl(QUrl(link.url))
             
@@ -3747,6 +3981,24 @@ class NewFillWindow(QDialog):
         except:
             pass
 
+    def _webview_callback(self, web_view, callback):
+        """包装 WebView 的延迟回调：窗口关闭、WebView 已销毁或已归还池中（被其他名片复用）时不再执行"""
+        generation = web_view.property(GENERATION_PROPERTY)
+
+        def run():
+            try:
+                from PyQt6 import sip
+            except ImportError:
+                import sip
+            if not self._is_valid() or sip.isdeleted(web_view):
+                return
+            if web_view.property(GENERATION_PROPERTY) != generation:
+                print("🛑 WebView 已被复用，跳过之前安排的回调")
+                return
+            callback()
+
+        return run
+
     def on_batch_webview_loaded(self, web_view: QWebEngineView, success: bool):
         """批量加载时的回调"""
         # ⚡️ 安全检查：窗口或 WebView 是否已销毁
@@ -3799,7 +4051,7 @@ class NewFillWindow(QDialog):
         # 这样下次如果页面发生跳转（如登录后），就能自动填充了
         if web_view.property("is_auto_fill_active") is False:
             print(f"⚡️ 检测到自动填充被临时禁用，将在2秒后恢复能力（但不执行填充）")
-            QTimer.singleShot(2000, lambda: self._safe_set_property(web_view, "is_auto_fill_active", True))
+            QTimer.singleShot(2000, self._webview_callback(web_view, lambda: self._safe_set_property(web_view, "is_auto_fill_active", True)))
 
         # ⚡️ 智能重填逻辑：如果之前已经填充过（is_auto_fill_active=True），
         # 且页面重新加载了（可能是登录后跳转回来），则自动再次填充
@@ -3812,7 +4064,7 @@ class NewFillWindow(QDialog):
             
             print(f"⚡️ 检测到页面刷新且填充模式已激活，准备自动重填: {card_data.name}")
             # 延迟2秒执行，给予页面充分的初始化时间（特别是登录后的重定向）
-            QTimer.singleShot(2000, lambda: self._safe_execute_auto_fill(web_view, card_data))
+            QTimer.singleShot(2000, self._webview_callback(web_view, lambda: self._safe_execute_auto_fill(web_view, card_data)))
             return  # 不再继续执行后续的首次加载逻辑
         
         # ⚡️ 模式切换后自动填充：检查 info 中的 auto_fill_after_switch 标记
@@ -3822,7 +4074,7 @@ class NewFillWindow(QDialog):
             # 设置 is_auto_fill_active，这样后续刷新也能自动填充
             web_view.setProperty("is_auto_fill_active", True)
             # 延迟执行填充，确保页面完全就绪
-            QTimer.singleShot(1500, lambda: self._safe_execute_auto_fill(web_view, card_data))
+            QTimer.singleShot(1500, self._webview_callback(web_view, lambda: self._safe_execute_auto_fill(web_view, card_data)))
             # 注意：不 return，继续执行后续逻辑以便处理批次加载
         
         # 获取当前WebView所属的链接
@@ -3832,39 +4084,58 @@ class NewFillWindow(QDialog):
         self.check_batch_load_complete(link_id, web_view)
     
     def check_batch_load_complete(self, link_id: str, web_view: QWebEngineView):
-        """检查当前批次是否加载完成，继续加载下一批"""
+        """一个 WebView 加载结束（完成/失败/超时）：开始加载下一个，链接全部加载完成后自动填充"""
         # ⚡️ 安全检查
         if not self._is_valid():
             return
         
         webview_infos = self.web_views_by_link.get(link_id, [])
-        link_data = web_view.property("link_data")
+        
+        # 释放加载窗口的位置，按加载耗时调整窗口大小
+        scheduler = self._get_load_scheduler()
+        elapsed = scheduler.finished(self._load_key(link_id, web_view.property("index")),
+                                     success=web_view.property("status") == "loaded")
+        if elapsed is not None:
+            print(f"  ⏱️ 加载耗时 {elapsed:.1f}s，加载窗口 {scheduler.window}")
+        
+        # 立即开始排队中的下一个（下一轮事件循环中执行，不在 loadFinished 回调里创建 WebView）
+        if any(getattr(self, 'loading_queues', {}).values()):
+            QTimer.singleShot(0, self.pump_loading_queues)
         
         # 统计该链接的加载状态（只统计 "loading" 状态的）
         loading_count = sum(1 for info in webview_infos 
                           if info['web_view'] and info['web_view'].property("status") == "loading")
         
-        if loading_count == 0:
-            # 当前链接的当前批次加载完成
-            BATCH_SIZE = 2
-            if hasattr(self, 'loading_queues') and link_id in self.loading_queues and self.loading_queues[link_id]:
-                # 继续加载该链接的下一批
-                print(f"\n⏭️  链接 {link_id} 继续加载下一批（剩余 {len(self.loading_queues[link_id])} 个）")
-                # ⚡️ 优化：增加加载间隔，减轻卡顿
-                QTimer.singleShot(800, lambda lid=link_id: self.load_next_batch_for_link(lid, BATCH_SIZE))
-            else:
-                # 该链接的所有WebView加载完成
-                loaded_count = sum(1 for info in webview_infos if info.get('loaded', False))
-                link_name = link_data.name if link_data else link_id
-                print(f"\n🎉 链接 '{link_name}' 的所有WebView加载完成 ({loaded_count}/{len(webview_infos)})")
-                
-                # ⚡️ 自动填充模式：该链接加载完成后立即开始填充
-                if hasattr(self, 'auto_fill_enabled') and self.auto_fill_enabled:
-                    if link_id not in self.links_ready_for_fill:
-                        self.links_ready_for_fill.add(link_id)
-                        print(f"\n🚀 自动开始填充链接 '{link_name}' 的表单...")
-                        # 使用默认参数捕获link_id的当前值，避免闭包问题
-                        QTimer.singleShot(1000, lambda lid=link_id: self.auto_fill_for_link(lid))
+        # 加载的页面多了，按内存预算卸载最久未访问的标签页
+        self._enforce_tab_residency()
+        if not any(info.get('web_view') for info in webview_infos):
+            return  # 该标签页刚被卸载
+        
+        queued = getattr(self, 'loading_queues', {}).get(link_id)
+        if loading_count == 0 and not queued:
+            if link_id in self._get_prefetching_links():
+                # 预加载只加载前几张名片，切换到该标签页后再加载剩余的并自动填充
+                print(f"🔮 链接 {link_id} 预加载完成")
+                return
+            self._on_link_load_complete(link_id)
+    
+    def _on_link_load_complete(self, link_id: str):
+        """链接的所有 WebView 加载完成：自动填充模式下开始填充"""
+        webview_infos = self.web_views_by_link.get(link_id, [])
+        link = next((link for link in self.selected_links if str(link.id) == link_id), None)
+        
+        # 该链接的所有WebView加载完成
+        loaded_count = sum(1 for info in webview_infos if info.get('loaded', False))
+        link_name = link.name if link else link_id
+        print(f"\n🎉 链接 '{link_name}' 的所有WebView加载完成 ({loaded_count}/{len(webview_infos)})")
+        
+        # ⚡️ 自动填充模式：该链接加载完成后立即开始填充
+        if hasattr(self, 'auto_fill_enabled') and self.auto_fill_enabled:
+            if link_id not in self.links_ready_for_fill:
+                self.links_ready_for_fill.add(link_id)
+                print(f"\n🚀 自动开始填充链接 '{link_name}' 的表单...")
+                # 使用默认参数捕获link_id的当前值，避免闭包问题
+                QTimer.singleShot(1000, lambda lid=link_id: self.auto_fill_for_link(lid))
     
     def on_webview_loaded(self, web_view: QWebEngineView, success: bool):
         """WebView加载完成"""
@@ -3910,7 +4181,7 @@ class NewFillWindow(QDialog):
         # 这样下次如果页面发生跳转（如登录后），就能自动填充了
         if web_view.property("is_auto_fill_active") is False:
             print(f"⚡️ 检测到自动填充被临时禁用，将在2秒后恢复能力（但不执行填充）")
-            QTimer.singleShot(2000, lambda: self._safe_set_property(web_view, "is_auto_fill_active", True))
+            QTimer.singleShot(2000, self._webview_callback(web_view, lambda: self._safe_set_property(web_view, "is_auto_fill_active", True)))
 
         # ⚡️ 智能重填逻辑：如果之前点击了"填充"，且页面重新加载了（可能是登录跳转回来），则自动再次填充
         if web_view.property("is_auto_fill_active"):
@@ -3922,21 +4193,21 @@ class NewFillWindow(QDialog):
             
             print(f"⚡️ 检测到页面刷新且填充模式已激活，准备自动重填: {card_data.name}")
             # 延迟2秒执行，给予页面充分的初始化时间（特别是登录后的重定向）
-            QTimer.singleShot(2000, lambda: self._safe_execute_auto_fill(web_view, card_data))
+            QTimer.singleShot(2000, self._webview_callback(web_view, lambda: self._safe_execute_auto_fill(web_view, card_data)))
         
         # 检查是否是切换名片后的重新加载
         if web_view.property("auto_fill_on_switch"):
              print(f"⚡️ 切换名片后加载完成，准备自动填充: {card_data.name}")
              web_view.setProperty("auto_fill_on_switch", False) # 清除标记
              # 延迟执行填充，确保页面完全就绪
-             QTimer.singleShot(1000, lambda: self._safe_execute_auto_fill(web_view, card_data))
+             QTimer.singleShot(1000, self._webview_callback(web_view, lambda: self._safe_execute_auto_fill(web_view, card_data)))
         
         # 检查是否有自动填充标记（重新导入时使用）
         if web_view.property("auto_fill_after_load"):
             print(f"⚡️ 页面刷新完成，正在重新导入数据: {card_data.name}")
             web_view.setProperty("auto_fill_after_load", False)
             # 延迟执行填充，确保页面完全就绪
-            QTimer.singleShot(1500, lambda: self._safe_execute_auto_fill(web_view, card_data))
+            QTimer.singleShot(1500, self._webview_callback(web_view, lambda: self._safe_execute_auto_fill(web_view, card_data)))
         
         # 检查当前标签页的所有WebView是否都加载完成
         current_index = self.tab_widget.currentIndex()
@@ -4075,15 +4346,24 @@ class NewFillWindow(QDialog):
                 print(f"  🔧 [自动修正] 检测到报名工具自定义页面，强制类型为 baominggongju")
         
         print(f"  🔍 检测到表单类型: {form_type}")
-        
+
+        # 记录本次填写，页面推送最终结果时据此保存记录
+        bridge = self._fill_bridge(web_view)
+        if bridge is not None and form_type != 'baominggongju':
+            bridge.pending = (card, form_type)
+
+        # 两阶段协议：页面只提取字段，匹配在 Python 端完成
+        if getattr(config, 'FILL_PROTOCOL', 'inline') == 'two_phase' and form_type in self.TWO_PHASE_FORM_TYPES:
+            self._two_phase_fill(web_view, card, form_type, self._get_fill_data_for_card(card), current_url)
+            return
+
         # 准备填写数据（使用辅助方法，支持多值选择）
         if form_type == 'tencent_docs':
             # 腾讯文档需要字典格式
             fill_data = self._get_fill_data_for_card(card, as_dict=True)
             
             # 使用腾讯文档填写引擎
-            js_code = self.tencent_docs_engine.generate_fill_script(fill_data)
-            web_view.page().runJavaScript(js_code)
+            self._run_fill_script(web_view, 'tencent_docs', fill_data)
             
             # 延迟3秒后获取结果
             def safe_get_result():
@@ -4094,15 +4374,14 @@ class NewFillWindow(QDialog):
                 if not sip.isdeleted(web_view):
                     self.get_fill_result(web_view, card, 'tencent_docs')
             
-            QTimer.singleShot(3000, safe_get_result)
+            QTimer.singleShot(3000, self._webview_callback(web_view, safe_get_result))
             
         elif form_type == 'mikecrm':
             # 麦客CRM需要列表格式
             fill_data = self._get_fill_data_for_card(card)
             
             # 使用麦客CRM填写引擎
-            js_code = self.auto_fill_engine.generate_fill_script(fill_data)
-            web_view.page().runJavaScript(js_code)
+            self._run_fill_script(web_view, 'mikecrm', fill_data)
             
             # 延迟3秒后获取结果
             def safe_get_result():
@@ -4113,7 +4392,7 @@ class NewFillWindow(QDialog):
                 if not sip.isdeleted(web_view):
                     self.get_fill_result(web_view, card, 'mikecrm')
 
-            QTimer.singleShot(3000, safe_get_result)
+            QTimer.singleShot(3000, self._webview_callback(web_view, safe_get_result))
         
         elif form_type == 'wjx':
             # 问卷星需要列表格式
@@ -4156,8 +4435,7 @@ class NewFillWindow(QDialog):
             fill_data = self._get_fill_data_for_card(card)
             
             # 使用石墨文档专用填充脚本
-            js_code = self.generate_shimo_fill_script(fill_data)
-            web_view.page().runJavaScript(js_code)
+            self._run_fill_script(web_view, 'shimo', fill_data)
             
             # 延迟3秒后获取结果
             def safe_get_result():
@@ -4168,15 +4446,14 @@ class NewFillWindow(QDialog):
                 if not sip.isdeleted(web_view):
                     self.get_fill_result(web_view, card, 'shimo')
             
-            QTimer.singleShot(3000, safe_get_result)
+            QTimer.singleShot(3000, self._webview_callback(web_view, safe_get_result))
         
         elif form_type == 'credamo':
             # 见数平台需要列表格式
             fill_data = self._get_fill_data_for_card(card)
             
             # 使用见数专用填充脚本
-            js_code = self.generate_credamo_fill_script(fill_data)
-            web_view.page().runJavaScript(js_code)
+            self._run_fill_script(web_view, 'credamo', fill_data)
             
             # 延迟3秒后获取结果
             def safe_get_result():
@@ -4187,15 +4464,14 @@ class NewFillWindow(QDialog):
                 if not sip.isdeleted(web_view):
                     self.get_fill_result(web_view, card, 'credamo')
             
-            QTimer.singleShot(3000, safe_get_result)
+            QTimer.singleShot(3000, self._webview_callback(web_view, safe_get_result))
         
         elif form_type == 'wenjuan':
             # 问卷网需要列表格式
             fill_data = self._get_fill_data_for_card(card)
             
             # 使用问卷网专用填充脚本
-            js_code = self.generate_wenjuan_fill_script(fill_data)
-            web_view.page().runJavaScript(js_code)
+            self._run_fill_script(web_view, 'wenjuan', fill_data)
             
             # 延迟3秒后获取结果
             def safe_get_result():
@@ -4206,7 +4482,7 @@ class NewFillWindow(QDialog):
                 if not sip.isdeleted(web_view):
                     self.get_fill_result(web_view, card, 'wenjuan')
             
-            QTimer.singleShot(3000, safe_get_result)
+            QTimer.singleShot(3000, self._webview_callback(web_view, safe_get_result))
         
         elif form_type == 'fanqier':
             # 番茄表单需要列表格式
@@ -4259,7 +4535,7 @@ class NewFillWindow(QDialog):
             web_view.page().runJavaScript(debug_js, debug_callback)
             
             # 延迟1秒后执行填充脚本
-            QTimer.singleShot(1000, lambda: self.execute_fanqier_fill(web_view, fill_data, card))
+            QTimer.singleShot(1000, self._webview_callback(web_view, lambda: self.execute_fanqier_fill(web_view, fill_data, card)))
             
             # 延迟6秒后获取最终结果（1秒调试+1秒执行+4秒等待）
             def safe_get_result():
@@ -4270,15 +4546,14 @@ class NewFillWindow(QDialog):
                 if not sip.isdeleted(web_view):
                     self.get_fill_result(web_view, card, 'fanqier')
             
-            QTimer.singleShot(6000, safe_get_result)
+            QTimer.singleShot(6000, self._webview_callback(web_view, safe_get_result))
         
         elif form_type == 'feishu':
             # 飞书问卷需要列表格式
             fill_data = self._get_fill_data_for_card(card)
             
             # 使用飞书问卷专用填充脚本
-            js_code = self.generate_feishu_fill_script(fill_data)
-            web_view.page().runJavaScript(js_code)
+            self._run_fill_script(web_view, 'feishu', fill_data)
             
             # 延迟3秒后获取结果
             def safe_get_result():
@@ -4289,15 +4564,14 @@ class NewFillWindow(QDialog):
                 if not sip.isdeleted(web_view):
                     self.get_fill_result(web_view, card, 'feishu')
             
-            QTimer.singleShot(3000, safe_get_result)
+            QTimer.singleShot(3000, self._webview_callback(web_view, safe_get_result))
         
         elif form_type == 'kdocs':
             # WPS表单需要列表格式
             fill_data = self._get_fill_data_for_card(card)
             
             # 使用WPS表单专用填充脚本
-            js_code = self.generate_kdocs_fill_script(fill_data)
-            web_view.page().runJavaScript(js_code)
+            self._run_fill_script(web_view, 'kdocs', fill_data)
             
             # 延迟3秒后获取结果
             def safe_get_result():
@@ -4308,15 +4582,14 @@ class NewFillWindow(QDialog):
                 if not sip.isdeleted(web_view):
                     self.get_fill_result(web_view, card, 'kdocs')
             
-            QTimer.singleShot(3000, safe_get_result)
+            QTimer.singleShot(3000, self._webview_callback(web_view, safe_get_result))
         
         elif form_type == 'tencent_wj':
             # 腾讯问卷需要列表格式
             fill_data = self._get_fill_data_for_card(card)
             
             # 使用腾讯问卷专用填充脚本
-            js_code = self.generate_tencent_wj_fill_script(fill_data)
-            web_view.page().runJavaScript(js_code)
+            self._run_fill_script(web_view, 'tencent_wj', fill_data)
             
             # 延迟3秒后获取结果
             def safe_get_result():
@@ -4327,7 +4600,7 @@ class NewFillWindow(QDialog):
                 if not sip.isdeleted(web_view):
                     self.get_fill_result(web_view, card, 'tencent_wj')
             
-            QTimer.singleShot(3000, safe_get_result)
+            QTimer.singleShot(3000, self._webview_callback(web_view, safe_get_result))
         
         elif form_type == 'baominggongju':
             # 报名工具需要特殊处理
@@ -4433,7 +4706,7 @@ class NewFillWindow(QDialog):
             # 4. 延迟重新初始化（确保资源释放）
             # ⚡️ 使用默认参数捕获当前值，避免闭包问题
             print(f"  ⏳ [报名工具] 800ms后重新初始化...")
-            QTimer.singleShot(800, lambda wv=web_view, u=link.url, c=card: self.init_baoming_tool_for_webview(wv, u, c))
+            QTimer.singleShot(800, self._webview_callback(web_view, lambda wv=web_view, u=link.url, c=card: self.init_baoming_tool_for_webview(wv, u, c)))
         else:
             # 普通页面直接刷新
             web_view.reload()
@@ -4935,7 +5208,7 @@ class NewFillWindow(QDialog):
                 # 延迟加载表单
                 print(f"  ⏳ [报名工具] 1秒后加载表单...")
                 # ⚡️ 使用默认参数捕获当前值，避免闭包问题
-                QTimer.singleShot(1000, lambda wv=web_view, f=filler, cc=card_config, c=card: self.load_baoming_form(wv, f, cc, c))
+                QTimer.singleShot(1000, self._webview_callback(web_view, lambda wv=web_view, f=filler, cc=card_config, c=card: self.load_baoming_form(wv, f, cc, c)))
             elif status == -1:
                 # 等待中（不打印，避免日志过多）
                 pass
@@ -5920,7 +6193,7 @@ class NewFillWindow(QDialog):
         web_view.setHtml(loading_html)
         
         # 5. 延迟重新初始化
-        QTimer.singleShot(500, lambda: self.init_baoming_tool_for_webview(web_view, original_url, card))
+        QTimer.singleShot(500, self._webview_callback(web_view, lambda: self.init_baoming_tool_for_webview(web_view, original_url, card)))
     
     def handle_baoming_submit(self, web_view: QWebEngineView, filler, card, timer):
         """处理报名工具提交"""
@@ -6094,15 +6367,19 @@ class NewFillWindow(QDialog):
         
         if cache_key in self.profile_cache:
             print(f"  🔄 复用已有 Profile: {cache_key}")
-            return self.profile_cache[cache_key]
-        
-        # 创建新的 Profile
-        storage_name = f"profile_store_{cache_key}"
-        # 注意：这里不传入 parent，让 profile 的生命周期由 self.profile_cache 管理
+        profile = self.profile_cache.get(cache_key, create=lambda: self._create_profile(cache_key, form_type))
+        self._trim_profile_disk_cache(profile)
+        return profile
+    
+    def _create_profile(self, cache_key: str, form_type: str) -> QWebEngineProfile:
+        """创建持久化 Profile（Cookie 保存在磁盘上，释放后重新创建可以恢复登录状态）"""
+        storage_name = f"{self.PROFILE_STORAGE_PREFIX}{cache_key}"
+        # 生命周期由 self.profile_cache 管理（超出数量上限时释放）
         profile = QWebEngineProfile(storage_name, self)
         
         # 设置为磁盘缓存模式，允许持久化 Cookie
         profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)
+        profile.setHttpCacheMaximumSize(int(getattr(config, 'PROFILE_HTTP_CACHE_MB', 64) * 1024 * 1024))
         profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.AllowPersistentCookies)
         
         # 设置中文语言
@@ -6113,12 +6390,332 @@ class NewFillWindow(QDialog):
         if 'zh-CN' not in user_agent:
             profile.setHttpUserAgent(user_agent + " Language/zh-CN")
         
-        # 缓存 Profile
-        self.profile_cache[cache_key] = profile
-        print(f"  ✅ 创建新 Profile: {cache_key} (共 {len(self.profile_cache)} 个)")
+        # 预装该平台的填充引擎，填写时只需发送 window.__afFill(payload)
+        if getattr(config, 'PREINSTALL_FILL_ENGINES', True):
+            self._preinstall_fill_engines(profile, form_type)
+        
+        # 填写结果通过 QWebChannel 推送，不再轮询
+        if getattr(config, 'FILL_RESULT_CHANNEL', True):
+            self._install_fill_bridge_script(profile)
         
+        # 白名单域名的静态资源从所有 Profile 共用的缓存加载（Cookie 仍按 Profile 隔离）
+        if getattr(config, 'SHARED_ASSET_CACHE', True):
+            from .asset_scheme import SharedAssetCache
+            SharedAssetCache.install(profile)
+        
+        print(f"  ✅ 创建新 Profile: {cache_key} (共 {len(self.profile_cache) + 1} 个)")
         return profile
     
+    def _profile_in_use(self, profile: QWebEngineProfile) -> bool:
+        """窗口中是否还有页面在使用该 Profile（复用池中的空闲 WebView 不算，释放时一起销毁）"""
+        return any(page.profile() is profile for page in self.findChildren(QWebEnginePage))
+    
+    def _release_profile(self, profile: QWebEngineProfile):
+        """释放 Profile：先销毁复用池中使用它的空闲 WebView（页面必须先于 Profile 销毁）"""
+        try:
+            from PyQt6 import sip
+        except ImportError:
+            import sip
+        if sip.isdeleted(profile):
+            return
+        if getattr(self, 'webview_pool', None) is not None:
+            self.webview_pool.discard_profile(profile)
+        storage_name = profile.storageName()
+        self.profile_engines.pop(storage_name, None)
+        # Chromium 在 Profile 销毁前仍打开着它的缓存目录
+        cache_name = os.path.basename(profile.cachePath())
+        self.releasing_profile_caches.add(cache_name)
+        profile.destroyed.connect(lambda _=None, name=cache_name: self.releasing_profile_caches.discard(name))
+        print(f"  ♻️ 释放空闲 Profile: {storage_name}（Cookie 已保存在磁盘上）")
+        profile.deleteLater()
+    
+    def _trim_profile_disk_cache(self, profile: QWebEngineProfile):
+        """所有 Profile 的 HTTP 缓存目录合计超过磁盘预算时，删除最久未使用的未加载 Profile 的缓存
+        
+        刚被 LRU 释放、还没有真正销毁的 Profile 的缓存目录也不删除
+        """
+        cache_root = os.path.dirname(profile.cachePath())
+        # 缓存目录和持久化目录（Cookie）相同时不删除
+        if not cache_root or cache_root == os.path.dirname(profile.persistentStoragePath()):
+            return
+        live_names = [os.path.basename(p.cachePath()) for p in self.profile_cache.profiles()]
+        live_names.extend(self.releasing_profile_caches)
+        removed = self.profile_cache.trim_disk_cache(cache_root, self.PROFILE_STORAGE_PREFIX, live_names)
+        if removed:
+            print(f"  🧹 Profile 缓存超出磁盘预算，已删除 {len(removed)} 个未加载 Profile 的 HTTP 缓存")
+    
+    def _fill_script(self, form_type: str, fill_data, assignment_plan: dict = None,
+                     two_phase: bool = False) -> str:
+        """生成填充脚本：缓存的平台引擎 + window.__afFill(payload)
+        
+        平台脚本（generate_*_fill_script）每个进程只渲染一次，之后每次填写只序列化名片数据
+        
+        Args:
+            form_type: 表单类型
+            fill_data: 名片数据（腾讯文档为字典，其余平台为列表）
+            assignment_plan: 全局最优分配方案（问卷星、金数据）
+            two_phase: 是否使用两阶段协议的引擎
+        """
+        from core.script_engine import FillScriptEngines
+        
+        engine_name, render = self._engine_renderer(form_type, two_phase)
+        return FillScriptEngines.fill_script(engine_name, render, fill_data, assignment_plan)
+
+    def _engine_renderer(self, form_type: str, two_phase: bool = False):
+        """返回 (引擎名称, render(fill_data, assignment_plan) -> 平台填充脚本)"""
+        renderers = {
+            'tencent_docs': lambda data, plan: self.tencent_docs_engine.generate_fill_script(
+                data,
+                incremental=getattr(config, 'INCREMENTAL_FILL', False),
+                incremental_timeout=getattr(config, 'INCREMENTAL_FILL_TIMEOUT', 60)
+            ),
+            'mikecrm': lambda data, plan: self.auto_fill_engine.generate_fill_script(data, two_phase=two_phase),
+            'wjx': lambda data, plan: self.generate_wjx_fill_script(data, plan),
+            'jinshuju': lambda data, plan: self.generate_jinshuju_fill_script(data, plan, two_phase=two_phase),
+            'fanqier': lambda data, plan: self.generate_fanqier_fill_script(data),
+            'shimo': lambda data, plan: self.generate_shimo_fill_script(data, two_phase=two_phase),
+            'credamo': lambda data, plan: self.generate_credamo_fill_script(data, two_phase=two_phase),
+            'wenjuan': lambda data, plan: self.generate_wenjuan_fill_script(data, two_phase=two_phase),
+            'feishu': lambda data, plan: self.generate_feishu_fill_script(data, two_phase=two_phase),
+            'kdocs': lambda data, plan: self.generate_kdocs_fill_script(data, two_phase=two_phase),
+            'tencent_wj': lambda data, plan: self.generate_tencent_wj_fill_script(data, two_phase=two_phase),
+        }
+        engine_name = f"{form_type}:two_phase" if two_phase else form_type
+        return engine_name, renderers[form_type]
+
+    def _preinstall_fill_engines(self, profile: QWebEngineProfile, form_type: str):
+        """把平台填充引擎注册为 Profile 的用户脚本
+        
+        Chromium 在该平台页面每次导航的 DocumentReady 时注入并解析引擎，
+        填写时 _run_fill_script 只发送一个短调用。
+        注入到 MainWorld：引擎依赖页面全局对象（jQuery/select2 等），
+        填写结果 window.__autoFillResult__ 也由主世界中的轮询脚本读取
+        """
+        from PyQt6.QtWebEngineCore import QWebEngineScript
+        from core.script_engine import FillScriptEngines
+        
+        patterns = self.ENGINE_URL_PATTERNS.get(form_type)
+        if not patterns:
+            return
+        
+        variants = [False]
+        if getattr(config, 'FILL_PROTOCOL', 'inline') == 'two_phase' and form_type in self.TWO_PHASE_FORM_TYPES:
+            variants.append(True)
+        
+        installed = set()
+        for two_phase in variants:
+            engine_name, render = self._engine_renderer(form_type, two_phase)
+            try:
+                source = FillScriptEngines.user_script_source(engine_name, render, patterns)
+            except Exception as e:
+                print(f"  ⚠️ 预装填充引擎失败 {engine_name}: {e}")
+                continue
+            script = QWebEngineScript()
+            script.setName(f"af-engine-{engine_name}")
+            script.setSourceCode(source)
+            script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentReady)
+            script.setWorldId(QWebEngineScript.ScriptWorldId.MainWorld)
+            script.setRunsOnSubFrames(False)
+            profile.scripts().insert(script)
+            installed.add(engine_name)
+        
+        self.profile_engines[profile.storageName()] = installed
+        print(f"  📦 已预装填充引擎: {', '.join(sorted(installed))}")
+
+    def _install_fill_bridge_script(self, profile: QWebEngineProfile):
+        """把 qwebchannel.js 和结果推送逻辑注册为 Profile 的用户脚本（DocumentCreation，主世界）"""
+        from PyQt6.QtWebEngineCore import QWebEngineScript
+        
+        source = FillBridge.user_script_source()
+        if not source:
+            print("  ⚠️ qwebchannel.js 不可用，填写结果使用轮询")
+            return
+        script = QWebEngineScript()
+        script.setName("af-fill-bridge")
+        script.setSourceCode(source)
+        script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+        script.setWorldId(QWebEngineScript.ScriptWorldId.MainWorld)
+        script.setRunsOnSubFrames(False)
+        profile.scripts().insert(script)
+
+    def _attach_fill_bridge(self, page: QWebEnginePage, web_view):
+        """为页面注册填写结果通道，引擎写入结果后立即保存记录"""
+        if not getattr(config, 'FILL_RESULT_CHANNEL', True):
+            return
+        try:
+            bridge = FillBridge.attach(page)
+        except Exception as e:
+            print(f"  ⚠️ 填写结果通道注册失败，使用轮询: {e}")
+            return
+        bridge.completed.connect(lambda result, wv=web_view: self._on_fill_result_pushed(wv, result))
+        bridge.progress.connect(lambda status, message: message and print(f"  📡 [{status}] {message}"))
+
+    @staticmethod
+    def _fill_bridge(web_view):
+        """WebView 当前页面的填写结果通道（未注册时为 None）"""
+        return getattr(web_view.page(), 'fill_bridge', None)
+
+    def _on_fill_result_pushed(self, web_view, result: dict):
+        """页面推送了最终结果：保存记录（每次填写只处理一次，增量模式的后续更新忽略）"""
+        try:
+            from PyQt6 import sip
+        except ImportError:
+            import sip
+        if not self._is_valid() or sip.isdeleted(web_view):
+            return
+        bridge = self._fill_bridge(web_view)
+        if bridge is None or bridge.pending is None:
+            return
+        card, form_type = bridge.pending
+        bridge.pending = None
+        print(f"  📡 [{card.name}] 收到填写结果推送")
+        self._record_fill_result(web_view, card, form_type, result)
+
+    def _run_fill_script(self, web_view, form_type: str, fill_data, assignment_plan: dict = None,
+                         two_phase: bool = False, prelude: str = '', callback=None):
+        """执行填充脚本
+        
+        Profile 已预装该平台引擎时只发送 window.__afFill(payload)；
+        页面中没有引擎（如预装前已打开的页面）时再发送完整的引擎 + 调用
+        
+        Args:
+            prelude: 在填充脚本前执行的代码（如两阶段协议的阶段参数）
+            callback: runJavaScript 回调，参数为填充脚本的返回值
+        """
+        from core.script_engine import FillScriptEngines, ENGINE_MISSING
+        
+        engine_name, render = self._engine_renderer(form_type, two_phase)
+        page = web_view.page()
+        
+        def run_full():
+            js_code = prelude + self._fill_script(form_type, fill_data, assignment_plan, two_phase)
+            if callback:
+                page.runJavaScript(js_code, callback)
+            else:
+                page.runJavaScript(js_code)
+        
+        if engine_name not in self.profile_engines.get(page.profile().storageName(), ()):
+            run_full()
+            return
+        
+        def on_result(result):
+            if result == ENGINE_MISSING:
+                print(f"  ⚠️ 页面中没有预装的引擎 {engine_name}，发送完整脚本")
+                run_full()
+            elif callback:
+                callback(result)
+        
+        page.runJavaScript(prelude + FillScriptEngines.guarded_call(engine_name, render, fill_data, assignment_plan),
+                           on_result)
+
+    def _two_phase_fill(self, web_view, card, form_type: str, fill_data: list, url: str = ''):
+        """两阶段协议填充
+
+        1. 以提取模式执行平台脚本（不含匹配算法和名片数据），页面给字段打上 data-af-idx 标记并返回字段描述；
+           提取和填充两个阶段执行的是同一个平台脚本（字段扫描和填值函数共用），Profile 预装了引擎时
+           每个阶段只发送阶段参数和 window.__afFill 调用
+        2. Python 端用 MatchService 匹配（同一表单 + 同一组名片 key 只匹配一次）
+        3. 注入填充指令 [(data-af-idx, 值), ...]，页面按标记定位字段并填值
+
+        表单结构缓存（core.schema_cache）中已有该链接的映射时跳过 1、2，直接下发指令；
+        页面校验字段与缓存不一致时返回最新字段，重新匹配并更新缓存。
+        提取超时则回退到原有的页面内匹配脚本
+        """
+        import json
+        from core.match_service import MatchService
+        from core.schema_cache import get_schema_cache
+
+        try:
+            from PyQt6 import sip
+        except ImportError:
+            import sip
+
+        poll_script = "(function() { return window.__autoFillResult__ || {status: 'waiting'}; })();"
+        retry_count = [0]
+        max_retries = 20
+        keys = [item.get('key', '') for item in fill_data]
+        schema_cache = get_schema_cache() if url and getattr(config, 'SCHEMA_CACHE_ENABLED', True) else None
+
+        def is_alive():
+            return self._is_valid() and not sip.isdeleted(web_view)
+
+        def run_phase(phase: dict):
+            # 先写入阶段参数并清空上一次的结果，再执行平台脚本
+            prelude = (f"window.__autoFillPhase__ = {json.dumps(phase, ensure_ascii=False)};\n"
+                       f"window.__autoFillResult__ = null;\n")
+            self._run_fill_script(web_view, form_type, [], two_phase=True, prelude=prelude)
+            retry_count[0] = 0
+            QTimer.singleShot(500, self._webview_callback(web_view, poll_result))
+
+        def poll_result():
+            if is_alive():
+                web_view.page().runJavaScript(poll_script, on_result)
+
+        def on_result(result):
+            if not is_alive():
+                return
+            status = result.get('status') if isinstance(result, dict) else None
+
+            if status == 'completed':
+                # 填充完成（或页面上未找到表单），按普通结果处理
+                self.get_fill_result(web_view, card, form_type)
+                return
+            if status not in ('extracted', 'stale'):
+                if retry_count[0] < max_retries:
+                    retry_count[0] += 1
+                    QTimer.singleShot(500, self._webview_callback(web_view, poll_result))
+                else:
+                    print(f"  ⚠️ [两阶段] 页面无响应，回退到页面内匹配")
+                    self._run_fill_script(web_view, form_type, fill_data)
+                    QTimer.singleShot(3000, self._webview_callback(web_view, lambda: self.get_fill_result(web_view, card, form_type)))
+                return
+
+            if status == 'stale' and schema_cache:
+                print(f"  ♻️ [表单缓存] 字段结构已变化，重新匹配")
+                schema_cache.invalidate(url)
+
+            fields = result.get('fields') or []
+            optimal = getattr(config, 'MATCH_ASSIGNMENT_MODE', 'greedy') == 'optimal'
+            start = time.time()
+            instructions = MatchService.build_instructions(fields, fill_data, optimal=optimal)
+            stats = MatchService.cache_stats()
+            print(f"  🧩 [两阶段] {len(fields)} 个字段 → {len(instructions)} 条填充指令 "
+                  f"(耗时 {(time.time() - start) * 1000:.0f}ms，缓存命中 {stats['hits']}/{stats['hits'] + stats['misses']})")
+            for step in instructions:
+                print(f"     [{step['idx']:2}] \"{step['title']}\" ← \"{step['key']}\" ({step['score']:.1f})")
+
+            if schema_cache and fields:
+                schema_cache.put(url, fields, keys, instructions)
+            run_phase({'mode': 'apply', 'instructions': instructions})
+
+        cached = schema_cache.get(url, keys) if schema_cache else None
+        if cached:
+            instructions = schema_cache.build_instructions(cached, fill_data)
+            print(f"  ⚡️ [表单缓存] 命中，跳过字段提取和匹配，直接下发 {len(instructions)} 条填充指令")
+            run_phase({'mode': 'apply', 'instructions': instructions, 'expect': {'count': cached['count']}})
+        else:
+            run_phase({'mode': 'extract'})
+
+    def _build_assignment_plan(self, form_fields: list, fill_data: list, allow_reuse: bool) -> dict:
+        """全局最优分配模式下，根据页面提取的标题生成 字段 → 名片字段 的固定分配方案
+        
+        未开启该模式（config.MATCH_ASSIGNMENT_MODE != 'optimal'）或求解失败时返回 None，
+        页面脚本回退到原有的逐个匹配
+        """
+        if getattr(config, 'MATCH_ASSIGNMENT_MODE', 'greedy') != 'optimal' or not form_fields:
+            return None
+        
+        try:
+            from core.field_assignment import OptimalFieldAssignment
+            start = time.time()
+            plan = OptimalFieldAssignment.build_plan(form_fields, fill_data, allow_reuse=allow_reuse)
+            print(f"  🧮 [最优分配] {len(form_fields)} 个字段 × {len(fill_data)} 个名片字段，"
+                  f"分配 {len(plan)} 个 (耗时 {(time.time() - start) * 1000:.0f}ms)")
+            return plan
+        except Exception as e:
+            print(f"  ⚠️ [最优分配] 求解失败，回退到逐个匹配: {e}")
+            return None
+    
     def _jinshuju_fill_with_field_log(self, web_view, card, fill_data: list):
         """金数据填充：先获取表单字段打印日志，再执行填充"""
         import json
@@ -6216,9 +6813,11 @@ class NewFillWindow(QDialog):
                 print("  (未检测到表单字段，可能页面还在加载)")
             print(f"{'='*60}\n")
             
+            # 全局最优分配模式：共享执行器允许名片数据被多次使用
+            assignment_plan = self._build_assignment_plan(form_fields, fill_data, allow_reuse=True)
+            
             # 执行填充
-            js_code = self.generate_jinshuju_fill_script(fill_data)
-            web_view.page().runJavaScript(js_code)
+            self._run_fill_script(web_view, 'jinshuju', fill_data, assignment_plan)
             
             # 延迟获取结果
             def safe_get_result():
@@ -6229,7 +6828,7 @@ class NewFillWindow(QDialog):
                 if not sip.isdeleted(web_view) and self._is_valid():
                     self.get_fill_result(web_view, card, 'jinshuju')
             
-            QTimer.singleShot(3000, safe_get_result)
+            QTimer.singleShot(3000, self._webview_callback(web_view, safe_get_result))
         
         # 带重试的获取字段
         retry_count = [0]
@@ -6250,12 +6849,12 @@ class NewFillWindow(QDialog):
             if len(fields) == 0 and retry_count[0] < max_retries:
                 retry_count[0] += 1
                 print(f"  ⏳ 等待表单加载... (重试 {retry_count[0]}/{max_retries})")
-                QTimer.singleShot(1500, get_fields)
+                QTimer.singleShot(1500, self._webview_callback(web_view, get_fields))
             else:
                 on_fields_received(result)
         
         # 首次延迟 500ms 后获取字段
-        QTimer.singleShot(500, get_fields)
+        QTimer.singleShot(500, self._webview_callback(web_view, get_fields))
     
     def _wjx_fill_with_field_log(self, web_view, card, fill_data: list):
         """问卷星填充：先获取表单字段打印日志，再执行填充"""
@@ -6275,6 +6874,10 @@ class NewFillWindow(QDialog):
     var fields = [];
     var seenTitles = {};
     
+    // 标签索引（来自 TencentDocsFiller.get_label_index()）
+%(label_index)s
+    var index = getLabelIndex();
+    
     // 辅助函数：从元素中提取标题
     function extractLabelText(el) {
         if (!el) return '';
@@ -6313,7 +6916,7 @@ class NewFillWindow(QDialog):
                 var cls = (parent.className || '').toLowerCase();
                 if (cls.indexOf('field') >= 0 || cls.indexOf('question') >= 0 || cls.indexOf('topic') >= 0) {
                     var labelEl = parent.querySelector('.field-label, .topichtml, .topic-title, .q-title, .label:not(.note)');
-                    if (!labelEl) labelEl = parent.querySelector('label');
+                    if (!labelEl) labelEl = index.firstLabel(parent);
                     if (labelEl) title = extractLabelText(labelEl);
                     break;
                 }
@@ -6323,13 +6926,13 @@ class NewFillWindow(QDialog):
         
         // 方法3: 关联的 label 标签
         if (!title && input.id) {
-            var label = document.querySelector('label[for="' + input.id + '"]');
+            var label = index.labelForId(input.id);
             if (label) title = extractLabelText(label);
         }
         
-        // 清理标题并去重
+        // 清理标题并去重（与填充脚本一致，去除【请选择...】这类提示）
         if (title) {
-            title = title.replace(/[*？?！!。.]+$/g, '').trim();
+            title = title.replace(/【[^】]*】/g, '').replace(/[*？?！!。.]+$/g, '').trim();
             if (title && !seenTitles[title]) {
                 seenTitles[title] = true;
                 fields.push(title);
@@ -6338,7 +6941,7 @@ class NewFillWindow(QDialog):
     }
     return JSON.stringify(fields);
 })();
-"""
+""" % {'label_index': TencentDocsFiller.get_label_index()}
         
         def on_fields_received(result):
             try:
@@ -6364,9 +6967,11 @@ class NewFillWindow(QDialog):
                 print("  (未检测到表单字段，可能页面还在加载)")
             print(f"{'='*60}\n")
             
+            # 全局最优分配模式：问卷星每个名片字段只使用一次
+            assignment_plan = self._build_assignment_plan(form_fields, fill_data, allow_reuse=False)
+            
             # 执行填充
-            js_code = self.generate_wjx_fill_script(fill_data)
-            web_view.page().runJavaScript(js_code)
+            self._run_fill_script(web_view, 'wjx', fill_data, assignment_plan)
             
             # 延迟获取结果
             def safe_get_result():
@@ -6377,7 +6982,7 @@ class NewFillWindow(QDialog):
                 if not sip.isdeleted(web_view) and self._is_valid():
                     self.get_fill_result(web_view, card, 'wjx')
             
-            QTimer.singleShot(3000, safe_get_result)
+            QTimer.singleShot(3000, self._webview_callback(web_view, safe_get_result))
         
         # 带重试的获取字段
         retry_count = [0]
@@ -6398,22 +7003,32 @@ class NewFillWindow(QDialog):
             if len(fields) == 0 and retry_count[0] < max_retries:
                 retry_count[0] += 1
                 print(f"  ⏳ 等待表单加载... (重试 {retry_count[0]}/{max_retries})")
-                QTimer.singleShot(1500, get_fields)
+                QTimer.singleShot(1500, self._webview_callback(web_view, get_fields))
             else:
                 on_fields_received(result)
         
         # 首次延迟 500ms 后获取字段
-        QTimer.singleShot(500, get_fields)
+        QTimer.singleShot(500, self._webview_callback(web_view, get_fields))
     
-    def generate_wjx_fill_script(self, fill_data: list) -> str:
-        """生成问卷星(wjx.cn/wjx.top)专用的填充脚本 - 使用共享匹配算法"""
+    def generate_wjx_fill_script(self, fill_data: list, assignment_plan: dict = None) -> str:
+        """生成问卷星(wjx.cn/wjx.top)专用的填充脚本 - 使用共享匹配算法
+        
+        Args:
+            fill_data: 名片数据
+            assignment_plan: 全局最优分配方案（可选，见 OptimalFieldAssignment.build_plan）
+        """
         import json
         from core.tencent_docs_filler import TencentDocsFiller
         
         fill_data_json = json.dumps(fill_data, ensure_ascii=False)
+        assignment_plan_json = json.dumps(assignment_plan, ensure_ascii=False) if assignment_plan else 'null'
         
-        # 获取共享的匹配算法（cleanText, splitKeywords, matchKeyword）
+        # 获取共享的匹配算法（cleanText, splitKeywords, matchKeyword, longestCommonSubstring）
         shared_algorithm = TencentDocsFiller.get_shared_match_algorithm()
+        incremental_observer = TencentDocsFiller.get_incremental_observer()
+        ready_waiter = TencentDocsFiller.get_ready_waiter()
+        incremental_mode = 'true' if getattr(config, 'INCREMENTAL_FILL', False) else 'false'
+        incremental_timeout_ms = int(getattr(config, 'INCREMENTAL_FILL_TIMEOUT', 60) * 1000)
         
         js_code = f"""
 (function() {{
@@ -6424,6 +7039,12 @@ class NewFillWindow(QDialog):
     // ═══════════════════════════════════════════════════════════════
 {shared_algorithm}
     
+    // 增量模式（来自 TencentDocsFiller.get_incremental_observer()）
+{incremental_observer}
+    
+    // 表单就绪检测（来自 TencentDocsFiller.get_ready_waiter()）
+{ready_waiter}
+    
     // 🔧 自动适配移动端视口
     (function adaptViewport() {{
         const existingViewport = document.querySelector('meta[name="viewport"]');
@@ -6460,14 +7081,32 @@ class NewFillWindow(QDialog):
     }})();
     
     const fillData = {fill_data_json};
+    // 全局最优分配方案（Python 端匈牙利算法求解，为 null 时使用贪心匹配）
+    const assignmentPlan = {assignment_plan_json};
     let fillCount = 0;
     const results = [];
     const usedCardKeys = new Set();
+    // 增量模式：填写完成后继续监听条件逻辑新显示的问题
+    const incrementalMode = {incremental_mode};
+    // 已处理过的问题容器（增量模式只处理新插入的节点）
+    const processedFields = new WeakSet();
     
     // 寻找最佳匹配项 - 使用共享的 matchKeyword
     function findBestMatch(identifiers, formTitle = '') {{
         let bestMatch = {{ item: null, score: 0, identifier: null, matchedKey: null }};
         
+        // 优先使用最优分配方案
+        const planned = lookupAssignment(assignmentPlan, formTitle ? [formTitle, ...identifiers] : identifiers);
+        const plannedItem = planned ? fillData[planned.index] : null;
+        if (plannedItem && plannedItem.key === planned.key && !usedCardKeys.has(plannedItem.key)) {{
+            return {{
+                item: plannedItem,
+                score: planned.score,
+                identifier: formTitle || identifiers[0],
+                matchedKey: planned.key
+            }};
+        }}
+        
         for (const item of fillData) {{
             // 跳过已使用的字段
             if (usedCardKeys.has(item.key)) continue;
@@ -6542,23 +7181,6 @@ class NewFillWindow(QDialog):
         return input.value === value;
     }}
     
-    // 辅助函数：最长公共子串（用于模糊匹配）
-    function longestCommonSubstring(s1, s2) {{
-        const m = s1.length, n = s2.length;
-        if (m === 0 || n === 0) return 0;
-        let maxLen = 0;
-        const dp = Array(m + 1).fill(null).map(() => Array(n + 1).fill(0));
-        for (let i = 1; i <= m; i++) {{
-            for (let j = 1; j <= n; j++) {{
-                if (s1[i-1] === s2[j-1]) {{
-                    dp[i][j] = dp[i-1][j-1] + 1;
-                    maxLen = Math.max(maxLen, dp[i][j]);
-                }}
-            }}
-        }}
-        return maxLen;
-    }}
-    
     // 处理多选题（checkbox）
     function handleCheckbox(fieldDiv, value, questionTitle) {{
         const checkboxes = fieldDiv.querySelectorAll('input[type="checkbox"]');
@@ -6767,48 +7389,214 @@ class NewFillWindow(QDialog):
     // 解析问卷星表单结构
     // ═══════════════════════════════════════════════════════════════
     
-    function parseWjxFields() {{
-        const fields = [];
+    // 问卷星的问题容器: .field[type] 或 div[id^="div"][topic]
+    const WJX_FIELD_SELECTOR = '.field[type], div.field[topic], fieldset .field';
+    
+    // 解析单个问题容器
+    function parseWjxField(fieldDiv, index) {{
+        const type = fieldDiv.getAttribute('type');
+        const topic = fieldDiv.getAttribute('topic');
+        
+        // 获取问题标题
+        const topicHtml = fieldDiv.querySelector('.topichtml');
+        let questionTitle = '';
+        if (topicHtml) {{
+            questionTitle = (topicHtml.innerText || topicHtml.textContent || '').trim();
+            // 去除【请选择...】这类提示
+            questionTitle = questionTitle.replace(/【[^】]*】/g, '').trim();
+        }}
         
-        // 问卷星的问题容器: .field[type] 或 div[id^="div"][topic]
-        const fieldDivs = document.querySelectorAll('.field[type], div.field[topic], fieldset .field');
+        if (!questionTitle) {{
+            const labelDiv = fieldDiv.querySelector('.field-label');
+            if (labelDiv) {{
+                questionTitle = (labelDiv.innerText || labelDiv.textContent || '').trim();
+                // 去除序号和必填标记
+                questionTitle = questionTitle.replace(/^\\d+\\.\\s*\\*?\\s*/, '').replace(/\\*$/, '').trim();
+            }}
+        }}
+        
+        console.log(`  [${{index + 1}}] type=${{type}}, topic=${{topic}}: "${{questionTitle.substring(0, 30)}}${{questionTitle.length > 30 ? '...' : ''}}"`);
+        
+        return {{
+            element: fieldDiv,
+            type: type,
+            topic: topic,
+            title: questionTitle,
+            index: index
+        }};
+    }}
+    
+    function parseWjxFields() {{
+        const fieldDivs = document.querySelectorAll(WJX_FIELD_SELECTOR);
         
         console.log(`\\n📊 发现 ${{fieldDivs.length}} 个问题字段`);
         
-        fieldDivs.forEach((fieldDiv, index) => {{
-            const type = fieldDiv.getAttribute('type');
-            const topic = fieldDiv.getAttribute('topic');
-            
-            // 获取问题标题
-            const topicHtml = fieldDiv.querySelector('.topichtml');
-            let questionTitle = '';
-            if (topicHtml) {{
-                questionTitle = (topicHtml.innerText || topicHtml.textContent || '').trim();
-                // 去除【请选择...】这类提示
-                questionTitle = questionTitle.replace(/【[^】]*】/g, '').trim();
-            }}
-            
-            if (!questionTitle) {{
-                const labelDiv = fieldDiv.querySelector('.field-label');
-                if (labelDiv) {{
-                    questionTitle = (labelDiv.innerText || labelDiv.textContent || '').trim();
-                    // 去除序号和必填标记
-                    questionTitle = questionTitle.replace(/^\\d+\\.\\s*\\*?\\s*/, '').replace(/\\*$/, '').trim();
+        return Array.from(fieldDivs, (fieldDiv, index) => parseWjxField(fieldDiv, index));
+    }}
+    
+    // 填写单个问题字段，返回是否填写成功
+    function fillField(field) {{
+        const {{ element: fieldDiv, type, topic, title }} = field;
+        
+        console.log(`\\n📋 问题 #${{topic || field.index + 1}}: "${{title}}"`);
+        console.log(`   类型: type=${{type}}`);
+        
+        let filled = false;
+        
+        switch (type) {{
+            case '1': // 文本输入
+            case '2': // 多行文本
+            case '6': // 数字输入
+                // ⚡️ 扩展选择器：支持 text、tel、number 类型的输入框
+                const textInput = fieldDiv.querySelector('input[type="text"], input[type="tel"], input[type="number"], textarea');
+                if (textInput && !textInput.readOnly && !textInput.disabled) {{
+                    // ⚡️【核心优化】智能提取核心标题，去除序号和说明文字
+                    // 例如: "1、账号类型（科技、文创、亲子、情侣、萌宠、生活类）" -> "账号类型"
+                    let coreTitle = title;
+                    // 1. 去除开头的序号（如 "1、" "2." "*1" "Q1"）
+                    coreTitle = coreTitle.replace(/^[\\*]*[\\dqQ]+[、.．:：\\s]*/g, '');
+                    // 2. 提取括号前的核心内容
+                    const bracketMatch = coreTitle.match(/^([^（(【\\[]+)/);
+                    if (bracketMatch && bracketMatch[1].trim().length >= 2) {{
+                        coreTitle = bracketMatch[1].trim();
+                    }}
+                    // 3. 如果核心部分太长，取第一个词组
+                    if (coreTitle.length > 10) {{
+                        const parts = coreTitle.split(/[，,、\\s]+/);
+                        if (parts[0] && parts[0].length >= 2) {{
+                            coreTitle = parts[0];
+                        }}
+                    }}
+                    // 4. 去除尾部的数字和单位
+                    coreTitle = coreTitle.replace(/\\d+[万wW以上以下以内左右]+.*$/, '');
+                    // 5. 如果结果太短，回退到原标题
+                    if (!coreTitle || coreTitle.length < 2) {{
+                        coreTitle = title;
+                    }}
+                    
+                    // 使用核心标题作为标识符，直接交给共享匹配算法
+                    const identifiers = [coreTitle];
+                    if (coreTitle !== title) {{
+                        identifiers.push(title);
+                    }}
+                    
+                    const match = findBestMatch(identifiers, title);
+                    if (match.item && match.score >= 50) {{
+                        filled = fillInput(textInput, match.item.value);
+                        if (filled) {{
+                            usedCardKeys.add(match.item.key);
+                            console.log(`   ✅ 填入: "${{match.item.value}}" (匹配: ${{match.item.key}}, 分数: ${{match.score.toFixed(1)}})`);
+                            fillCount++;
+                            results.push({{
+                                key: match.item.key,
+                                value: match.item.value,
+                                matched: title,
+                                score: match.score,
+                                success: true
+                            }});
+                        }}
+                    }} else {{
+                        console.log(`   ❌ 未找到匹配 (最高分: ${{match.score ? match.score.toFixed(1) : 0}})`);
+                    }}
                 }}
-            }}
-            
-            fields.push({{
-                element: fieldDiv,
-                type: type,
-                topic: topic,
-                title: questionTitle,
-                index: index
-            }});
-            
-            console.log(`  [${{index + 1}}] type=${{type}}, topic=${{topic}}: "${{questionTitle.substring(0, 30)}}${{questionTitle.length > 30 ? '...' : ''}}"`);
-        }});
+                break;
+                
+            case '3': // 单选题
+                // 单选题类似多选题但只选一个
+                const radios = fieldDiv.querySelectorAll('input[type="radio"]');
+                if (radios.length > 0) {{
+                    const identifiers = [title];
+                    const match = findBestMatch(identifiers, title);
+                    if (match.item && match.score >= 50) {{
+                        const cleanValue = cleanText(match.item.value);
+                        radios.forEach(radio => {{
+                            const wrapper = radio.closest('.ui-radio');
+                            let optionText = '';
+                            if (wrapper) {{
+                                const label = wrapper.querySelector('.label, label');
+                                optionText = cleanText(label ? (label.innerText || '') : '');
+                            }}
+                            
+                            if (optionText === cleanValue || optionText.includes(cleanValue) || cleanValue.includes(optionText)) {{
+                                const jqradio = wrapper?.querySelector('a.jqradio');
+                                if (jqradio) {{
+                                    jqradio.click();
+                                }} else {{
+                                    radio.click();
+                                }}
+                                usedCardKeys.add(match.item.key);
+                                filled = true;
+                                fillCount++;
+                                console.log(`   ✅ 选择: "${{optionText}}" (匹配: ${{match.item.key}})`);
+                                results.push({{
+                                    key: match.item.key,
+                                    value: match.item.value,
+                                    matched: title,
+                                    score: match.score,
+                                    success: true
+                                }});
+                            }}
+                        }});
+                    }}
+                }}
+                break;
+                
+            case '4': // 多选题
+                const identifiersCheckbox = [title];
+                if (title.includes('类型') || title.includes('类别')) {{
+                    identifiersCheckbox.push('账号类型', '类型', '分类', '领域');
+                }}
+                const checkboxMatch = findBestMatch(identifiersCheckbox, title);
+                if (checkboxMatch.item && checkboxMatch.score >= 50) {{
+                    filled = handleCheckbox(fieldDiv, checkboxMatch.item.value, title);
+                    if (filled) {{
+                        usedCardKeys.add(checkboxMatch.item.key);
+                        fillCount++;
+                        results.push({{
+                            key: checkboxMatch.item.key,
+                            value: checkboxMatch.item.value,
+                            matched: title,
+                            score: checkboxMatch.score,
+                            success: true
+                        }});
+                    }}
+                }}
+                break;
+                
+            case '7': // 下拉选择
+                const identifiersSelect = [title];
+                if (title.includes('返点')) {{
+                    identifiersSelect.push('返点比例', '返点', '佣金比例');
+                }}
+                const selectMatch = findBestMatch(identifiersSelect, title);
+                if (selectMatch.item && selectMatch.score >= 50) {{
+                    filled = handleSelect(fieldDiv, selectMatch.item.value, title);
+                    if (filled) {{
+                        usedCardKeys.add(selectMatch.item.key);
+                        fillCount++;
+                        results.push({{
+                            key: selectMatch.item.key,
+                            value: selectMatch.item.value,
+                            matched: title,
+                            score: selectMatch.score,
+                            success: true
+                        }});
+                    }}
+                }}
+                break;
+                
+            case '9': // 联系地址（矩阵表格）
+                filled = handleAddressField(fieldDiv, title);
+                break;
+                
+            default:
+                console.log(`   ⚠️  暂不支持的题型: type=${{type}}`);
+        }}
         
-        return fields;
+        if (!filled && type !== '9') {{
+            console.log(`   ⏭️  跳过此字段`);
+        }}
+        return filled;
     }}
     
     // ═══════════════════════════════════════════════════════════════
@@ -6816,6 +7604,7 @@ class NewFillWindow(QDialog):
     // ═══════════════════════════════════════════════════════════════
     
     async function executeAutoFill() {{
+        // @debug-begin
         console.log('\\n═══════════════════════════════════════════════════════════════');
         console.log('🔍 [问卷星 v2.0] 页面结构分析');
         console.log('═══════════════════════════════════════════════════════════════');
@@ -6828,9 +7617,11 @@ class NewFillWindow(QDialog):
             const valuePreview = String(item.value).substring(0, 30) + (String(item.value).length > 30 ? '...' : '');
             console.log(`   ${{i + 1}}. "${{item.key}}" = "${{valuePreview}}"`);
         }});
+        // @debug-end
         
-        // 等待页面加载
-        await new Promise(resolve => setTimeout(resolve, 500));
+        // 等待问题容器出现且页面渲染稳定
+        const readiness = await waitForFormReady({{ selector: WJX_FIELD_SELECTOR }});
+        console.log(`⏳ 表单就绪检测: ${{readiness.count}} 个问题（${{readiness.elapsed}}ms）`);
         
         // 解析表单字段
         const fields = parseWjxFields();
@@ -6845,168 +7636,11 @@ class NewFillWindow(QDialog):
         console.log('\\n🎯 开始智能填写...');
         console.log('═══════════════════════════════════════════════════════════════');
         
-        // 遍历每个问题字段
+        // 遍历每个问题字段（增量模式下隐藏的问题留到条件逻辑显示后再填写）
         for (const field of fields) {{
-            const {{ element: fieldDiv, type, topic, title }} = field;
-            
-            console.log(`\\n📋 问题 #${{topic || field.index + 1}}: "${{title}}"`);
-            console.log(`   类型: type=${{type}}`);
-            
-            let filled = false;
-            
-            switch (type) {{
-                case '1': // 文本输入
-                case '2': // 多行文本
-                case '6': // 数字输入
-                    // ⚡️ 扩展选择器：支持 text、tel、number 类型的输入框
-                    const textInput = fieldDiv.querySelector('input[type="text"], input[type="tel"], input[type="number"], textarea');
-                    if (textInput && !textInput.readOnly && !textInput.disabled) {{
-                        // ⚡️【核心优化】智能提取核心标题，去除序号和说明文字
-                        // 例如: "1、账号类型（科技、文创、亲子、情侣、萌宠、生活类）" -> "账号类型"
-                        let coreTitle = title;
-                        // 1. 去除开头的序号（如 "1、" "2." "*1" "Q1"）
-                        coreTitle = coreTitle.replace(/^[\\*]*[\\dqQ]+[、.．:：\\s]*/g, '');
-                        // 2. 提取括号前的核心内容
-                        const bracketMatch = coreTitle.match(/^([^（(【\\[]+)/);
-                        if (bracketMatch && bracketMatch[1].trim().length >= 2) {{
-                            coreTitle = bracketMatch[1].trim();
-                        }}
-                        // 3. 如果核心部分太长，取第一个词组
-                        if (coreTitle.length > 10) {{
-                            const parts = coreTitle.split(/[，,、\\s]+/);
-                            if (parts[0] && parts[0].length >= 2) {{
-                                coreTitle = parts[0];
-                            }}
-                        }}
-                        // 4. 去除尾部的数字和单位
-                        coreTitle = coreTitle.replace(/\\d+[万wW以上以下以内左右]+.*$/, '');
-                        // 5. 如果结果太短，回退到原标题
-                        if (!coreTitle || coreTitle.length < 2) {{
-                            coreTitle = title;
-                        }}
-                        
-                        // 使用核心标题作为标识符，直接交给共享匹配算法
-                        const identifiers = [coreTitle];
-                        if (coreTitle !== title) {{
-                            identifiers.push(title);
-                        }}
-                        
-                        const match = findBestMatch(identifiers, title);
-                        if (match.item && match.score >= 50) {{
-                            filled = fillInput(textInput, match.item.value);
-                            if (filled) {{
-                                usedCardKeys.add(match.item.key);
-                                console.log(`   ✅ 填入: "${{match.item.value}}" (匹配: ${{match.item.key}}, 分数: ${{match.score.toFixed(1)}})`);
-                                fillCount++;
-                                results.push({{
-                                    key: match.item.key,
-                                    value: match.item.value,
-                                    matched: title,
-                                    score: match.score,
-                                    success: true
-                                }});
-                            }}
-                        }} else {{
-                            console.log(`   ❌ 未找到匹配 (最高分: ${{match.score ? match.score.toFixed(1) : 0}})`);
-                        }}
-                    }}
-                    break;
-                    
-                case '3': // 单选题
-                    // 单选题类似多选题但只选一个
-                    const radios = fieldDiv.querySelectorAll('input[type="radio"]');
-                    if (radios.length > 0) {{
-                        const identifiers = [title];
-                        const match = findBestMatch(identifiers, title);
-                        if (match.item && match.score >= 50) {{
-                            const cleanValue = cleanText(match.item.value);
-                            radios.forEach(radio => {{
-                                const wrapper = radio.closest('.ui-radio');
-                                let optionText = '';
-                                if (wrapper) {{
-                                    const label = wrapper.querySelector('.label, label');
-                                    optionText = cleanText(label ? (label.innerText || '') : '');
-                                }}
-                                
-                                if (optionText === cleanValue || optionText.includes(cleanValue) || cleanValue.includes(optionText)) {{
-                                    const jqradio = wrapper?.querySelector('a.jqradio');
-                                    if (jqradio) {{
-                                        jqradio.click();
-                                    }} else {{
-                                        radio.click();
-                                    }}
-                                    usedCardKeys.add(match.item.key);
-                                    filled = true;
-                                    fillCount++;
-                                    console.log(`   ✅ 选择: "${{optionText}}" (匹配: ${{match.item.key}})`);
-                                    results.push({{
-                                        key: match.item.key,
-                                        value: match.item.value,
-                                        matched: title,
-                                        score: match.score,
-                                        success: true
-                                    }});
-                                }}
-                            }});
-                        }}
-                    }}
-                    break;
-                    
-                case '4': // 多选题
-                    const identifiersCheckbox = [title];
-                    if (title.includes('类型') || title.includes('类别')) {{
-                        identifiersCheckbox.push('账号类型', '类型', '分类', '领域');
-                    }}
-                    const checkboxMatch = findBestMatch(identifiersCheckbox, title);
-                    if (checkboxMatch.item && checkboxMatch.score >= 50) {{
-                        filled = handleCheckbox(fieldDiv, checkboxMatch.item.value, title);
-                        if (filled) {{
-                            usedCardKeys.add(checkboxMatch.item.key);
-                            fillCount++;
-                            results.push({{
-                                key: checkboxMatch.item.key,
-                                value: checkboxMatch.item.value,
-                                matched: title,
-                                score: checkboxMatch.score,
-                                success: true
-                            }});
-                        }}
-                    }}
-                    break;
-                    
-                case '7': // 下拉选择
-                    const identifiersSelect = [title];
-                    if (title.includes('返点')) {{
-                        identifiersSelect.push('返点比例', '返点', '佣金比例');
-                    }}
-                    const selectMatch = findBestMatch(identifiersSelect, title);
-                    if (selectMatch.item && selectMatch.score >= 50) {{
-                        filled = handleSelect(fieldDiv, selectMatch.item.value, title);
-                        if (filled) {{
-                            usedCardKeys.add(selectMatch.item.key);
-                            fillCount++;
-                            results.push({{
-                                key: selectMatch.item.key,
-                                value: selectMatch.item.value,
-                                matched: title,
-                                score: selectMatch.score,
-                                success: true
-                            }});
-                        }}
-                    }}
-                    break;
-                    
-                case '9': // 联系地址（矩阵表格）
-                    filled = handleAddressField(fieldDiv, title);
-                    break;
-                    
-                default:
-                    console.log(`   ⚠️  暂不支持的题型: type=${{type}}`);
-            }}
-            
-            if (!filled && type !== '9') {{
-                console.log(`   ⏭️  跳过此字段`);
-            }}
+            if (incrementalMode && field.element.getClientRects().length === 0) continue;
+            processedFields.add(field.element);
+            fillField(field);
         }}
         
         // 汇总结果
@@ -7038,6 +7672,34 @@ class NewFillWindow(QDialog):
         
         console.log(`\\n✅ 问卷星填写完成: ${{fillCount}}/${{fields.length}} 个字段`);
         console.log('═══════════════════════════════════════════════════════════════\\n');
+        
+        if (incrementalMode) {{
+            observeNewQuestions({{
+                selector: WJX_FIELD_SELECTOR,
+                processed: processedFields,
+                timeoutMs: {incremental_timeout_ms},
+                onNewQuestions: async (nodes) => {{
+                    // 只用剩余的名片字段匹配新问题（findBestMatch 跳过已使用的 key）
+                    for (const node of nodes) {{
+                        // 首轮时隐藏、现在显示的问题已经解析过
+                        let field = fields.find(item => item.element === node);
+                        if (!field) {{
+                            field = parseWjxField(node, fields.length);
+                            fields.push(field);
+                        }}
+                        fillField(field);
+                    }}
+                    
+                    window.__autoFillResult__ = {{
+                        fillCount: fillCount,
+                        totalCount: fields.length,
+                        status: 'completed',
+                        results: results.filter(r => r.success || !usedCardKeys.has(r.key))
+                    }};
+                    console.log(`✅ [增量模式] 已更新: ${{fillCount}}/${{fields.length}} 个字段`);
+                }}
+            }});
+        }}
     }}
     
     // 兼容模式：直接扫描所有输入框
@@ -7106,28 +7768,48 @@ class NewFillWindow(QDialog):
         console.log(`\\n✅ 兼容模式填写完成: ${{fillCount}} 个字段`);
     }}
     
-    executeAutoFill();
+    // 执行出错时也写入最终结果（推送通道据此立即保存记录）
+    executeAutoFill().catch(error => {{
+        console.error('❌ 执行出错:', error);
+        window.__autoFillResult__ = {{
+            fillCount: 0,
+            totalCount: (fillData || []).length,
+            status: 'failed',
+            message: error.message || '未知错误',
+            results: []
+        }};
+    }});
     return '问卷星填写脚本(v2.0)已执行';
 }})();
         """
         return js_code
     
-    def generate_jinshuju_fill_script(self, fill_data: list) -> str:
-        """生成金数据专用的填充脚本 - 使用共享匹配算法"""
+    def generate_jinshuju_fill_script(self, fill_data: list, assignment_plan: dict = None,
+                                      two_phase: bool = False) -> str:
+        """生成金数据专用的填充脚本 - 使用共享匹配算法
+        
+        Args:
+            fill_data: 名片数据
+            assignment_plan: 全局最优分配方案（可选，见 OptimalFieldAssignment.build_plan）
+            two_phase: 是否生成两阶段协议脚本（见 _two_phase_fill）
+        """
         import json
         from core.tencent_docs_filler import TencentDocsFiller
         
         fill_data_json = json.dumps(fill_data, ensure_ascii=False)
+        assignment_plan_json = json.dumps(assignment_plan, ensure_ascii=False) if assignment_plan else 'null'
         
         # 获取共享的匹配算法和执行逻辑
-        shared_algorithm = TencentDocsFiller.get_shared_match_algorithm()
-        shared_executor = TencentDocsFiller.get_shared_execution_logic()
+        shared_algorithm, shared_executor = TencentDocsFiller.get_shared_script_parts(two_phase)
+        ready_waiter = TencentDocsFiller.get_ready_waiter()
         
         js_code = f"""
 (function() {{
     console.log('🚀 开始填写金数据表单（使用共享算法）...');
     
     const fillData = {fill_data_json};
+    // 全局最优分配方案（Python 端匈牙利算法求解，为 null 时逐个匹配）
+    const assignmentPlan = {assignment_plan_json};
     
     // ═══════════════════════════════════════════════════════════════
     // 共享匹配算法（来自 TencentDocsFiller.get_shared_match_algorithm()）
@@ -7139,21 +7821,14 @@ class NewFillWindow(QDialog):
     // ═══════════════════════════════════════════════════════════════
 {shared_executor}
     
-    // 等待输入框加载完成
-    function waitForInputs(maxAttempts = 15, interval = 400) {{
-        return new Promise((resolve) => {{
-            let attempts = 0;
-            const checkInputs = setInterval(() => {{
-                const inputs = document.querySelectorAll('input, textarea');
-                attempts++;
-                console.log(`🔍 尝试 ${{attempts}}/${{maxAttempts}}: 找到 ${{inputs.length}} 个输入框`);
-                
-                if (inputs.length > 0 || attempts >= maxAttempts) {{
-                    clearInterval(checkInputs);
-                    resolve(inputs.length > 0);
-                }}
-            }}, interval);
-        }});
+    // 表单就绪检测（来自 TencentDocsFiller.get_ready_waiter()）
+{ready_waiter}
+    
+    // 等待输入框加载完成（MutationObserver 检测，见 TencentDocsFiller.get_ready_waiter()）
+    async function waitForInputs() {{
+        const {{ ready, count, elapsed }} = await waitForFormReady({{ selector: 'input:not([type="hidden"]), textarea' }});
+        console.log(`🔍 表单就绪检测: 找到 ${{count}} 个输入框（${{elapsed}}ms）`);
+        return ready;
     }}
     
     // 获取所有可见的输入框
@@ -7237,10 +7912,11 @@ class NewFillWindow(QDialog):
         if (input.title) identifiers.push(input.title.trim());
         if (input.getAttribute('aria-label')) identifiers.push(input.getAttribute('aria-label').trim());
         
-        // 【调试】输出找到的标识
+        // @debug-begin 输出找到的标识
         if (identifiers.length > 0) {{
             console.log('[标识] input[name=' + input.name + '] → 找到标识:', identifiers.slice(0, 3).join(', '));
         }}
+        // @debug-end
         
         return identifiers;
     }}
@@ -7348,7 +8024,9 @@ class NewFillWindow(QDialog):
             allInputs: allInputs,
             getIdentifiers: getInputIdentifiers,
             fillInput: fillInput,
-            onProgress: (msg) => console.log(msg)
+            onProgress: (msg) => console.log(msg),
+            assignmentPlan: assignmentPlan,
+            batchWrites: true   // 普通文本框批量写入，值未保留时再用 fillInput 重试
         }});
         
         const result = await executor.execute();
@@ -7357,13 +8035,23 @@ class NewFillWindow(QDialog):
         console.log(`\\n✅ 金数据填写完成: ${{result.fillCount}}/${{result.totalCount}} 个输入框`);
     }}
     
-    executeAutoFill();
+    // 执行出错时也写入最终结果（推送通道据此立即保存记录）
+    executeAutoFill().catch(error => {{
+        console.error('❌ 执行出错:', error);
+        window.__autoFillResult__ = {{
+            fillCount: 0,
+            totalCount: (fillData || []).length,
+            status: 'failed',
+            message: error.message || '未知错误',
+            results: []
+        }};
+    }});
     return '金数据填写脚本已执行';
 }})();
         """
         return js_code
     
-    def generate_shimo_fill_script(self, fill_data: list) -> str:
+    def generate_shimo_fill_script(self, fill_data: list, two_phase: bool = False) -> str:
         """生成石墨文档专用的填充脚本 - 使用共享匹配算法"""
         import json
         from core.tencent_docs_filler import TencentDocsFiller
@@ -7371,8 +8059,9 @@ class NewFillWindow(QDialog):
         fill_data_json = json.dumps(fill_data, ensure_ascii=False)
         
         # 获取共享的匹配算法和执行逻辑
-        shared_algorithm = TencentDocsFiller.get_shared_match_algorithm()
-        shared_executor = TencentDocsFiller.get_shared_execution_logic()
+        shared_algorithm, shared_executor = TencentDocsFiller.get_shared_script_parts(two_phase)
+        ready_waiter = TencentDocsFiller.get_ready_waiter()
+        label_index = TencentDocsFiller.get_label_index()
         
         js_code = f"""
 (function() {{
@@ -7428,21 +8117,17 @@ class NewFillWindow(QDialog):
     // ═══════════════════════════════════════════════════════════════
 {shared_executor}
     
-    // 等待输入框加载完成
-    function waitForInputs(maxAttempts = 15, interval = 400) {{
-        return new Promise((resolve) => {{
-            let attempts = 0;
-            const checkInputs = setInterval(() => {{
-                const inputs = document.querySelectorAll('input, textarea');
-                attempts++;
-                console.log(`🔍 尝试 ${{attempts}}/${{maxAttempts}}: 找到 ${{inputs.length}} 个输入框`);
-                
-                if (inputs.length > 0 || attempts >= maxAttempts) {{
-                    clearInterval(checkInputs);
-                    resolve(inputs.length > 0);
-                }}
-            }}, interval);
-        }});
+    // 表单就绪检测（来自 TencentDocsFiller.get_ready_waiter()）
+{ready_waiter}
+    
+    // 标签索引（来自 TencentDocsFiller.get_label_index()）
+{label_index}
+    
+    // 等待输入框加载完成（MutationObserver 检测，见 TencentDocsFiller.get_ready_waiter()）
+    async function waitForInputs() {{
+        const {{ ready, count, elapsed }} = await waitForFormReady({{ selector: 'input:not([type="hidden"]), textarea' }});
+        console.log(`🔍 表单就绪检测: 找到 ${{count}} 个输入框（${{elapsed}}ms）`);
+        return ready;
     }}
     
     // 获取所有可见的输入框
@@ -7575,12 +8260,10 @@ class NewFillWindow(QDialog):
             }});
         }}
         
-        // 【方法4】Label 标签关联
-        if (input.labels && input.labels.length > 0) {{
-            input.labels.forEach(label => {{
-                addIdentifier(label.innerText || label.textContent, 85);
-            }});
-        }}
+        // 【方法4】Label 标签关联（标签索引查询）
+        getLabelIndex(input).labelsOf(input).forEach(label => {{
+            addIdentifier(label.innerText || label.textContent, 85);
+        }});
         
         // 【方法5】placeholder、title、aria-label 基础属性
         if (input.placeholder) addIdentifier(input.placeholder, 70);
@@ -7843,8 +8526,9 @@ class NewFillWindow(QDialog):
             input.dispatchEvent(new FocusEvent('blur', {{ bubbles: true }}));
         }}
         
-        // 11. 打印调试信息
+        // @debug-begin 11. 打印调试信息
         console.log(`[fillInput] 填充: "${{stringValue.substring(0, 20)}}..." -> 实际值: "${{input.value.substring(0, 20)}}..."`);
+        // @debug-end
     }}
     
     // ═══════════════════════════════════════════════════════════════
@@ -7880,13 +8564,23 @@ class NewFillWindow(QDialog):
         console.log(`\\n✅ 石墨文档填写完成: ${{result.fillCount}}/${{result.totalCount}} 个输入框`);
     }}
     
-    executeAutoFill();
+    // 执行出错时也写入最终结果（推送通道据此立即保存记录）
+    executeAutoFill().catch(error => {{
+        console.error('❌ 执行出错:', error);
+        window.__autoFillResult__ = {{
+            fillCount: 0,
+            totalCount: (fillData || []).length,
+            status: 'failed',
+            message: error.message || '未知错误',
+            results: []
+        }};
+    }});
     return '石墨文档填写脚本已执行';
 }})();
         """
         return js_code
     
-    def generate_credamo_fill_script(self, fill_data: list) -> str:
+    def generate_credamo_fill_script(self, fill_data: list, two_phase: bool = False) -> str:
         """生成见数(Credamo)专用的填充脚本 - 使用共享匹配算法 v2.0"""
         import json
         from core.tencent_docs_filler import TencentDocsFiller
@@ -7894,8 +8588,9 @@ class NewFillWindow(QDialog):
         fill_data_json = json.dumps(fill_data, ensure_ascii=False)
         
         # 获取共享算法和执行逻辑
-        shared_algorithm = TencentDocsFiller.get_shared_match_algorithm()
-        shared_executor = TencentDocsFiller.get_shared_execution_logic()
+        shared_algorithm, shared_executor = TencentDocsFiller.get_shared_script_parts(two_phase)
+        ready_waiter = TencentDocsFiller.get_ready_waiter()
+        label_index = TencentDocsFiller.get_label_index()
         
         js_code = f"""
 (function() {{
@@ -7913,22 +8608,17 @@ class NewFillWindow(QDialog):
     // ═══════════════════════════════════════════════════════════════
     {shared_executor}
     
-    // 等待Vue组件和输入框加载完成
-    function waitForInputs(maxAttempts = 20, interval = 500) {{
-        return new Promise((resolve) => {{
-            let attempts = 0;
-            const checkInputs = setInterval(() => {{
-                // 见数特有的输入框选择器
-                const inputs = document.querySelectorAll('input[type="text"], input:not([type]), textarea, .el-input__inner, .el-textarea__inner, [contenteditable="true"]');
-                attempts++;
-                console.log(`🔍 尝试 ${{attempts}}/${{maxAttempts}}: 找到 ${{inputs.length}} 个输入框`);
-                
-                if (inputs.length > 0 || attempts >= maxAttempts) {{
-                    clearInterval(checkInputs);
-                    resolve(inputs.length > 0);
-                }}
-            }}, interval);
-        }});
+    // 表单就绪检测（来自 TencentDocsFiller.get_ready_waiter()）
+    {ready_waiter}
+    
+    // 标签索引（来自 TencentDocsFiller.get_label_index()）
+    {label_index}
+    
+    // 等待输入框加载完成（MutationObserver 检测，见 TencentDocsFiller.get_ready_waiter()）
+    async function waitForInputs() {{
+        const {{ ready, count, elapsed }} = await waitForFormReady({{ selector: 'input[type="text"], input:not([type]), textarea, .el-input__inner, .el-textarea__inner, [contenteditable="true"]' }});
+        console.log(`🔍 表单就绪检测: 找到 ${{count}} 个输入框（${{elapsed}}ms）`);
+        return ready;
     }}
     
     // 获取所有可见的输入框（包括Vue/Element-UI组件）
@@ -8022,14 +8712,13 @@ class NewFillWindow(QDialog):
             }});
         }}
         
-        // 4. Label 标签
-        if (input.labels && input.labels.length > 0) {{
-            input.labels.forEach(label => addIdentifier(label.innerText || label.textContent));
-        }}
+        // 4. Label 标签（标签索引查询）
+        const index = getLabelIndex(input);
+        index.labelsOf(input).forEach(label => addIdentifier(label.innerText || label.textContent));
         
         // 5. 通过 for 属性查找 label
         if (input.id) {{
-            const label = document.querySelector(`label[for="${{input.id}}"]`);
+            const label = index.labelForId(input.id);
             if (label) addIdentifier(label.innerText || label.textContent);
         }}
         
@@ -8047,13 +8736,7 @@ class NewFillWindow(QDialog):
                 addIdentifier(labelEl.innerText || labelEl.textContent);
             }}
             
-            let parentText = '';
-            Array.from(parent.childNodes).forEach(node => {{
-                if (node.nodeType === Node.TEXT_NODE) {{
-                    parentText += node.textContent.trim() + ' ';
-                }}
-            }});
-            addIdentifier(parentText);
+            addIdentifier(index.ownText(parent));
             
             parent = parent.parentElement;
         }}
@@ -8139,7 +8822,8 @@ class NewFillWindow(QDialog):
             allInputs: allInputs,
             getIdentifiers: getInputIdentifiers,
             fillInput: fillInputCredamo,
-            onProgress: (msg) => console.log(msg)
+            onProgress: (msg) => console.log(msg),
+            batchWrites: true   // 普通文本框批量写入，值未保留时再用 fillInputCredamo 重试
         }});
         
         const result = await executor.execute();
@@ -8148,13 +8832,23 @@ class NewFillWindow(QDialog):
         console.log(`\\n✅ 见数表单填写完成: ${{result.fillCount}}/${{result.totalCount}} 个输入框`);
     }}
     
-    executeAutoFill();
+    // 执行出错时也写入最终结果（推送通道据此立即保存记录）
+    executeAutoFill().catch(error => {{
+        console.error('❌ 执行出错:', error);
+        window.__autoFillResult__ = {{
+            fillCount: 0,
+            totalCount: (fillData || []).length,
+            status: 'failed',
+            message: error.message || '未知错误',
+            results: []
+        }};
+    }});
     return '见数(Credamo)填写脚本已执行';
 }})();
         """
         return js_code
     
-    def generate_wenjuan_fill_script(self, fill_data: list) -> str:
+    def generate_wenjuan_fill_script(self, fill_data: list, two_phase: bool = False) -> str:
         """生成问卷网(wenjuan.com)专用的填充脚本 - 使用共享匹配算法"""
         import json
         from core.tencent_docs_filler import TencentDocsFiller
@@ -8162,8 +8856,9 @@ class NewFillWindow(QDialog):
         fill_data_json = json.dumps(fill_data, ensure_ascii=False)
         
         # 获取共享的匹配算法和执行逻辑
-        shared_algorithm = TencentDocsFiller.get_shared_match_algorithm()
-        shared_executor = TencentDocsFiller.get_shared_execution_logic()
+        shared_algorithm, shared_executor = TencentDocsFiller.get_shared_script_parts(two_phase)
+        ready_waiter = TencentDocsFiller.get_ready_waiter()
+        label_index = TencentDocsFiller.get_label_index()
         
         js_code = f"""
 (function() {{
@@ -8181,22 +8876,17 @@ class NewFillWindow(QDialog):
     // ═══════════════════════════════════════════════════════════════
 {shared_executor}
     
-    // 等待Vue组件和输入框加载完成
-    function waitForInputs(maxAttempts = 20, interval = 500) {{
-        return new Promise((resolve) => {{
-            let attempts = 0;
-            const checkInputs = setInterval(() => {{
-                // 问卷网特有的输入框选择器
-                const inputs = document.querySelectorAll('input[type="text"], input:not([type]), textarea, .el-input__inner, .el-textarea__inner, .survey-input, .wj-input');
-                attempts++;
-                console.log(`🔍 尝试 ${{attempts}}/${{maxAttempts}}: 找到 ${{inputs.length}} 个输入框`);
-                
-                if (inputs.length > 0 || attempts >= maxAttempts) {{
-                    clearInterval(checkInputs);
-                    resolve(inputs.length > 0);
-                }}
-            }}, interval);
-        }});
+    // 表单就绪检测（来自 TencentDocsFiller.get_ready_waiter()）
+{ready_waiter}
+    
+    // 标签索引（来自 TencentDocsFiller.get_label_index()）
+{label_index}
+    
+    // 等待输入框加载完成（MutationObserver 检测，见 TencentDocsFiller.get_ready_waiter()）
+    async function waitForInputs() {{
+        const {{ ready, count, elapsed }} = await waitForFormReady({{ selector: 'input[type="text"], input:not([type]), textarea, .el-input__inner, .el-textarea__inner, .survey-input, .wj-input' }});
+        console.log(`🔍 表单就绪检测: 找到 ${{count}} 个输入框（${{elapsed}}ms）`);
+        return ready;
     }}
     
     // 获取所有可见的输入框
@@ -8311,17 +9001,16 @@ class NewFillWindow(QDialog):
             }});
         }}
         
-        // 【方法4】Label 标签关联
-        if (input.labels && input.labels.length > 0) {{
-            input.labels.forEach(label => {{
-                const text = (label.innerText || label.textContent || '').trim();
-                addIdentifier(text, 85);
-            }});
-        }}
+        // 【方法4】Label 标签关联（标签索引查询）
+        const index = getLabelIndex(input);
+        index.labelsOf(input).forEach(label => {{
+            const text = (label.innerText || label.textContent || '').trim();
+            addIdentifier(text, 85);
+        }});
         
         // 【方法5】通过 for 属性查找 label
         if (input.id) {{
-            const label = document.querySelector(`label[for="${{input.id}}"]`);
+            const label = index.labelForId(input.id);
             if (label) {{
                 const text = (label.innerText || label.textContent || '').trim();
                 addIdentifier(text, 85);
@@ -8424,7 +9113,8 @@ class NewFillWindow(QDialog):
             allInputs: allInputs,
             getIdentifiers: getInputIdentifiers,
             fillInput: fillInput,
-            onProgress: (msg) => console.log(msg)
+            onProgress: (msg) => console.log(msg),
+            batchWrites: true   // 普通文本框批量写入，值未保留时再用 fillInput 重试
         }});
         
         const result = await executor.execute();
@@ -8433,7 +9123,17 @@ class NewFillWindow(QDialog):
         console.log(`\\n✅ 问卷网填写完成: ${{result.fillCount}}/${{result.totalCount}} 个输入框`);
     }}
     
-    executeAutoFill();
+    // 执行出错时也写入最终结果（推送通道据此立即保存记录）
+    executeAutoFill().catch(error => {{
+        console.error('❌ 执行出错:', error);
+        window.__autoFillResult__ = {{
+            fillCount: 0,
+            totalCount: (fillData || []).length,
+            status: 'failed',
+            message: error.message || '未知错误',
+            results: []
+        }};
+    }});
     return '问卷网填写脚本已执行';
 }})();
         """
@@ -8449,6 +9149,7 @@ class NewFillWindow(QDialog):
         # 获取共享算法和执行逻辑
         shared_algorithm = TencentDocsFiller.get_shared_match_algorithm()
         shared_executor = TencentDocsFiller.get_shared_execution_logic()
+        ready_waiter = TencentDocsFiller.get_ready_waiter()
         
         js_code = f"""
 (function() {{
@@ -8480,6 +9181,9 @@ class NewFillWindow(QDialog):
     // ═══════════════════════════════════════════════════════════════
     {shared_executor}
     
+    // 表单就绪检测（来自 TencentDocsFiller.get_ready_waiter()）
+    {ready_waiter}
+    
     // ═══════════════════════════════════════════════════════════════
     // 填充函数 - Vue框架深度兼容
     // ═══════════════════════════════════════════════════════════════
@@ -8704,15 +9408,19 @@ class NewFillWindow(QDialog):
     async function executeAutoFill() {{
         window.__fanqierFillStatus__ = {{ status: 'starting', message: '开始填充...' }};
         
-        // 等待页面加载
-        await new Promise(resolve => setTimeout(resolve, 800));
+        // 等待字段容器出现且页面渲染稳定（兼容模式只需要输入框）
+        const readiness = await waitForFormReady({{
+            selector: '[data-type]:not([data-type="title"]), .fq-field:not(.fq-field-title), input:not([type="hidden"]), textarea'
+        }});
+        console.log(`⏳ 表单就绪检测: ${{readiness.count}} 个元素（${{readiness.elapsed}}ms）`);
         
-        // 打印名片字段
+        // @debug-begin 打印名片字段
         console.log('\\n📇 名片字段列表:');
         fillData.forEach((item, i) => {{
             const valuePreview = String(item.value).substring(0, 30) + (String(item.value).length > 30 ? '...' : '');
             console.log(`   ${{i + 1}}. "${{item.key}}" = "${{valuePreview}}"`);
         }});
+        // @debug-end
         
         // 解析表单结构
         const fields = parseFanqierFields();
@@ -8833,10 +9541,24 @@ class NewFillWindow(QDialog):
         timestamp: Date.now()
     }};
     
+    // 执行出错时也写入最终结果（推送通道据此立即保存记录）
+    function runAutoFill() {{
+        executeAutoFill().catch(error => {{
+            console.error('❌ 执行出错:', error);
+            window.__autoFillResult__ = {{
+                fillCount: 0,
+                totalCount: (fillData || []).length,
+                status: 'failed',
+                message: error.message || '未知错误',
+                results: []
+            }};
+        }});
+    }}
+    
     if (document.readyState === 'loading') {{
-        document.addEventListener('DOMContentLoaded', () => executeAutoFill());
+        document.addEventListener('DOMContentLoaded', runAutoFill);
     }} else {{
-        executeAutoFill();
+        runAutoFill();
     }}
     
     return '番茄表单填写脚本(v3.0)已启动';
@@ -8844,7 +9566,7 @@ class NewFillWindow(QDialog):
         """
         return js_code
     
-    def generate_feishu_fill_script(self, fill_data: list) -> str:
+    def generate_feishu_fill_script(self, fill_data: list, two_phase: bool = False) -> str:
         """生成飞书问卷(feishu.cn)专用的填充脚本 - 使用共享匹配算法"""
         import json
         from core.tencent_docs_filler import TencentDocsFiller
@@ -8852,8 +9574,8 @@ class NewFillWindow(QDialog):
         fill_data_json = json.dumps(fill_data, ensure_ascii=False)
         
         # 获取共享的匹配算法和执行逻辑
-        shared_algorithm = TencentDocsFiller.get_shared_match_algorithm()
-        shared_executor = TencentDocsFiller.get_shared_execution_logic()
+        shared_algorithm, shared_executor = TencentDocsFiller.get_shared_script_parts(two_phase)
+        ready_waiter = TencentDocsFiller.get_ready_waiter()
         
         js_code = f"""
 (function() {{
@@ -8871,6 +9593,9 @@ class NewFillWindow(QDialog):
     // ═══════════════════════════════════════════════════════════════
 {shared_executor}
     
+    // 表单就绪检测（来自 TencentDocsFiller.get_ready_waiter()）
+{ready_waiter}
+    
     // 检测表单版本
     function detectFormVersion() {{
         // 新版/移动端: bitable-form-item
@@ -8886,28 +9611,14 @@ class NewFillWindow(QDialog):
         return null;
     }}
     
-    // 等待飞书表单加载完成
-    function waitForForm(maxAttempts = 25, interval = 400) {{
-        return new Promise((resolve) => {{
-            let attempts = 0;
-            const checkForm = setInterval(() => {{
-                attempts++;
-                const version = detectFormVersion();
-                
-                // 新版表单
-                const newItems = document.querySelectorAll('.bitable-form-item[data-index]');
-                // 旧版表单
-                const oldItems = document.querySelectorAll('.base-form-container_card_item');
-                
-                const totalItems = newItems.length + oldItems.length;
-                console.log(`🔍 尝试 ${{attempts}}/${{maxAttempts}}: 找到 ${{totalItems}} 个字段 (新版:${{newItems.length}}, 旧版:${{oldItems.length}})`);
-                
-                if (totalItems > 0 || attempts >= maxAttempts) {{
-                    clearInterval(checkForm);
-                    resolve({{ found: totalItems > 0, version: version }});
-                }}
-            }}, interval);
+    // 等待飞书表单加载完成（MutationObserver 检测，见 TencentDocsFiller.get_ready_waiter()）
+    async function waitForForm() {{
+        const {{ ready, count, elapsed }} = await waitForFormReady({{
+            selector: '.bitable-form-item[data-index], .base-form-container_card_item'
         }});
+        const version = detectFormVersion();
+        console.log(`🔍 表单就绪检测: 找到 ${{count}} 个字段，版本 ${{version}}（${{elapsed}}ms）`);
+        return {{ found: ready, version: version }};
     }}
     
     // 获取所有字段信息 - 新版表单
@@ -9189,13 +9900,23 @@ class NewFillWindow(QDialog):
         console.log(`\\n✅ 飞书问卷填写完成: ${{result.fillCount}}/${{result.totalCount}} 个字段`);
     }}
     
-    executeAutoFill();
+    // 执行出错时也写入最终结果（推送通道据此立即保存记录）
+    executeAutoFill().catch(error => {{
+        console.error('❌ 执行出错:', error);
+        window.__autoFillResult__ = {{
+            fillCount: 0,
+            totalCount: (fillData || []).length,
+            status: 'failed',
+            message: error.message || '未知错误',
+            results: []
+        }};
+    }});
     return '飞书问卷填写脚本已执行';
 }})();
         """
         return js_code
     
-    def generate_kdocs_fill_script(self, fill_data: list) -> str:
+    def generate_kdocs_fill_script(self, fill_data: list, two_phase: bool = False) -> str:
         """生成WPS表单(kdocs.cn/wps.cn)专用的填充脚本 - 使用腾讯文档的共享匹配算法和执行逻辑"""
         import json
         from core.tencent_docs_filler import TencentDocsFiller
@@ -9203,8 +9924,9 @@ class NewFillWindow(QDialog):
         fill_data_json = json.dumps(fill_data, ensure_ascii=False)
         
         # 获取共享的匹配算法和执行逻辑
-        shared_algorithm = TencentDocsFiller.get_shared_match_algorithm()
-        shared_executor = TencentDocsFiller.get_shared_execution_logic()
+        shared_algorithm, shared_executor = TencentDocsFiller.get_shared_script_parts(two_phase)
+        ready_waiter = TencentDocsFiller.get_ready_waiter()
+        label_index = TencentDocsFiller.get_label_index()
         
         js_code = f"""
 (function() {{
@@ -9259,21 +9981,17 @@ class NewFillWindow(QDialog):
     // ═══════════════════════════════════════════════════════════════
 {shared_executor}
     
-    // 等待输入框加载完成
-    function waitForInputs(maxAttempts = 15, interval = 400) {{
-        return new Promise((resolve) => {{
-            let attempts = 0;
-            const checkInputs = setInterval(() => {{
-                const inputs = document.querySelectorAll('input, textarea');
-                attempts++;
-                console.log(`🔍 尝试 ${{attempts}}/${{maxAttempts}}: 找到 ${{inputs.length}} 个输入框`);
-                
-                if (inputs.length > 0 || attempts >= maxAttempts) {{
-                    clearInterval(checkInputs);
-                    resolve(inputs.length > 0);
-                }}
-            }}, interval);
-        }});
+    // 表单就绪检测（来自 TencentDocsFiller.get_ready_waiter()）
+{ready_waiter}
+    
+    // 标签索引（来自 TencentDocsFiller.get_label_index()）
+{label_index}
+    
+    // 等待输入框加载完成（MutationObserver 检测，见 TencentDocsFiller.get_ready_waiter()）
+    async function waitForInputs() {{
+        const {{ ready, count, elapsed }} = await waitForFormReady({{ selector: 'input:not([type="hidden"]), textarea' }});
+        console.log(`🔍 表单就绪检测: 找到 ${{count}} 个输入框（${{elapsed}}ms）`);
+        return ready;
     }}
     
     // 获取所有可见的输入框（优化：radio/checkbox 组去重）
@@ -9476,8 +10194,8 @@ class NewFillWindow(QDialog):
         }}
         
         // 【方法4】Label 标签关联（radio/checkbox 跳过，避免提取选项文本）
-        if (!isRadioOrCheckbox && input.labels && input.labels.length > 0) {{
-            input.labels.forEach(label => {{
+        if (!isRadioOrCheckbox) {{
+            getLabelIndex(input).labelsOf(input).forEach(label => {{
                 addIdentifier(label.innerText || label.textContent, 85);
             }});
         }}
@@ -9646,20 +10364,31 @@ class NewFillWindow(QDialog):
             allInputs: allInputs,
             getIdentifiers: getInputIdentifiers,
             fillInput: fillInput,
-            onProgress: (msg) => console.log(msg)
+            onProgress: (msg) => console.log(msg),
+            batchWrites: true   // 普通文本框批量写入，值未保留时再用 fillInput 重试
         }});
         
         const result = await executor.execute();
         window.__autoFillResult__ = result;
     }}
     
-    executeAutoFill();
+    // 执行出错时也写入最终结果（推送通道据此立即保存记录）
+    executeAutoFill().catch(error => {{
+        console.error('❌ 执行出错:', error);
+        window.__autoFillResult__ = {{
+            fillCount: 0,
+            totalCount: (fillData || []).length,
+            status: 'failed',
+            message: error.message || '未知错误',
+            results: []
+        }};
+    }});
     return 'WPS表单填写脚本已执行';
 }})();
         """
         return js_code
     
-    def generate_tencent_wj_fill_script(self, fill_data: list) -> str:
+    def generate_tencent_wj_fill_script(self, fill_data: list, two_phase: bool = False) -> str:
         """生成腾讯问卷(wj.qq.com)专用的填充脚本 - 使用共享匹配算法"""
         import json
         from core.tencent_docs_filler import TencentDocsFiller
@@ -9667,8 +10396,8 @@ class NewFillWindow(QDialog):
         fill_data_json = json.dumps(fill_data, ensure_ascii=False)
         
         # 获取共享的匹配算法和执行逻辑
-        shared_algorithm = TencentDocsFiller.get_shared_match_algorithm()
-        shared_executor = TencentDocsFiller.get_shared_execution_logic()
+        shared_algorithm, shared_executor = TencentDocsFiller.get_shared_script_parts(two_phase)
+        ready_waiter = TencentDocsFiller.get_ready_waiter()
         
         js_code = f"""
 (function() {{
@@ -9728,22 +10457,14 @@ class NewFillWindow(QDialog):
     // ═══════════════════════════════════════════════════════════════
 {shared_executor}
     
-    // 等待问卷加载完成
-    function waitForForm(maxAttempts = 20, interval = 400) {{
-        return new Promise((resolve) => {{
-            let attempts = 0;
-            const checkForm = setInterval(() => {{
-                // 腾讯问卷的问题容器
-                const questions = document.querySelectorAll('.question');
-                attempts++;
-                console.log(`🔍 尝试 ${{attempts}}/${{maxAttempts}}: 找到 ${{questions.length}} 个问题`);
-                
-                if (questions.length > 0 || attempts >= maxAttempts) {{
-                    clearInterval(checkForm);
-                    resolve(questions.length > 0);
-                }}
-            }}, interval);
-        }});
+    // 表单就绪检测（来自 TencentDocsFiller.get_ready_waiter()）
+{ready_waiter}
+    
+    // 等待腾讯问卷加载完成（MutationObserver 检测，见 TencentDocsFiller.get_ready_waiter()）
+    async function waitForForm() {{
+        const {{ ready, count, elapsed }} = await waitForFormReady({{ selector: '.question' }});
+        console.log(`🔍 表单就绪检测: 找到 ${{count}} 个问题（${{elapsed}}ms）`);
+        return ready;
     }}
     
     // 【腾讯文档专用】按DOM顺序提取问题标题
@@ -9972,7 +10693,17 @@ class NewFillWindow(QDialog):
         console.log(`\\n✅ 腾讯问卷填写完成: ${{result.fillCount}}/${{result.totalCount}} 个字段`);
     }}
     
-    executeAutoFill();
+    // 执行出错时也写入最终结果（推送通道据此立即保存记录）
+    executeAutoFill().catch(error => {{
+        console.error('❌ 执行出错:', error);
+        window.__autoFillResult__ = {{
+            fillCount: 0,
+            totalCount: (fillData || []).length,
+            status: 'failed',
+            message: error.message || '未知错误',
+            results: []
+        }};
+    }});
     return '腾讯问卷填写脚本已执行';
 }})();
         """
@@ -9983,18 +10714,15 @@ class NewFillWindow(QDialog):
         print(f"  ⏰ 延迟后执行填充脚本...")
         self._fanqier_debug_printed = False  # 重置调试打印标志
         
-        # 生成填充脚本
-        js_code = self.generate_fanqier_fill_script(fill_data)
-        print(f"  📝 生成番茄表单脚本，字段数量: {len(fill_data)}")
-        print(f"  📄 脚本总长度: {len(js_code)} 字符")
+        print(f"  📝 番茄表单填充，字段数量: {len(fill_data)}")
         print(f"  🚀 执行番茄表单填充脚本...")
         
         def script_callback(result):
             print(f"  ✅ 脚本注入完成: {result}")
             # 等待500ms后开始轮询状态
-            QTimer.singleShot(500, lambda: self.check_fill_result(web_view, 0))
+            QTimer.singleShot(500, self._webview_callback(web_view, lambda: self.check_fill_result(web_view, 0)))
         
-        web_view.page().runJavaScript(js_code, script_callback)
+        self._run_fill_script(web_view, 'fanqier', fill_data, callback=script_callback)
     
     def check_fill_result(self, web_view: QWebEngineView, retry_count=0):
         """检查填充结果（带重试）"""
@@ -10041,7 +10769,7 @@ class NewFillWindow(QDialog):
 
             # 如果还在执行中，继续轮询
             if status in ['starting', 'waiting_dom', 'dom_loaded', 'dom_ready', 'waiting_inputs', 'scanning', 'found_inputs'] and retry_count < 20:
-                QTimer.singleShot(500, lambda: self.check_fill_result(web_view, retry_count + 1))
+                QTimer.singleShot(500, self._webview_callback(web_view, lambda: self.check_fill_result(web_view, retry_count + 1)))
             elif result.get('hasResult'):
                 fillCount = result.get('fillCount', 0)
                 totalCount = result.get('totalCount', 0)
@@ -10057,8 +10785,13 @@ class NewFillWindow(QDialog):
         
         web_view.page().runJavaScript(result_js, result_callback)
     
-    def get_fill_result(self, web_view: QWebEngineView, card, form_type: str):
-        """获取填写结果"""
+    def get_fill_result(self, web_view: QWebEngineView, card, form_type: str, fallback: bool = False):
+        """获取填写结果
+        
+        Args:
+            fallback: 通道已连接但超时未收到推送时的兜底读取：仍在填写时继续每 2 秒轮询，
+                      页面没有结果对象时按失败记录
+        """
         # ⚡️ 安全检查：窗口或 WebView 是否已销毁
         if not self._is_valid():
             print("🛑 [get_fill_result] 窗口已关闭，跳过结果获取")
@@ -10073,6 +10806,19 @@ class NewFillWindow(QDialog):
             print("🛑 [get_fill_result] WebView 已销毁，跳过结果获取")
             return
         
+        # 页面的填写结果通道已连接时由页面推送结果，不再轮询；超时仍未收到推送时兜底读取一次
+        bridge = self._fill_bridge(web_view)
+        if fallback:
+            if bridge is not None and bridge.pending is None:
+                return
+        elif bridge is not None and bridge.attached:
+            if bridge.pending is not None:
+                print(f"  📡 [{card.name}] 等待页面推送填写结果")
+                timeout = getattr(config, 'FILL_RESULT_PUSH_TIMEOUT', 60)
+                QTimer.singleShot(int(timeout * 1000), self._webview_callback(
+                    web_view, lambda: self.get_fill_result(web_view, card, form_type, fallback=True)))
+            return
+        
         # 根据表单类型选择结果获取脚本
         if form_type == 'tencent_docs':
             get_result_script = self.tencent_docs_engine.generate_get_result_script()
@@ -10105,6 +10851,9 @@ class NewFillWindow(QDialog):
             get_result_script = "(function() { return window.__autoFillResult__ || {status: 'waiting'}; })();"
         else:
             get_result_script = self.auto_fill_engine.generate_get_result_script()
+        if fallback:
+            # 兜底读取要区分"还在填写"和"没有结果"，不使用各平台脚本的默认值
+            get_result_script = "(function() { return window.__autoFillResult__ || null; })();"
         
         def handle_result(result):
             # ⚡️ 安全检查：窗口或 WebView 是否已销毁
@@ -10113,55 +10862,72 @@ class NewFillWindow(QDialog):
             if sip.isdeleted(web_view):
                 return
             
-            link_data = web_view.property("link_data")
+            # 兜底读取时页面连结果对象都没有（脚本未执行、页面已跳转）才按失败记录
+            if fallback and not (result and isinstance(result, dict)):
+                print(f"  ❌ [{card.name}] 超时未收到填写结果，按失败记录")
+                result = {'status': 'failed', 'message': '未找到填写结果', 'filled': [], 'failed': [],
+                          'fillCount': 0, 'totalCount': 0}
             
             if result and isinstance(result, dict):
                 if result.get('status') == 'waiting' or result.get('status') == 'filling':
-                    QTimer.singleShot(2000, lambda: self.get_fill_result(web_view, card, form_type))
+                    # 仍在填写（长表单、就绪检测超时、后台页面被节流）：回到 2 秒轮询，推送先到时轮询自动停止
+                    QTimer.singleShot(2000, self._webview_callback(
+                        web_view, lambda: self.get_fill_result(web_view, card, form_type, fallback=fallback)))
                     return
                 
-                if form_type == 'tencent_docs':
-                    filled = result.get('filled', [])
-                    failed = result.get('failed', [])
-                    fill_count = len(filled)
-                    total_count = len(filled) + len(failed)
-                else:
-                    # 问卷星和麦客CRM使用相同的结果格式
-                    fill_count = result.get('fillCount', 0)
-                    total_count = result.get('totalCount', 0)
-                
-                # 填写成功后尝试增加使用次数（带权限检查）
-                record_success = fill_count > 0
-                if fill_count > 0 and self.current_user:
-                    from core.auth import try_increment_usage_count
-                    can_increment, msg = try_increment_usage_count(self.current_user)
-                    if not can_increment:
-                        # 额度已用尽，不记录为成功
-                        print(f"⚠️ [额度检查] 无法增加使用次数: {msg}")
-                        record_success = False
-                        fill_count = 0  # 标记为未成功填充
-                        # 只弹出一次提示（使用实例标记防止重复弹窗）
-                        if not getattr(self, '_quota_exceeded_shown', False):
-                            self._quota_exceeded_shown = True
-                            QMessageBox.warning(self, "使用受限", f"{msg}\n\n请联系平台客服续费后继续使用。")
-                
-                # 保存记录
-                self.db_manager.create_fill_record(
-                    card.id,
-                    link_data.id,
-                    fill_count,
-                    total_count,
-                    success=record_success
-                )
-                
-                web_view.setProperty("status", "filled")
-                print(f"✅ {card.name}: 填写 {fill_count}/{total_count} 个字段")
-                
-                # 检查是否所有填写完成
-                self.check_all_fills_completed()
+                # 通道在轮询期间才连上时，结果可能已经由推送保存
+                if bridge is not None:
+                    if bridge.pending is None:
+                        return
+                    bridge.pending = None
+                self._record_fill_result(web_view, card, form_type, result)
         
         web_view.page().runJavaScript(get_result_script, handle_result)
     
+    def _record_fill_result(self, web_view: QWebEngineView, card, form_type: str, result: dict):
+        """保存填写记录并检查是否所有填写完成（轮询和推送共用）"""
+        link_data = web_view.property("link_data")
+        
+        if form_type == 'tencent_docs':
+            filled = result.get('filled', [])
+            failed = result.get('failed', [])
+            fill_count = len(filled)
+            total_count = len(filled) + len(failed)
+        else:
+            # 问卷星和麦客CRM使用相同的结果格式
+            fill_count = result.get('fillCount', 0)
+            total_count = result.get('totalCount', 0)
+        
+        # 填写成功后尝试增加使用次数（带权限检查）
+        record_success = fill_count > 0
+        if fill_count > 0 and self.current_user:
+            from core.auth import try_increment_usage_count
+            can_increment, msg = try_increment_usage_count(self.current_user)
+            if not can_increment:
+                # 额度已用尽，不记录为成功
+                print(f"⚠️ [额度检查] 无法增加使用次数: {msg}")
+                record_success = False
+                fill_count = 0  # 标记为未成功填充
+                # 只弹出一次提示（使用实例标记防止重复弹窗）
+                if not getattr(self, '_quota_exceeded_shown', False):
+                    self._quota_exceeded_shown = True
+                    QMessageBox.warning(self, "使用受限", f"{msg}\n\n请联系平台客服续费后继续使用。")
+        
+        # 保存记录
+        self.db_manager.create_fill_record(
+            card.id,
+            link_data.id,
+            fill_count,
+            total_count,
+            success=record_success
+        )
+        
+        web_view.setProperty("status", "filled")
+        print(f"✅ {card.name}: 填写 {fill_count}/{total_count} 个字段")
+        
+        # 检查是否所有填写完成
+        self.check_all_fills_completed()
+    
     def check_all_fills_completed(self):
         """检查是否所有填写完成"""
         # ⚡️ 安全检查
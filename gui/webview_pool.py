@@ -0,0 +1,180 @@
+"""
+WebView 复用池
+原来切换标签页时其他链接的 WebView 全部 deleteLater()，切回来再重新创建 WebView、页面和控制台钩子，
+每个链接 20+ 张名片时每次切换都要重新付出控件和渲染进程的创建开销。
+
+这里把不再显示的 WebView 放回池中复用：
+- 归还：断开 loadFinished、停止加载和报名工具定时器、清除动态属性、从占位符上摘下并加载 about:blank
+- 取出：about:blank 加载完成后才可以取出，优先取页面 Profile 相同的（页面和渲染进程一起复用），
+  其次取任意一个（由调用方换上新 Profile 的页面，只复用控件）
+- 池中数量有上限（config.WEBVIEW_POOL_SIZE），超出的直接销毁
+- 每次分配给名片时写入新的代数（GENERATION_PROPERTY），归还前安排的延迟回调（自动填充、读取结果）
+  发现代数变化后不再执行，不会在复用后的 WebView 上按旧名片填写或保存记录
+"""
+from collections import OrderedDict
+from typing import Dict
+
+from PyQt6.QtCore import QUrl
+
+BLANK_URL = 'about:blank'
+
+# 归还时需要停止的定时器属性（报名工具登录/提交轮询）
+TIMER_PROPERTIES = ('login_timer', 'submit_timer', 'baoming_login_timer', 'baoming_submit_timer')
+
+# WebView 当前分配的代数（每次分配给名片时递增，归还时清除）
+GENERATION_PROPERTY = 'pool_generation'
+
+
+def _is_deleted(obj) -> bool:
+    try:
+        from PyQt6 import sip
+    except ImportError:
+        import sip
+    return obj is None or sip.isdeleted(obj)
+
+
+class WebViewPool:
+    """
+    空闲 WebView 池（每个填充窗口一个）
+
+    使用方法：
+        web_view = pool.acquire(profile)        # None 表示池中没有可用的，需要新建
+        if web_view.page().profile() is not profile: 换上新页面
+        pool.stamp(web_view)                    # 分配给名片（新建的 WebView 也要调用）
+        pool.release(web_view)                  # 不再显示时归还（池满时销毁）
+        pool.clear()                            # 窗口关闭时销毁所有空闲 WebView
+    """
+
+    def __init__(self, max_size: int = 16):
+        self.max_size = max(0, max_size)
+        self._idle: 'OrderedDict[int, object]' = OrderedDict()  # id → WebView（按归还顺序）
+        self._ready: Dict[int, bool] = {}  # id → about:blank 是否已加载完成
+        self.reused = 0
+        self._generation = 0
+
+    def __len__(self):
+        return len(self._idle)
+
+    def acquire(self, profile=None):
+        """取出一个空闲 WebView（优先页面 Profile 相同的），没有可用的返回 None"""
+        candidates = [key for key in self._idle if self._ready.get(key)]
+        if not candidates:
+            return None
+        key = next((key for key in candidates if self._page_profile(self._idle[key]) is profile), candidates[0])
+        web_view = self._idle.pop(key)
+        self._ready.pop(key, None)
+        if _is_deleted(web_view):
+            return self.acquire(profile)
+        self.reused += 1
+        return web_view
+
+    def stamp(self, web_view) -> int:
+        """写入新的代数，之前安排的延迟回调随之失效"""
+        self._generation += 1
+        web_view.setProperty(GENERATION_PROPERTY, self._generation)
+        return self._generation
+
+    def release(self, web_view) -> bool:
+        """
+        重置并归还 WebView
+
+        Returns:
+            True 表示已放回池中；False 表示池已满或重置失败，WebView 已销毁
+        """
+        if _is_deleted(web_view):
+            return False
+        try:
+            self._reset(web_view)
+        except Exception as e:
+            print(f"⚠️ 重置 WebView 失败，直接销毁: {e}")
+            self._destroy(web_view)
+            return False
+        if len(self._idle) >= self.max_size:
+            self._destroy(web_view)
+            return False
+
+        key = id(web_view)
+        self._idle[key] = web_view
+        self._ready[key] = False
+
+        def on_blank_loaded(_ok, key=key, web_view=web_view):
+            try:
+                web_view.loadFinished.disconnect(on_blank_loaded)
+            except (TypeError, RuntimeError):
+                pass
+            if key in self._idle:
+                self._ready[key] = True
+                page = web_view.page()
+                if page is not None:
+                    page.history().clear()
+
+        web_view.loadFinished.connect(on_blank_loaded)
+        web_view.setUrl(QUrl(BLANK_URL))
+        return True
+
+    def discard_profile(self, profile):
+        """销毁页面使用该 Profile 的空闲 WebView（Profile 将被释放时调用）"""
+        for key, web_view in list(self._idle.items()):
+            if _is_deleted(web_view) or self._page_profile(web_view) is profile:
+                del self._idle[key]
+                self._ready.pop(key, None)
+                self._destroy(web_view)
+
+    def clear(self):
+        for web_view in self._idle.values():
+            self._destroy(web_view)
+        self._idle.clear()
+        self._ready.clear()
+
+    def stats(self) -> Dict:
+        return {
+            'idle': len(self._idle),
+            'ready': sum(1 for ready in self._ready.values() if ready),
+            'reused': self.reused,
+        }
+
+    @staticmethod
+    def _page_profile(web_view):
+        page = web_view.page()
+        return page.profile() if page is not None else None
+
+    @staticmethod
+    def _reset(web_view):
+        """断开信号、停止定时器、清除属性、从占位符上摘下"""
+        try:
+            web_view.loadFinished.disconnect()
+        except (TypeError, RuntimeError):
+            pass
+        web_view.stop()
+
+        for name in TIMER_PROPERTIES:
+            timer = web_view.property(name)
+            if timer is not None and not _is_deleted(timer):
+                timer.stop()
+                try:
+                    timer.timeout.disconnect()
+                except (TypeError, RuntimeError):
+                    pass
+        for name in web_view.dynamicPropertyNames():
+            web_view.setProperty(bytes(name).decode('utf-8'), None)
+
+        # 复用的页面会重新加载，通道等新页面连上后再标记为已连接
+        bridge = getattr(web_view.page(), 'fill_bridge', None)
+        if bridge is not None:
+            bridge.pending = None
+            bridge.attached = False
+
+        web_view.hide()
+        web_view.setParent(None)
+
+    @staticmethod
+    def _destroy(web_view):
+        if _is_deleted(web_view):
+            return
+        try:
+            web_view.loadFinished.disconnect()
+        except (TypeError, RuntimeError):
+            pass
+        web_view.stop()
+        web_view.setParent(None)
+        web_view.deleteLater()
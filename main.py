@@ -150,6 +150,14 @@ def main():
         _log(f"初始化异常: {e}\n{tb}", level='error')
         _log_fatal("初始化失败", f"{e}\n\n{tb}")
 
+    # 共享静态资源缓存使用的 afasset:// 协议必须在创建 QApplication 之前注册
+    if getattr(config, 'SHARED_ASSET_CACHE', True):
+        try:
+            from gui.asset_scheme import register_asset_scheme
+            register_asset_scheme()
+        except Exception as e:
+            _log(f"注册共享资源缓存协议失败，静态资源按 Profile 分别缓存: {e}", level='warning')
+
     QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
     app.setApplicationName(config.APP_NAME)
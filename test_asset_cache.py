@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+测试共享静态资源缓存：URL 改写、域名白名单、Cache-Control、按内容去重、按大小淘汰和跨线程读写
+"""
+import tempfile
+import threading
+from pathlib import Path
+
+from core.asset_cache import SharedAssetStore, cache_lifetime, from_cache_url, host_allowed, to_cache_url
+
+
+def test_url_mapping_and_whitelist():
+    url = 'https://image.wjx.cn/joinnew/js/jq.js?v=3'
+    assert to_cache_url(url) == 'afasset://image.wjx.cn/joinnew/js/jq.js?v=3'
+    assert from_cache_url(to_cache_url(url)) == url
+    assert to_cache_url('http://image.wjx.cn/a.js') is None
+
+    hosts = ('image.wjx.cn', '.gtimg.com')
+    assert host_allowed('image.wjx.cn', hosts) and host_allowed('docs.gtimg.com', hosts)
+    assert host_allowed('gtimg.com', hosts)
+    assert not host_allowed('www.wjx.cn', hosts) and not host_allowed('evilgtimg.com', hosts)
+
+
+def test_cache_control():
+    assert cache_lifetime('public, max-age=600', 3600) == 600
+    assert cache_lifetime('max-age=31536000', 3600) == 3600
+    assert cache_lifetime('no-store', 3600) is None
+    assert cache_lifetime('private, max-age=60', 3600) is None
+    assert cache_lifetime('', 3600) == 3600
+
+
+def test_store_dedupes_and_persists():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        store = SharedAssetStore(root, max_mb=1)
+        assert store.get('https://a.cn/x.js') is None
+        assert store.put('https://a.cn/x.js', 'application/javascript', b'var a;')
+        assert store.put('https://a.cn/y.js#top', 'application/javascript', b'var a;')
+        assert not store.put('https://a.cn/z.js', 'application/javascript', b'var z;', 'no-store')
+        assert store.get('https://a.cn/y.js') == ('application/javascript', b'var a;')
+        assert store.stats()['blobs'] == 1
+        store.flush()
+
+        reloaded = SharedAssetStore(root, max_mb=1)
+        assert reloaded.get('https://a.cn/x.js') == ('application/javascript', b'var a;')
+
+        # 内容更新后旧内容不再被引用，删除
+        reloaded.put('https://a.cn/x.js', 'application/javascript', b'var b;')
+        reloaded.put('https://a.cn/y.js', 'application/javascript', b'var b;')
+        assert reloaded.stats()['blobs'] == 1
+        assert len([path for path in (root / 'blobs').rglob('*') if path.is_file()]) == 1
+
+
+def test_store_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SharedAssetStore(Path(tmp), max_mb=1)
+        chunk = 400 * 1024
+        store.put('https://a.cn/1.png', 'image/png', b'1' * chunk)
+        store.put('https://a.cn/2.png', 'image/png', b'2' * chunk)
+        assert store.get('https://a.cn/1.png') is not None  # 1 变为最近使用
+        store.put('https://a.cn/3.png', 'image/png', b'3' * chunk)
+        assert store.get('https://a.cn/2.png') is None
+        assert store.get('https://a.cn/1.png') is not None and store.get('https://a.cn/3.png') is not None
+
+
+def test_store_background_thread_writes():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SharedAssetStore(Path(tmp))
+
+        # 后台线程写入时界面线程同时写盘
+        def worker():
+            for i in range(50):
+                store.put(f'https://a.cn/{i}.js', 'text/javascript', f'var a{i};'.encode())
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        for _ in range(20):
+            store.flush()
+        thread.join()
+        store.flush()
+        assert SharedAssetStore(Path(tmp)).stats()['size'] == 50
+
+
+def test_store_retries_failed_index_save():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / 'asset_cache'
+        store = SharedAssetStore(root)
+        store.put('https://a.cn/a.js', 'text/javascript', b'var a;')
+        # 索引文件的位置被目录占用，写盘失败；修改保留为未写盘，恢复后 flush() 写入
+        (root / 'index.json').unlink()
+        (root / 'index.json').mkdir()
+        store.put('https://a.cn/b.js', 'text/javascript', b'var b;')
+        store.flush()
+        (root / 'index.json').rmdir()
+        store.flush()
+        assert SharedAssetStore(root).stats()['size'] == 2
+
+
+if __name__ == '__main__':
+    test_url_mapping_and_whitelist()
+    test_cache_control()
+    test_store_dedupes_and_persists()
+    test_store_evicts_least_recently_used()
+    test_store_background_thread_writes()
+    test_store_retries_failed_index_save()
+    print("🎉 所有测试通过！")
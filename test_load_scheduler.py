@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+测试 WebView 滑动窗口加载调度：窗口内取任务、域名并发上限、按耗时和资源占用调整窗口
+"""
+from core.load_scheduler import LoadScheduler
+
+
+def _take(scheduler, queue, now=0.0):
+    return scheduler.take(queue, key_of=lambda item: item[0], domain_of=lambda item: item[1], now=now)
+
+
+def test_take_respects_window_and_domain_limit():
+    scheduler = LoadScheduler(initial_window=3, domain_limit=2)
+    queue = [(1, 'a.com'), (2, 'a.com'), (3, 'a.com'), (4, 'b.com'), (5, 'b.com')]
+    assert [key for key, _ in _take(scheduler, queue)] == [1, 2, 4]
+    assert [key for key, _ in queue] == [3, 5]  # 域名已满的任务留在队列中并保持顺序
+
+    # 任意一个结束立即补位
+    scheduler.finished(1, now=1.0)
+    assert [key for key, _ in _take(scheduler, queue, now=1.0)] == [3]
+    assert scheduler.inflight == 3
+
+
+def test_window_grows_when_fast_and_halves_when_slow():
+    scheduler = LoadScheduler(initial_window=2, max_window=4, target_load_time=5)
+    queue = [(key, f'{key}.com') for key in range(10)]
+    _take(scheduler, queue)
+    scheduler.finished(0, now=1.0)
+    scheduler.finished(1, now=1.0)
+    assert scheduler.window == 3  # 完成一个窗口的快速加载，窗口 +1
+
+    _take(scheduler, queue, now=1.0)
+    assert scheduler.inflight == 3
+    scheduler.finished(2, now=20.0)  # 超过目标耗时 2 倍
+    assert scheduler.window == 1
+    scheduler.finished(3, success=False, now=2.0)
+    assert scheduler.window == 1  # 不低于下限
+    assert scheduler.finished('unknown') is None
+
+
+def test_resource_pressure_shrinks_and_blocks_growth():
+    scheduler = LoadScheduler(initial_window=4, memory_limit_mb=1000, cpu_limit=80)
+    scheduler.update_resources(memory_mb=1500, cpu_percent=None)
+    assert scheduler.window == 3 and scheduler.under_pressure
+
+    queue = [(key, 'a.com') for key in range(3)]
+    _take(scheduler, queue)
+    for key in range(3):
+        scheduler.finished(key, now=1.0)
+    assert scheduler.window == 3  # 资源紧张时不扩大
+
+    scheduler.update_resources(memory_mb=None, cpu_percent=None)
+    assert not scheduler.under_pressure and scheduler.window == 3
+
+
+def test_discard_drops_dead_entries():
+    scheduler = LoadScheduler(initial_window=3)
+    _take(scheduler, [(1, 'a.com'), (2, 'a.com')])
+    scheduler.discard([2])
+    assert scheduler.inflight == 1
+    assert scheduler.finished(1) is None
+
+
+if __name__ == '__main__':
+    test_take_respects_window_and_domain_limit()
+    test_window_grows_when_fast_and_halves_when_slow()
+    test_resource_pressure_shrinks_and_blocks_growth()
+    test_discard_drops_dead_entries()
+    print("🎉 所有测试通过！")
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+测试 Python 端共享匹配算法的加速实现与原始评分结果一致
+"""
+import random
+import re
+
+from core import text_normalizer
+from core.matcher import FieldMatcher
+from core.tencent_docs_filler import SharedMatchAlgorithm
+from core.keyword_index import CompiledKeywordIndex
+from core.field_assignment import OptimalFieldAssignment
+from core.match_service import MatchService
+from core.option_index import OptionIndex
+from core.aho_corasick import AhoCorasick
+from core.coverage import compute_coverage
+
+
+LABELS = ['姓名', '真实姓名', '手机号', '联系电话', '紧急联系人电话', '微信号', '身份证号码',
+          '所在城市', '详细地址', '小红书账号', '粉丝数', '性别', '年龄', '邮箱', 'QQ号']
+SEPARATORS = ['|', '，', '；', '、', ',']
+
+
+def random_key(rng: random.Random) -> str:
+    """随机生成名片 key（可能包含多个子关键词）"""
+    parts = rng.sample(LABELS, rng.randint(1, 3))
+    return rng.choice(SEPARATORS).join(parts)
+
+
+def random_title(rng: random.Random) -> str:
+    """随机生成表单标题（带序号、括号说明等噪声）"""
+    label = rng.choice(LABELS)
+    noise = rng.choice(['', '请填写', '您的', '（必填）', '*', '1、', '（与身份证一致）'])
+    return rng.choice([noise + label, label + noise, label[:-1], label])
+
+
+def brute_force(identifiers, keys):
+    """逐个 key 调用 match_keyword 取最高分（与 BaomingToolFiller 旧逻辑一致）"""
+    best = {'score': 0, 'index': None, 'matchedKey': None, 'identifier': None}
+    for index, key in enumerate(keys):
+        result = SharedMatchAlgorithm.match_keyword(identifiers, key)
+        if result['matched'] and result['score'] > best['score']:
+            best = {'score': result['score'], 'index': index,
+                    'matchedKey': result['matchedKey'], 'identifier': result['identifier']}
+    return best
+
+
+def test_compiled_index_matches_brute_force():
+    rng = random.Random(20251017)
+    for _ in range(200):
+        keys = [random_key(rng) for _ in range(rng.randint(1, 25))]
+        index = CompiledKeywordIndex(keys)
+        for _ in range(10):
+            identifiers = [random_title(rng) for _ in range(rng.randint(1, 3))]
+            expected = brute_force(identifiers, keys)
+            actual = index.lookup(identifiers)
+            assert actual['index'] == expected['index'], (identifiers, keys)
+            if expected['index'] is not None:
+                assert actual['score'] == expected['score']
+                assert actual['matchedKey'] == expected['matchedKey']
+                assert actual['identifier'] == expected['identifier']
+
+
+def test_score_matrix_matches_match_keyword():
+    rng = random.Random(7)
+    keys = [random_key(rng) for _ in range(30)] + ['', '，', '|||']
+    fields = [random_title(rng) for _ in range(40)]
+    fields += [[random_title(rng), random_title(rng)], [], '']
+    matrix = SharedMatchAlgorithm.score_matrix(fields, keys)
+    assert matrix.shape == (len(fields), len(keys))
+    for i, field in enumerate(fields):
+        for j, key in enumerate(keys):
+            assert matrix[i, j] == SharedMatchAlgorithm.match_keyword(field, key)['score'], (field, key)
+        assert SharedMatchAlgorithm.best_matches(matrix[i:i + 1])[0] == brute_force(field, keys)['index']
+
+
+def legacy_field_clean(text):
+    """FieldMatcher.clean_text 原正则实现"""
+    return re.sub(r'[：:：*？?！!。.、，,\s\*\-_/\\]+', '', text.lower().strip()) if text else ''
+
+
+def legacy_match_clean(text):
+    """SharedMatchAlgorithm.clean_text 原正则实现"""
+    return re.sub(r'[：:*？?！!。.、，,\s\-_\(\)（）【】\[\]]+', '', text.lower()).strip() if text else ''
+
+
+def test_normalizer_matches_regex_rules():
+    """缓存版清理/分割结果与原正则实现一致"""
+    rng = random.Random(3)
+    alphabet = list('姓名手机ABCabc123') + list('：:*？?！!。.、，,-_/\\()（）【】[]|；;+\u2795') \
+        + [' ', '\t', '\n', '\u3000', '\xa0', '\u2028']
+    for _ in range(2000):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        parts = re.split(r'[|,;，；、\n\r\t/／\\｜\u2795+]+', text) if text else []
+        assert FieldMatcher.clean_text(text) == legacy_field_clean(text)
+        assert SharedMatchAlgorithm.clean_text(text) == legacy_match_clean(text)
+        assert SharedMatchAlgorithm.split_keywords(text) == [legacy_match_clean(p) for p in parts if p.strip()]
+    stats = text_normalizer.cache_stats()
+    assert stats['match_text']['hits'] > 0 and stats['match_text']['misses'] > 0
+
+
+def test_optimal_assignment_matches_brute_force():
+    """匈牙利算法得到的总分与穷举所有分配方案的最优总分一致"""
+    import itertools
+    import numpy as np
+
+    rng = np.random.default_rng(11)
+    for _ in range(200):
+        rows, cols = (int(n) for n in rng.integers(1, 6, size=2))
+        scores = rng.choice([0, 30, 55, 70, 80, 85, 100], size=(rows, cols)).astype(float)
+        pairs = OptimalFieldAssignment.solve(scores)
+        assert len({r for r, _ in pairs}) == len(pairs) == len({c for _, c in pairs})
+        assert all(scores[r, c] >= 50 for r, c in pairs)
+
+        weights = np.where(scores >= 50, scores, 0)
+        best = 0
+        if rows <= cols:
+            for perm in itertools.permutations(range(cols), rows):
+                best = max(best, sum(weights[i, perm[i]] for i in range(rows)))
+        else:
+            for perm in itertools.permutations(range(rows), cols):
+                best = max(best, sum(weights[perm[j], j] for j in range(cols)))
+        assert sum(scores[r, c] for r, c in pairs) == best
+
+
+def test_match_service_matches_brute_force():
+    """两阶段协议：Python 端生成的填充指令与页面内逐个匹配的结果一致，且同一表单只匹配一次"""
+    rng = random.Random(5)
+    MatchService.clear_cache()
+    fill_data = [{'key': random_key(rng), 'value': str(i)} for i in range(20)]
+    keys = [item['key'] for item in fill_data]
+    fields = [{'idx': i, 'identifiers': [random_title(rng)], 'type': 'text', 'options': []} for i in range(30)]
+
+    instructions = MatchService.build_instructions(fields, fill_data)
+    by_idx = {step['idx']: step for step in instructions}
+    for field in fields:
+        expected = brute_force(field['identifiers'], keys)
+        step = by_idx.get(field['idx'])
+        if expected['index'] is None:
+            assert step is None
+        else:
+            assert step['key'] == keys[expected['index']] and step['score'] == expected['score']
+            assert step['selector'] == f'[data-af-idx="{field["idx"]}"]'
+
+    assert MatchService.build_instructions(fields, fill_data) == instructions
+    assert MatchService.cache_stats()['hits'] == 1
+
+
+def legacy_find_option(options, matched_value):
+    """BaomingToolFiller.match_and_fill 原选项匹配：先精确匹配，再按顺序取第一个包含匹配"""
+    for opt in options:
+        if str(opt.get('value', '')).strip() == str(matched_value).strip():
+            return opt
+    for opt in options:
+        opt_val = str(opt.get('value', '')).strip()
+        if opt_val and (str(matched_value) in opt_val or opt_val in str(matched_value)):
+            return opt
+    return None
+
+
+def test_option_index_matches_linear_scan():
+    rng = random.Random(13)
+    syllables = ['北京', '上海', '广', '州', '深圳', '市', '省', '江苏', '南京', '区', ' ', '其他']
+    for _ in range(300):
+        options = [{'key': f'k{i}', 'value': ''.join(rng.sample(syllables, rng.randint(0, 3)))}
+                   for i in range(rng.randint(1, 40))]
+        index = OptionIndex(options)
+        for _ in range(10):
+            value = rng.choice([''.join(rng.sample(syllables, rng.randint(1, 3))),
+                                rng.choice(options)['value'], rng.choice(syllables), 123,
+                                # 长文本（地址、自我介绍等）
+                                ''.join(rng.choice(syllables) for _ in range(rng.randint(10, 40)))])
+            assert index.find(value)[0] is legacy_find_option(options, value), (options, value)
+
+
+def test_aho_corasick_finds_all_substrings():
+    rng = random.Random(17)
+    alphabet = '姓名手机号码真实'
+    for _ in range(300):
+        patterns = [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 4))) for _ in range(rng.randint(1, 20))]
+        automaton = AhoCorasick(patterns)
+        for _ in range(10):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 15)))
+            expected = {i for i, pattern in enumerate(patterns) if pattern and pattern in text}
+            assert automaton.find_all(text) == expected, (patterns, text)
+
+
+def test_coverage_matches_brute_force():
+    rng = random.Random(19)
+    forms = {f'https://example.com/form/{i}': [[random_title(rng)] for _ in range(rng.randint(0, 12))]
+             for i in range(6)}
+    cards = [{'id': str(i), 'name': f'名片{i}', 'keys': [random_key(rng) for _ in range(rng.randint(1, 6))]}
+             for i in range(9)]
+
+    report = compute_coverage(cards, forms, workers=2, batch_size=4)
+    assert report == compute_coverage(cards, forms, workers=1)
+    for card, card_report in zip(cards, report['cards']):
+        for url, fields in forms.items():
+            matched = sum(1 for identifiers in fields if brute_force(identifiers, card['keys'])['index'] is not None)
+            assert card_report['links'][url]['matched'] == matched, (card, url)
+            assert card_report['links'][url]['total'] == len(fields)
+
+
+if __name__ == '__main__':
+    test_compiled_index_matches_brute_force()
+    test_score_matrix_matches_match_keyword()
+    test_normalizer_matches_regex_rules()
+    test_optimal_assignment_matches_brute_force()
+    test_match_service_matches_brute_force()
+    test_option_index_matches_linear_scan()
+    test_aho_corasick_finds_all_substrings()
+    test_coverage_matches_brute_force()
+    print("🎉 所有测试通过！")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+测试 Profile 管理：LRU 释放空闲 Profile、使用中的不释放、HTTP 缓存目录超出磁盘预算时删除最旧的未加载目录
+"""
+import os
+import tempfile
+
+from core.profile_manager import ProfileManager
+
+
+def _manager(max_live, busy=(), disk_budget_mb=0):
+    released = []
+    manager = ProfileManager(release=released.append, in_use=lambda profile: profile in busy,
+                             max_live=max_live, disk_budget_mb=disk_budget_mb)
+    return manager, released
+
+
+def test_lru_evicts_idle_profiles():
+    manager, released = _manager(max_live=2, busy={'p_a'})
+    for key in ('a', 'b'):
+        manager.get(key, create=lambda key=key: f'p_{key}')
+    manager.get('a', create=lambda: 'unused')      # a 变为最近使用
+    manager.get('c', create=lambda: 'p_c')
+    assert released == ['p_b'] and manager.profiles() == ['p_a', 'p_c']
+
+    # 都在使用时允许暂时超出上限
+    manager.in_use = lambda profile: True
+    manager.get('d', create=lambda: 'p_d')
+    assert len(manager) == 3 and released == ['p_b']
+    assert manager.stats() == {'live': 3, 'created': 4, 'evicted': 1}
+
+
+def test_trim_disk_cache_removes_oldest_unloaded_dirs():
+    manager, _ = _manager(max_live=4, disk_budget_mb=1)
+    with tempfile.TemporaryDirectory() as root:
+        for age, name in enumerate(('profile_store_old', 'profile_store_live', 'profile_store_new', 'other')):
+            os.makedirs(os.path.join(root, name, 'Cache'))
+            path = os.path.join(root, name, 'Cache', 'data')
+            with open(path, 'wb') as f:
+                f.write(b'x' * 400 * 1024)
+            os.utime(path, (1000 + age, 1000 + age))
+        removed = manager.trim_disk_cache(root, 'profile_store_', live_names=['profile_store_live'], force=True)
+        assert removed == ['profile_store_old']
+        assert sorted(os.listdir(root)) == ['other', 'profile_store_live', 'profile_store_new']
+        # 间隔内不重复扫描
+        assert manager.trim_disk_cache(root, 'profile_store_') == []
+
+
+if __name__ == '__main__':
+    test_lru_evicts_idle_profiles()
+    test_trim_disk_cache_removes_oldest_unloaded_dirs()
+    print("🎉 所有测试通过！")
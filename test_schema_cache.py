@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+测试表单结构缓存：持久化、按结构哈希失效、按最近使用淘汰、写盘间隔
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from core.schema_cache import FormSchemaCache
+
+
+def make_fields(*titles):
+    return [{'idx': i, 'identifiers': [title], 'type': 'text', 'options': []} for i, title in enumerate(titles)]
+
+
+def make_instructions(fields, keys):
+    return [{'idx': field['idx'], 'title': field['identifiers'][0], 'key': key, 'score': 100.0}
+            for field, key in zip(fields, keys)]
+
+
+def test_schema_cache_roundtrip_and_invalidation():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = Path(tmp) / 'form_schema_cache.json'
+        url = 'https://example.com/form/abc#top'
+        keys = ['姓名', '手机号']
+        fields = make_fields('姓名', '手机号')
+
+        cache = FormSchemaCache(cache_file)
+        assert cache.get(url, keys) is None
+        cache.put(url, fields, keys, make_instructions(fields, keys))
+
+        # 跨会话：重新加载后仍能命中，URL 锚点不影响
+        reloaded = FormSchemaCache(cache_file)
+        cached = reloaded.get('https://example.com/form/abc/', keys)
+        assert cached and cached['count'] == 2
+        fill_data = [{'key': '手机号', 'value': '138'}, {'key': '姓名', 'value': '张三'}]
+        instructions = FormSchemaCache.build_instructions(cached, fill_data)
+        assert [(step['idx'], step['value'], step['title']) for step in instructions] == \
+            [(0, '张三', '姓名'), (1, '138', '手机号')]
+
+        # 名片 key 组合不同：未命中
+        assert reloaded.get(url, ['手机号', '姓名']) is None
+
+        # 表单结构变化：旧映射整体失效
+        changed = make_fields('手机号', '姓名', '邮箱')
+        reloaded.put(url, changed, ['手机号', '姓名'], make_instructions(changed, ['手机号', '姓名']))
+        assert reloaded.get(url, keys) is None
+        assert reloaded.get(url, ['手机号', '姓名'])['count'] == 3
+
+        reloaded.invalidate(url)
+        assert FormSchemaCache(cache_file).get(url, ['手机号', '姓名']) is None
+
+
+def test_schema_cache_lru_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FormSchemaCache(Path(tmp) / 'form_schema_cache.json', max_entries=2)
+        fields = make_fields('姓名')
+        for name in ('a', 'b'):
+            cache.put(f'https://example.com/{name}', fields, ['姓名'], make_instructions(fields, ['姓名']))
+            time.sleep(0.01)
+        # 访问 a 后写入 c，最久未使用的 b 被淘汰
+        assert cache.get('https://example.com/a', ['姓名'])
+        time.sleep(0.01)
+        cache.put('https://example.com/c', fields, ['姓名'], make_instructions(fields, ['姓名']))
+        assert cache.get('https://example.com/b', ['姓名']) is None
+        assert cache.get('https://example.com/a', ['姓名']) and cache.get('https://example.com/c', ['姓名'])
+
+
+def test_schema_cache_debounced_save():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = Path(tmp) / 'form_schema_cache.json'
+        cache = FormSchemaCache(cache_file)
+        fields = make_fields('姓名')
+        instructions = make_instructions(fields, ['姓名'])
+        cache.put('https://example.com/a', fields, ['姓名'], instructions)
+        # 写盘间隔内的修改先留在内存中，flush() 后才写盘
+        cache.put('https://example.com/b', fields, ['姓名'], instructions)
+        assert FormSchemaCache(cache_file).get('https://example.com/b', ['姓名']) is None
+        cache.flush()
+        assert FormSchemaCache(cache_file).get('https://example.com/b', ['姓名'])
+
+
+def test_schema_cache_retries_failed_save():
+    with tempfile.TemporaryDirectory() as tmp:
+        # 缓存文件的上级是普通文件，写盘失败
+        blocker = Path(tmp) / 'blocker'
+        blocker.write_text('')
+        cache = FormSchemaCache(blocker / 'form_schema_cache.json')
+        fields = make_fields('姓名')
+        cache.put('https://example.com/a', fields, ['姓名'], make_instructions(fields, ['姓名']))
+        # 失败的修改保留为未写盘，路径恢复后 flush() 写入
+        blocker.unlink()
+        cache.flush()
+        assert FormSchemaCache(blocker / 'form_schema_cache.json').get('https://example.com/a', ['姓名'])
+
+
+if __name__ == '__main__':
+    test_schema_cache_roundtrip_and_invalidation()
+    test_schema_cache_lru_eviction()
+    test_schema_cache_debounced_save()
+    test_schema_cache_retries_failed_save()
+    print("🎉 所有测试通过！")
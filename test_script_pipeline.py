@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+测试填充脚本构建流水线：词法切分、删除调试代码和日志、压缩后的脚本在 node 中结果不变
+"""
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+from core.script_pipeline import ScriptPipeline, tokenize
+from core.tencent_docs_filler import TencentDocsFiller
+
+SAMPLE = r"""
+(function() {
+    // 注释里的 console.log('x') 和 "引号
+    const re = /[/"'`]+\/ /g;
+    const text = `模板 ${ `嵌套 ${1 + 2}` } console.log('保留') ${ {a: 1}.a }`;
+    const half = 10 / 2 / 5;
+    console.log('🚀 开始', text);
+    // @debug-begin
+    ['姓名', '手机号'].forEach(name => console.log('调试扫描', name));
+    // @debug-end
+    if (half) console.log('单行 if');
+    const values = [1, 2].map(x => console.log(x));
+    console.warn('⚠️ 保留警告');
+    let n = 1
+    n
+    ++n
+    return { re: re.source, text, half, values, n: n - -1, quote: 'a  b // c' };
+})()
+"""
+
+
+def test_tokenize_roundtrip():
+    for js in (SAMPLE, TencentDocsFiller.get_shared_match_algorithm(), TencentDocsFiller().generate_fill_script({'姓名': '张三'})):
+        assert ''.join(text for _, text in tokenize(js)) == js
+
+
+def test_production_strips_logs_and_debug_blocks():
+    debug = ScriptPipeline.build('sample', SAMPLE, 'debug')
+    assert debug == SAMPLE
+
+    built = ScriptPipeline.build('sample', SAMPLE, 'production')
+    assert "console.log('🚀" not in built and '调试扫描' not in built
+    assert "console.log('保留')" in built              # 模板字符串内容不变
+    assert "console.warn('⚠️ 保留警告')" in built
+    assert "'a  b // c'" in built
+    assert 'n\n++n' in built                           # 换行保留，自动分号插入不变
+    sizes = ScriptPipeline.sizes()['sample']
+    assert sizes['built'] < sizes['raw']
+
+
+def test_production_script_behaves_the_same():
+    node = shutil.which('node')
+    if not node:
+        return
+
+    def run(js):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'sample.js'
+            path.write_text(f"console.info(JSON.stringify({js.strip()}));", encoding='utf-8')
+            result = subprocess.run([node, str(path)], capture_output=True, text=True, check=True)
+            return result.stdout.strip().splitlines()[-1]
+
+    assert run(ScriptPipeline.build('sample', SAMPLE, 'production')) == run(SAMPLE)
+
+
+if __name__ == '__main__':
+    test_tokenize_roundtrip()
+    test_production_strips_logs_and_debug_blocks()
+    test_production_script_behaves_the_same()
+    print("🎉 所有测试通过！")
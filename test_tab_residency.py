@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+测试标签页驻留策略：按最近访问顺序保留、超出数量或内存预算时卸载最久未访问的，当前标签页和正在预加载的不卸载
+"""
+from core.tab_residency import TabResidency
+
+
+def test_evicts_least_recently_used_over_count():
+    residency = TabResidency(max_tabs=2, memory_budget_mb=0)
+    for link_id in ('a', 'b', 'c'):
+        residency.touch(link_id)
+    residency.touch('a')
+    views = {'a': 5, 'b': 5, 'c': 5}
+    assert residency.evictions('a', views) == ['b']
+    assert residency.resident == ['c', 'a']
+    assert residency.evictions('a', views) == []
+
+
+def test_tabs_without_views_do_not_count():
+    residency = TabResidency(max_tabs=2, memory_budget_mb=0)
+    for link_id in ('a', 'b', 'c'):
+        residency.touch(link_id)
+    assert residency.evictions('c', {'a': 3, 'b': 0, 'c': 0}) == []
+
+
+def test_memory_budget_evicts_until_estimate_fits():
+    residency = TabResidency(max_tabs=5, memory_budget_mb=1000)
+    for link_id in ('a', 'b', 'c', 'd'):
+        residency.touch(link_id)
+    views = {'a': 4, 'b': 4, 'c': 4, 'd': 4}
+    # 每个 WebView 约 125MB，后台标签页 1500MB：卸载 a 后 1000MB
+    assert residency.evictions('d', views, memory_mb=2000) == ['a']
+    # 当前标签页的份额不计入预算：当前标签页很大时不卸载后台标签页
+    assert residency.evictions('d', {'b': 4, 'c': 4, 'd': 40}, memory_mb=4800) == []
+    # 后台标签页本身超出预算时卸载，当前标签页永远不卸载
+    assert residency.evictions('d', {'b': 10, 'c': 10, 'd': 10}, memory_mb=3000) == ['b']
+    assert residency.resident == ['c', 'd']
+
+
+def test_prefetching_tab_is_not_evicted():
+    residency = TabResidency(max_tabs=2, memory_budget_mb=100)
+    for link_id in ('a', 'next', 'b'):
+        residency.touch(link_id)
+    views = {'a': 3, 'next': 3, 'b': 3}
+    assert residency.evictions('b', views, memory_mb=900, protected={'next'}) == ['a']
+    assert residency.resident == ['next', 'b']
+
+
+if __name__ == '__main__':
+    test_evicts_least_recently_used_over_count()
+    test_tabs_without_views_do_not_count()
+    test_memory_budget_evicts_until_estimate_fits()
+    test_prefetching_tab_is_not_evicted()
+    print("🎉 所有测试通过！")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+离线填写覆盖率报告
+用已保存的表单结构和所有名片，计算每个 名片 × 链接 的预计填写率（不打开 WebView），
+找出填写率低的名片、从未匹配过的名片 key、以及没有任何名片能匹配的表单字段。
+
+表单结构来源：
+- 默认：两阶段填充协议保存的表单结构缓存（~/.auto-form-filler/form_schema_cache.json）
+- --schemas：JSON 文件，格式 { 链接URL: [[字段标识符, ...], ...] }
+  或 { 链接URL: [{ "idx": 0, "identifiers": [...] }, ...] }
+
+名片来源：
+- 默认：MongoDB 中所有名片的 configs
+- --cards：JSON 文件，格式 [{ "id", "name", "config": [{ "key", "value" }, ...] }, ...]（即 Card.to_dict()）
+
+用法：
+    python tools/coverage_report.py
+    python tools/coverage_report.py --schemas fixtures/forms.json --cards cards.json --workers 8
+    python tools/coverage_report.py --user alice --csv coverage.csv
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.coverage import compute_coverage
+
+
+def load_schemas(schema_file: Path = None) -> dict:
+    """加载表单结构 { 链接URL: [[字段标识符, ...], ...] }"""
+    if schema_file is None:
+        from core.schema_cache import get_schema_cache
+        return get_schema_cache().schemas()
+
+    data = json.loads(schema_file.read_text(encoding='utf-8'))
+    forms = {}
+    for url, fields in data.items():
+        forms[url] = [list(field.get('identifiers') or ()) if isinstance(field, dict) else list(field)
+                      for field in fields]
+    return forms
+
+
+def load_cards(card_file: Path = None, username: str = None) -> list:
+    """加载名片 [{ id, name, user, keys }]"""
+    if card_file is not None:
+        data = json.loads(card_file.read_text(encoding='utf-8'))
+        return [{
+            'id': card.get('id'),
+            'name': card.get('name'),
+            'user': card.get('username') or card.get('user_id'),
+            'keys': [item.get('key', '') for item in card.get('config') or card.get('configs') or []]
+        } for card in data if not username or card.get('username') == username]
+
+    from database.models import init_database, Card, User
+    if not init_database():
+        raise RuntimeError('数据库连接失败')
+
+    query = Card.objects
+    if username:
+        user = User.objects(username=username).first()
+        if not user:
+            raise RuntimeError(f'用户不存在: {username}')
+        query = query(user=user)
+
+    cards = []
+    for card in query.no_dereference():
+        cards.append({
+            'id': str(card.id),
+            'name': card.name,
+            'user': str(card.user.id) if card.user else None,
+            'keys': [config.key for config in card.configs]
+        })
+    return cards
+
+
+def write_csv(report: dict, csv_file: Path):
+    """覆盖率矩阵：每行一张名片，每列一个链接"""
+    urls = list(report['links'])
+    with open(csv_file, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['名片ID', '名片名称', '平均填写率'] + urls)
+        for card in report['cards']:
+            writer.writerow([card['id'], card['name'], card['avg_rate']] +
+                            [card['links'][url]['rate'] for url in urls])
+
+
+def print_summary(report: dict, top: int = 10):
+    print("\n" + "=" * 60)
+    print("📊 覆盖率汇总")
+    print("=" * 60)
+
+    weakest = sorted(report['cards'], key=lambda card: card['avg_rate'])[:top]
+    if weakest:
+        print(f"\n⚠️ 平均填写率最低的 {len(weakest)} 张名片:")
+        for card in weakest:
+            print(f"  {card['avg_rate']:>7.1%}  {card['name']} ({card['id']})")
+            if card['weak_keys']:
+                print(f"           从未匹配的 key: {', '.join(card['weak_keys'][:5])}"
+                      f"{' ...' if len(card['weak_keys']) > 5 else ''}")
+
+    uncovered = [(url, link) for url, link in report['links'].items() if link['never_matched']]
+    if uncovered:
+        print(f"\n❌ 有 {len(uncovered)} 个链接存在任何名片都匹配不上的字段:")
+        for url, link in sorted(uncovered, key=lambda item: -len(item[1]['never_matched']))[:top]:
+            print(f"  {url}")
+            print(f"    最佳填写率 {link['best_rate']:.1%}，无法匹配: {', '.join(link['never_matched'][:5])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='离线填写覆盖率报告')
+    parser.add_argument('--schemas', type=Path, default=None, help='表单结构 JSON（默认读取表单结构缓存）')
+    parser.add_argument('--cards', type=Path, default=None, help='名片 JSON（默认从 MongoDB 读取）')
+    parser.add_argument('--user', default=None, help='只统计该用户的名片')
+    parser.add_argument('--optimal', action='store_true', help='使用全局最优分配（默认按 config.MATCH_ASSIGNMENT_MODE）')
+    parser.add_argument('--workers', type=int, default=None, help='进程数（默认 CPU 核数）')
+    parser.add_argument('--output', type=Path, default=None, help='结果 JSON 路径')
+    parser.add_argument('--csv', type=Path, default=None, help='同时导出覆盖率矩阵 CSV')
+    args = parser.parse_args()
+
+    import config
+    optimal = args.optimal or getattr(config, 'MATCH_ASSIGNMENT_MODE', 'greedy') == 'optimal'
+
+    forms = load_schemas(args.schemas)
+    print(f"📋 表单结构: {len(forms)} 个链接")
+    if not forms:
+        print("❌ 没有可用的表单结构（两阶段协议填写过的链接才会保存结构，或使用 --schemas 指定）")
+        return 1
+
+    cards = load_cards(args.cards, args.user)
+    print(f"📇 名片: {len(cards)} 张")
+    if not cards:
+        print("❌ 没有名片")
+        return 1
+
+    print(f"🔍 计算 {len(cards) * len(forms)} 个 名片 × 链接 组合...")
+    start = time.perf_counter()
+
+    def progress(done, total):
+        print(f"  进度: {done}/{total}", end='\r')
+
+    report = compute_coverage(cards, forms, optimal=optimal, workers=args.workers, progress=progress)
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ 完成，用时 {elapsed:.1f}s")
+
+    timestamp = datetime.now()
+    output = args.output or (Path.home() / '.auto-form-filler' / 'reports' /
+                             f"coverage-{timestamp.strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        'timestamp': timestamp.isoformat(timespec='seconds'),
+        'mode': 'optimal' if optimal else 'greedy',
+        'elapsed': round(elapsed, 2),
+        **report
+    }, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"💾 结果已保存: {output}")
+
+    if args.csv:
+        write_csv(report, args.csv)
+        print(f"💾 覆盖率矩阵已导出: {args.csv}")
+
+    print_summary(report)
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n⚠️ 用户中断")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ 发生异常: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)